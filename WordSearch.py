@@ -5,62 +5,440 @@
 # Date Created:     12/11/2021
 ########################################################################################################################
 """
+import io
+import os
 import sys
-from typing import List
-from pathlib import Path
-from WordSearch_Classes import WordSearch
-from WordSearch_Functions import runLoadedWordSearch, writeTheResultsToFile, determineOutputPath
+import time
+from contextlib import redirect_stdout
+from typing import Dict, List, Tuple
+from WordSearch_Classes import WordSearch, InvalidWordSearchFile, SearchMemo, MappedGrid
+from WordSearch_Functions import runLoadedWordSearch, runRankedWordSearch, writeTheResultsToFile, \
+    determineOutputPath, rankResults, checkSearchOptions, popOption, popFlag, RESULT_RANKINGS
+from WordSearch_Patterns import InvalidSearchPattern
+from WordSearch_Profiling import StageProfiler, profileTargetFromEnvironment
 
-#Pull the system arguments as a global. Skip the first which is the script name
-wordSearchPath: List[str] = sys.argv[1:]
+#The memo of search results shared by every file processed in this process when memoisation is turned on
+resultMemo: SearchMemo = SearchMemo()
+
+#The command line options that each of the special modes can't honour, keyed by the option that picks the mode
+MODE_UNSUPPORTED_OPTIONS: Dict[str, Tuple[str, ...]] = {
+    "--manifest": ("--stream", "--compact", "--mmap", "--columnar", "--workers", "--jobs", "--dictionary",
+                   "--profile", "--profile-file"),
+    "--dictionary": ("--engine", "--patterns", "--memo", "--compact", "--mmap", "--workers", "--jobs", "--stream",
+                     "--columnar", "--profile", "--profile-file"),
+}
 
 """
 ########################################################################################################################
 MAIN FUNCTION FOR THE WORD SEARCH PROGRAM
 """
-def wordSearchMain(inputPath: str, fullResultsFlag: bool = False):
+def wordSearchMain(inputPath: str, fullResultsFlag: bool = False, engine: str = "standard", workers: int = 1,
+                   streamWords: bool = False, compactGrid: bool = False, memoryMapped: bool = False,
+                   memoise: bool = False, profileTarget: str = None, columnarResults: bool = False,
+                   overlapping: bool = False, patterns: bool = False, ranking: str = "found",
+                   maxHits: int = None) -> str:
     """
     MAIN FUNCTION FOR THE WORD SEARCH PROGRAM
 
     :param inputPath: The path, either relative to the CWD or absolute, to the file containing the word search.
     :param fullResultsFlag: A boolean that, when True, tells the program to output every result it finds rather than
                             just the top result for each word.
-    :return: No return, but results written to file in the same directory as the input path.
+    :param engine: The name of the search engine to be used to find the words, as accepted by "runLoadedWordSearch".
+    :param workers: The number of worker processes to split the word list across. A value of 1 searches in-process.
+                    More than one worker cannot be combined with streaming the words, memoising or columnar results.
+    :param streamWords: A boolean that, when True, reads the word list lazily from file rather than into memory. It
+                        implies "compactGrid", so that the grid's lines aren't all built up front either.
+    :param compactGrid: A boolean that, when True, holds the grid as one string and slices its lines out on demand.
+    :param memoryMapped: A boolean that, when True, maps the input file into memory and reads the grid in place.
+    :param memoise: A boolean that, when True, serves repeated words and repeated (grid, word) pairs from earlier
+                    files in this process from "resultMemo" rather than searching for them again.
+    :param profileTarget: Where to write a profile of the time taken by each stage, as accepted by "StageProfiler".
+                          Defaults to the "WORDSEARCH_PROFILE" environment variable, and no profile if that is unset.
+    :param columnarResults: A boolean that, when True, holds each word's full results as columns of coordinates rather
+                            than as a list of result objects, to save memory when there are very many results. It is
+                            only used in full results mode, and can't be combined with a ranking or most hits.
+    :param overlapping: A boolean that, when True, also finds the instances of each word that overlap an earlier
+                        instance on the same line, such as both instances of "AA" in "AAA".
+    :param patterns: A boolean that, when True, treats every word as a wildcard pattern such as "C?T" or "[AEIOU]..S".
+                     Words starting with "~" are treated as patterns either way.
+    :param ranking: The order to write the results of each word in, being one of "RESULT_RANKINGS". Only the best
+                    ranked result of each word is written unless full results are wanted.
+    :param maxHits: The most results to write for each word in full results mode. All of them are written when not
+                    provided.
+    :return: The message confirming where the results were written. The results themselves are written to file in the
+             same directory as the input path.
     """
-    #Read the file information into a word search class
-    wordSearchInfo: WordSearch = WordSearch(inputPath)
+    #The worker processes each read the whole word list and return full result lists, so can't honour these options
+    if workers > 1 and (streamWords or memoise or columnarResults):
+        raise ValueError("Streamed words, memoisation and columnar results are not supported with {} workers".format(
+            workers))
+
+    #Refuse any other options that can't be used together before the file is read
+    rankedResults: bool = ranking != "found" or maxHits is not None
+    checkSearchOptions(engine, memoise, columnarResults and fullResultsFlag, overlapping, ranked=rankedResults)
+
+    with StageProfiler(profileTarget or profileTargetFromEnvironment(), inputPath) as profiler:
+        #Read the file information into a word search class
+        with profiler.stage("parse"):
+            wordSearchInfo: WordSearch = WordSearch(inputPath, streamWords, compactGrid, memoryMapped)
 
-    #Run the word search function
-    wordSearchResults = runLoadedWordSearch(wordSearchInfo)
+        #The results only hold coordinates, so a mapped grid is released once they are written, or if any stage fails
+        try:
+            #Run the word search function, sharing the words across worker processes if requested
+            with profiler.stage("search"):
+                if workers > 1:
+                    #Imported here as the process pool and shared memory are slow to load and only needed with workers
+                    from WordSearch_Parallel import runShardedWordSearch
+                    wordSearchResults = runShardedWordSearch(wordSearchInfo, workers, engine, overlapping, patterns)
+                    if rankedResults:
+                        wordSearchResults = {word: rankResults(results, ranking, maxHits if fullResultsFlag else 1)
+                                             for word, results in wordSearchResults.items()}
+                elif rankedResults:
+                    #Only the best ranked result of each word is written unless full results are wanted
+                    wordSearchResults = runRankedWordSearch(wordSearchInfo, ranking, maxHits if fullResultsFlag else 1,
+                                                            engine, resultMemo if memoise else None, overlapping,
+                                                            patterns)
+                else:
+                    #Only the first result of each word is written unless full results are wanted, so stop at it
+                    wordSearchResults = runLoadedWordSearch(wordSearchInfo, engine, resultMemo if memoise else None,
+                                                            firstOnly=not fullResultsFlag,
+                                                            columnar=columnarResults and fullResultsFlag,
+                                                            overlapping=overlapping, patterns=patterns)
 
-    #Create the output file path
-    outPath: str = determineOutputPath(inputPath)
+            #Create the output file path
+            with profiler.stage("outputPath"):
+                outPath: str = determineOutputPath(inputPath, claim=True)
 
-    #Write the results to file, print the success message and return
-    print(writeTheResultsToFile(wordSearchInfo.words, outPath, wordSearchResults, fullResultsFlag))
-    return
+            #Write the results to file
+            with profiler.stage("write"):
+                message: str = writeTheResultsToFile(wordSearchInfo.words, outPath, wordSearchResults, fullResultsFlag)
+        finally:
+            if isinstance(wordSearchInfo.grid, MappedGrid):
+                wordSearchInfo.grid.close()
+
+        #Record the size of the run. Only counted when profiling, as it means another pass over the results
+        if profiler.enabled:
+            profiler.record("engine", engine)
+            profiler.record("wordCount", len(wordSearchResults))
+            profiler.record("resultCount", sum(len(rr) for rr in wordSearchResults.values()))
+            profiler.record("bytesWritten", os.path.getsize(outPath))
+
+    #Print the success message and return
+    print(message)
+    return message
 
 """
 ########################################################################################################################
-Run the process from here if this is the main
+MAIN FUNCTION FOR FINDING THE WORDS OF A DICTIONARY IN A WORD SEARCH
 """
-if __name__ == '__main__':
+def dictionaryWordSearchMain(inputPath: str, dictionaryTrie: "DictionaryTrie", fullResultsFlag: bool = False,
+                             overlapping: bool = False, ranking: str = "found", maxHits: int = None) -> str:
+    """
+    MAIN FUNCTION FOR FINDING THE WORDS OF A DICTIONARY IN A WORD SEARCH
+
+    :param inputPath: The path to the file containing the word search. Any word list in the file is ignored, and the
+                      file may hold just the grid.
+    :param dictionaryTrie: The trie of the dictionary, built once and shared by every file that is searched
+    :param fullResultsFlag: A boolean that, when True, tells the program to output every result it finds rather than
+                            just the top result for each word.
+    :param overlapping: A boolean that, when True, also finds the instances that overlap an earlier instance
+    :param ranking: The order to write the results of each word in, being one of "RESULT_RANKINGS"
+    :param maxHits: The most results to write for each word in full results mode
+    :return: The message confirming where the results were written. Only the dictionary words that were found are
+             written, in the same format as the results of the word list.
+    """
+
+    #Imported here as the dictionary module is only needed in dictionary mode
+    from WordSearch_Dictionary import runDictionaryWordSearch
+
+    wordSearchInfo: WordSearch = WordSearch(inputPath, requireWords=False)
+    wordSearchResults = runDictionaryWordSearch(wordSearchInfo, dictionaryTrie, overlapping)
+    if ranking != "found" or maxHits is not None:
+        wordSearchResults = {word: rankResults(results, ranking, maxHits if fullResultsFlag else 1)
+                             for word, results in wordSearchResults.items()}
+    message: str = writeTheResultsToFile(list(wordSearchResults), determineOutputPath(inputPath, claim=True),
+                                         wordSearchResults, fullResultsFlag)
+
+    print(message)
+    return message
+
+"""
+########################################################################################################################
+FUNCTION TO RUN THE MAIN FUNCTION FOR ONE FILE OF A BATCH, TIMING IT AND CAPTURING ANY FAILURE
+"""
+def timedWordSearchMain(inputPath: str, fullResultsFlag: bool = False, engine: str = "standard",
+                        memoise: bool = False, profileTarget: str = None, ranking: str = "found",
+                        maxHits: int = None, streamWords: bool = False, compactGrid: bool = False,
+                        memoryMapped: bool = False, columnarResults: bool = False, overlapping: bool = False,
+                        patterns: bool = False) -> Tuple[str, bool, str, float]:
+    """
+    FUNCTION TO RUN THE MAIN FUNCTION FOR ONE FILE OF A BATCH, TIMING IT AND CAPTURING ANY FAILURE
+
+    :param inputPath: The path to the file containing the word search
+    :param fullResultsFlag: A boolean that, when True, tells the program to output every result it finds
+    :param engine: The name of the search engine to be used to find the words
+    :param memoise: A boolean that, when True, shares a memo of results between the files handled by this worker
+    :param profileTarget: Where to write a profile of the stages of the run, as accepted by "wordSearchMain"
+    :param ranking: The order to write the results of each word in, as accepted by "wordSearchMain"
+    :param maxHits: The most results to write for each word, as accepted by "wordSearchMain"
+    :param streamWords: Whether to read the word list lazily, as accepted by "wordSearchMain"
+    :param compactGrid: Whether to hold the grid as a single compact grid, as accepted by "wordSearchMain"
+    :param memoryMapped: Whether to map the input file into memory, as accepted by "wordSearchMain"
+    :param columnarResults: Whether to hold full results as columns, as accepted by "wordSearchMain"
+    :param overlapping: Whether to also find overlapping instances, as accepted by "wordSearchMain"
+    :param patterns: Whether to treat every word as a wildcard pattern, as accepted by "wordSearchMain"
+    :return: A tuple of the input path, a success flag, the result or error message and the wall time in seconds
+    """
+
+    #Time the full run, keeping the printed message so that the batch can report it in order
+    startTime: float = time.perf_counter()
+    try:
+        with redirect_stdout(io.StringIO()):
+            message: str = wordSearchMain(inputPath, fullResultsFlag, engine, 1, streamWords, compactGrid,
+                                          memoryMapped, memoise, profileTarget, columnarResults, overlapping,
+                                          patterns, ranking, maxHits)
+        succeeded: bool = True
+    except (InvalidWordSearchFile, InvalidSearchPattern, OSError, UnicodeDecodeError) as error:
+        message = "ERROR: The input file \"{}\" could not be processed: {}".format(inputPath, error)
+        succeeded = False
+
+    return inputPath, succeeded, message, time.perf_counter() - startTime
+
+"""
+########################################################################################################################
+FUNCTION TO RUN MANY WORD SEARCH FILES ACROSS A POOL OF WORKER PROCESSES
+"""
+def runWordSearchBatch(inputFiles: List[Tuple[str, bool]], jobs: int, engine: str = "standard",
+                       memoise: bool = False, profileTarget: str = None, ranking: str = "found",
+                       maxHits: int = None, streamWords: bool = False, compactGrid: bool = False,
+                       memoryMapped: bool = False, columnarResults: bool = False, overlapping: bool = False,
+                       patterns: bool = False) -> List[Tuple[str, bool, str, float]]:
+    """
+    FUNCTION TO RUN MANY WORD SEARCH FILES ACROSS A POOL OF WORKER PROCESSES
+
+    A failure in one file is reported in its entry of the returned list and does not stop any of the other files. Each
+    file is searched in a single process, so the word list of a file is never split across workers.
+
+    :param inputFiles: A list of "(inputPath, fullResultsFlag)" tuples, one for each file to be processed
+    :param jobs: The number of worker processes to use
+    :param engine: The name of the search engine to be used to find the words
+    :param memoise: A boolean that, when True, shares a memo of results between the files handled by each worker
+    :param profileTarget: Where to write a profile of the stages of each file, as accepted by "wordSearchMain"
+    :param ranking: The order to write the results of each word in, as accepted by "wordSearchMain"
+    :param maxHits: The most results to write for each word, as accepted by "wordSearchMain"
+    :param streamWords: Whether to read each word list lazily, as accepted by "wordSearchMain"
+    :param compactGrid: Whether to hold each grid as a single compact grid, as accepted by "wordSearchMain"
+    :param memoryMapped: Whether to map each input file into memory, as accepted by "wordSearchMain"
+    :param columnarResults: Whether to hold full results as columns, as accepted by "wordSearchMain"
+    :param overlapping: Whether to also find overlapping instances, as accepted by "wordSearchMain"
+    :param patterns: Whether to treat every word as a wildcard pattern, as accepted by "wordSearchMain"
+    :return: A list of the "timedWordSearchMain" tuples, in the same order as the input files
+    """
+
+    #Imported here as the process pool is slow to load and only needed for batches run across jobs
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+
+    paths: List[str] = [ff[0] for ff in inputFiles]
+    flags: List[bool] = [ff[1] for ff in inputFiles]
+
+    #Hand small groups of files to each worker to keep the dispatch overhead low for large batches
+    chunkSize: int = max(1, len(inputFiles) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(partial(timedWordSearchMain, engine=engine, memoise=memoise,
+                                         profileTarget=profileTarget, ranking=ranking, maxHits=maxHits,
+                                         streamWords=streamWords, compactGrid=compactGrid, memoryMapped=memoryMapped,
+                                         columnarResults=columnarResults, overlapping=overlapping, patterns=patterns),
+                                 paths, flags, chunksize=chunkSize))
+
+"""
+########################################################################################################################
+FUNCTION TO CREATE THE SUMMARY OF A BATCH RUN
+"""
+def summariseBatch(batchResults: List[Tuple[str, bool, str, float]], totalTime: float, jobs: int) -> str:
+    """
+    FUNCTION TO CREATE THE SUMMARY OF A BATCH RUN
+
+    :param batchResults: The list of "timedWordSearchMain" tuples returned by the batch
+    :param totalTime: The wall time of the whole batch, in seconds
+    :param jobs: The number of worker processes that were used
+    :return: A multi-line summary string with the time taken by each file and the overall throughput
+    """
+
+    summaryLines: List[str] = ["Batch summary:"]
+    for inputPath, succeeded, _, wallTime in batchResults:
+        summaryLines.append("  {} {} ({:.3f}s)".format("OK    " if succeeded else "FAILED", inputPath, wallTime))
+
+    failures: int = len([rr for rr in batchResults if not rr[1]])
+    throughput: float = len(batchResults) / totalTime if totalTime > 0 else 0.0
+    summaryLines.append("Processed {} files ({} failed) in {:.3f}s with {} workers; {:.1f} files per second".format(
+        len(batchResults), failures, totalTime, jobs, throughput))
+
+    return "\n".join(summaryLines)
+
+"""
+########################################################################################################################
+FUNCTION TO PULL THE INPUT FILES AND THEIR FULL RESULTS FLAGS OUT OF THE COMMAND LINE ARGUMENTS
+"""
+def collectInputFiles(arguments: List[str]) -> List[Tuple[str, bool]]:
+    """
+    FUNCTION TO PULL THE INPUT FILES AND THEIR FULL RESULTS FLAGS OUT OF THE COMMAND LINE ARGUMENTS
+
+    :param arguments: The command line arguments, with any options already removed
+    :return: A list of "(inputPath, fullResultsFlag)" tuples for every argument that is a valid file
+    """
+
+    inputFiles: List[Tuple[str, bool]] = []
+
     #Run for every arg that is a valid input
-    for index, strArg in enumerate(wordSearchPath):
-        if Path(strArg).is_file():
+    for index, strArg in enumerate(arguments):
+        if os.path.isfile(strArg):
             #Determine if the argument following the one being used is a boolean
             # - If true, the boolean indicates that full results should be output
             fullResults = False
             try:
-                if "true" in wordSearchPath[index + 1].lower() and not Path(wordSearchPath[index + 1]).is_file():
+                if "true" in arguments[index + 1].lower() and not os.path.isfile(arguments[index + 1]):
                     fullResults = True
             except IndexError:
                 pass
 
-            #Run the program
-            wordSearchMain(strArg, fullResults)
+            inputFiles.append((strArg, fullResults))
 
         elif not ("true" in strArg.lower() or "false" in strArg.lower()):
             #The argument that has been input is not a valid file and it is not a secondary boolean argument;
             # - Alert the user that this argument could not be parsed
-            print("WARN: The input argument \"{}\" was not a valid file, and as such was not processed.".format(strArg))
\ No newline at end of file
+            print("WARN: The input argument \"{}\" was not a valid file, and as such was not processed.".format(strArg))
+
+    return inputFiles
+
+"""
+########################################################################################################################
+FUNCTION TO FIND THE COMMAND LINE OPTIONS THAT THE CHOSEN MODE WOULD IGNORE
+"""
+def findUnsupportedOptions(arguments: List[str]) -> Tuple[str, List[str]]:
+    """
+    FUNCTION TO FIND THE COMMAND LINE OPTIONS THAT THE CHOSEN MODE WOULD IGNORE
+
+    :param arguments: The command line arguments, before any options are removed
+    :return: A tuple of the special mode picked by the arguments, or None when there isn't one, and the options given
+        alongside it that the mode can't honour
+    """
+
+    #The manifest mode is checked first, as it takes priority over the dictionary mode when both are given
+    for mode in MODE_UNSUPPORTED_OPTIONS:
+        if mode in arguments:
+            return mode, [option for option in MODE_UNSUPPORTED_OPTIONS[mode] if option in arguments]
+
+    return None, []
+
+"""
+########################################################################################################################
+Run the process from here if this is the main
+"""
+if __name__ == '__main__':
+    #Pull the system arguments. Skip the first which is the script name
+    wordSearchPath: List[str] = sys.argv[1:]
+    modeOption, ignoredOptions = findUnsupportedOptions(wordSearchPath)
+
+    #Separate the options from the input files
+    jobsOption: str = popOption(wordSearchPath, "--jobs")
+    engineOption: str = popOption(wordSearchPath, "--engine") or "standard"
+    workersOption: str = popOption(wordSearchPath, "--workers") or "1"
+    streamOption: bool = popFlag(wordSearchPath, "--stream")
+    compactOption: bool = popFlag(wordSearchPath, "--compact")
+    mmapOption: bool = popFlag(wordSearchPath, "--mmap")
+    memoOption: bool = popFlag(wordSearchPath, "--memo")
+    columnarOption: bool = popFlag(wordSearchPath, "--columnar")
+    overlappingOption: bool = popFlag(wordSearchPath, "--overlapping")
+    patternsOption: bool = popFlag(wordSearchPath, "--patterns")
+    dictionaryOption: str = popOption(wordSearchPath, "--dictionary")
+    manifestOption: bool = popFlag(wordSearchPath, "--manifest")
+    rankOption: str = popOption(wordSearchPath, "--rank") or "found"
+    maxHitsOption: str = popOption(wordSearchPath, "--max-hits")
+    maxHitsLimit: int = int(maxHitsOption) if maxHitsOption is not None and maxHitsOption.isdigit() else None
+    profileOption: str = popOption(wordSearchPath, "--profile-file")
+    if popFlag(wordSearchPath, "--profile"):
+        profileOption = profileOption or "stderr"
+    inputFileList: List[Tuple[str, bool]] = collectInputFiles(wordSearchPath)
+
+    #Check the search options against each other once, rather than failing on every file
+    try:
+        checkSearchOptions(engineOption, memoOption, columnarOption, overlappingOption,
+                           ranked=rankOption != "found" or maxHitsOption is not None)
+        optionsError: str = None
+    except ValueError as error:
+        optionsError = str(error)
+
+    if not workersOption.isdigit() or int(workersOption) < 1:
+        print("WARN: The number of workers \"{}\" was not a positive whole number, so no files were processed.".format(
+            workersOption))
+
+    elif int(workersOption) > 1 and jobsOption is not None:
+        print("WARN: \"--workers\" cannot be combined with \"--jobs\", as each job searches a whole file, so no files "
+              "were processed.")
+
+    elif int(workersOption) > 1 and (streamOption or memoOption or columnarOption):
+        print("WARN: \"--workers\" cannot be combined with \"--stream\", \"--memo\" or \"--columnar\", so no files "
+              "were processed.")
+
+    elif maxHitsOption is not None and (maxHitsLimit is None or maxHitsLimit < 1):
+        print("WARN: The most hits \"{}\" was not a positive whole number, so no files were processed.".format(
+            maxHitsOption))
+
+    elif rankOption not in RESULT_RANKINGS:
+        print("WARN: The ranking \"{}\" is not one of {}, so no files were processed.".format(
+            rankOption, ", ".join(RESULT_RANKINGS)))
+
+    elif optionsError is not None:
+        print("WARN: {}, so no files were processed.".format(optionsError))
+
+    elif len(ignoredOptions) > 0:
+        print("WARN: \"{}\" cannot be combined with {}, so no files were processed.".format(
+            modeOption, ", ".join("\"{}\"".format(option) for option in ignoredOptions)))
+
+    elif manifestOption:
+        #Each input file is a manifest of puzzles, whose results all go to one combined output file
+        from WordSearch_Batch import runManifestBatch
+        for manifestPath, fullResultsFlag in inputFileList:
+            combinedPath: str = determineOutputPath(manifestPath, claim=True)
+            puzzleCount, failedCount = runManifestBatch(manifestPath, combinedPath, fullResultsFlag, engineOption,
+                                                        memoOption, overlappingOption, patternsOption, rankOption,
+                                                        maxHitsLimit)
+            print("Results of {} puzzles ({} failed) written out. The output file is \"{}\"".format(
+                puzzleCount, failedCount, combinedPath))
+
+    elif dictionaryOption is not None:
+        #Build or load the dictionary's trie once, and search every file for the words in it
+        from WordSearch_Dictionary import DictionaryTrie, loadOrBuildDictionaryTrie
+        loadedTrie: DictionaryTrie = loadOrBuildDictionaryTrie(dictionaryOption)
+        for inputFilePath, fullResultsFlag in inputFileList:
+            dictionaryWordSearchMain(inputFilePath, loadedTrie, fullResultsFlag, overlappingOption, rankOption,
+                                     maxHitsLimit)
+
+    elif jobsOption is None:
+        #Run the program for each of the files in turn
+        for inputFilePath, fullResultsFlag in inputFileList:
+            wordSearchMain(inputFilePath, fullResultsFlag, engineOption, int(workersOption), streamOption,
+                           compactOption, mmapOption, memoOption, profileOption, columnarOption, overlappingOption,
+                           patternsOption, rankOption, maxHitsLimit)
+
+        if memoOption:
+            print("Result memo: {} hits, {} misses".format(resultMemo.hits, resultMemo.misses))
+
+    elif not jobsOption.isdigit() or int(jobsOption) < 1:
+        print("WARN: The number of jobs \"{}\" was not a positive whole number, so no files were processed.".format(
+            jobsOption))
+
+    else:
+        #Run the files across the process pool, reporting each file's outcome and then the batch summary
+        batchStart: float = time.perf_counter()
+        batchResultList = runWordSearchBatch(inputFileList, int(jobsOption), engineOption, memoOption,
+                                             profileOption, rankOption, maxHitsLimit, streamWords=streamOption,
+                                             compactGrid=compactOption, memoryMapped=mmapOption,
+                                             columnarResults=columnarOption, overlapping=overlappingOption,
+                                             patterns=patternsOption)
+        batchTime: float = time.perf_counter() - batchStart
+
+        for batchResult in batchResultList:
+            print(batchResult[2])
+        print(summariseBatch(batchResultList, batchTime, int(jobsOption)))
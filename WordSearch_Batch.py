@@ -0,0 +1,144 @@
+"""
+########################################################################################################################
+# BATCH RUNS OF MANY WORD SEARCHES FROM ONE MANIFEST INTO ONE COMBINED OUTPUT FILE
+# Author:           Angus Berg
+# Date Created:     12/11/2021
+########################################################################################################################
+"""
+import os
+import json
+from typing import Tuple, Iterator
+from WordSearch_Classes import WordSearch, InvalidWordSearchFile, SearchMemo, stripLineBreak
+from WordSearch_Functions import runLoadedWordSearch, runRankedWordSearch, checkSearchOptions, checkWordList, \
+    writeResultLines, OUTPUT_BUFFER_BYTES
+from WordSearch_Patterns import InvalidSearchPattern
+
+#The file extensions that mark a manifest as a stream of JSON puzzles, one to a line
+JSON_LINES_EXTENSIONS: Tuple[str, ...] = (".jsonl", ".ndjson")
+
+"""
+########################################################################################################################
+FUNCTION TO WORK OUT WHETHER A MANIFEST LISTS PUZZLE FILES OR HOLDS THE PUZZLES THEMSELVES
+"""
+def detectManifestFormat(manifestPath: str) -> str:
+    """
+    FUNCTION TO WORK OUT WHETHER A MANIFEST LISTS PUZZLE FILES OR HOLDS THE PUZZLES THEMSELVES
+
+    :param manifestPath: The path to the manifest
+    :return: "jsonl" if the manifest has a JSON lines extension or its first line with content is a JSON object, and
+             "paths" otherwise
+    """
+
+    if manifestPath.lower().endswith(JSON_LINES_EXTENSIONS):
+        return "jsonl"
+
+    with open(manifestPath, "r") as file:
+        for line in file:
+            if len(line.strip()) > 0:
+                return "jsonl" if line.lstrip().startswith("{") else "paths"
+
+    return "paths"
+
+"""
+########################################################################################################################
+FUNCTION TO READ THE PUZZLES OF A MANIFEST ONE AT A TIME
+"""
+def iterateManifestPuzzles(manifestPath: str) -> Iterator[Tuple[str, WordSearch, str]]:
+    """
+    FUNCTION TO READ THE PUZZLES OF A MANIFEST ONE AT A TIME
+
+    A "paths" manifest has the path of one input file on each line, relative to the manifest's folder unless absolute,
+    and each puzzle's ID is its path as listed. A "jsonl" manifest has one puzzle on each line, as an object with a
+    "grid" list of lines, a "words" list of non-empty strings and an optional "id", which defaults to the line number.
+
+    :param manifestPath: The path to the manifest
+    :return: A generator of "(puzzleId, wordSearch, error)" tuples, one for each puzzle in the order of the manifest.
+             The word search is None and the error holds the reason when the puzzle could not be read.
+    """
+
+    manifestFormat: str = detectManifestFormat(manifestPath)
+    manifestDirectory: str = os.path.dirname(manifestPath)
+
+    with open(manifestPath, "r") as file:
+        for lineNumber, line in enumerate(file, 1):
+            entry: str = stripLineBreak(line).strip()
+            if len(entry) == 0:
+                continue
+
+            puzzleId: str = entry if manifestFormat == "paths" else str(lineNumber)
+            wordSearch: WordSearch = None
+            error: str = None
+
+            if manifestFormat == "paths":
+                try:
+                    wordSearch = WordSearch(os.path.join(manifestDirectory, entry))
+                except (InvalidWordSearchFile, OSError, UnicodeDecodeError) as readError:
+                    error = str(readError)
+            else:
+                #A puzzle line that can't be parsed is reported under its line number
+                try:
+                    puzzle = json.loads(entry)
+                    puzzleId = str(puzzle.get("id", lineNumber))
+                    if not isinstance(puzzle["grid"], list) or not all(isinstance(line, str) for line in puzzle["grid"]):
+                        raise ValueError("The grid must be a list of strings")
+                    wordSearch = WordSearch.fromGridLines(checkWordList(puzzle["words"]), puzzle["grid"])
+                except (ValueError, KeyError, TypeError, AttributeError, InvalidWordSearchFile) as readError:
+                    error = "{}: {}".format(type(readError).__name__, readError)
+
+            yield puzzleId, wordSearch, error
+
+"""
+########################################################################################################################
+FUNCTION TO RUN EVERY PUZZLE OF A MANIFEST, WRITING ALL THE RESULTS TO ONE FILE
+"""
+def runManifestBatch(manifestPath: str, outputPath: str, fullResultsFlag: bool = False, engine: str = "standard",
+                     memoise: bool = False, overlapping: bool = False, patterns: bool = False,
+                     ranking: str = "found", maxHits: int = None) -> Tuple[int, int]:
+    """
+    FUNCTION TO RUN EVERY PUZZLE OF A MANIFEST, WRITING ALL THE RESULTS TO ONE FILE
+
+    Each output line is the usual result or "not found" line, led by the puzzle's ID and a tab, so the results of every
+    puzzle go through a single buffered file rather than a file of their own. A puzzle that can't be read or searched
+    gets a single "ERROR:" line and does not stop the rest of the batch.
+
+    :param manifestPath: The path to the manifest, as read by "iterateManifestPuzzles"
+    :param outputPath: The path of the combined output file
+    :param fullResultsFlag: A boolean that, when True, writes every result of each word rather than just the first
+    :param engine: The name of the search engine to use, as accepted by "runLoadedWordSearch"
+    :param memoise: A boolean that, when True, shares a memo of results between the puzzles of the batch
+    :param overlapping: A boolean that, when True, also finds the instances that overlap an earlier instance
+    :param patterns: A boolean that, when True, treats every word as a wildcard pattern
+    :param ranking: The order to write the results of each word in, being one of "RESULT_RANKINGS"
+    :param maxHits: The most results to write for each word in full results mode
+    :return: A tuple of the number of puzzles in the manifest and the number of them that failed
+    """
+
+    #Refuse options that can't be used together once, rather than failing on every puzzle
+    checkSearchOptions(engine, memoise, overlapping=overlapping, ranked=ranking != "found" or maxHits is not None)
+
+    memo: SearchMemo = SearchMemo() if memoise else None
+    puzzleCount: int = 0
+    failedCount: int = 0
+
+    with open(outputPath, "w", buffering=OUTPUT_BUFFER_BYTES) as file:
+        for puzzleId, wordSearch, error in iterateManifestPuzzles(manifestPath):
+            puzzleCount += 1
+            linePrefix: str = puzzleId + "\t"
+
+            if wordSearch is not None:
+                try:
+                    if ranking != "found" or maxHits is not None:
+                        results = runRankedWordSearch(wordSearch, ranking, maxHits if fullResultsFlag else 1, engine,
+                                                      memo, overlapping, patterns)
+                    else:
+                        results = runLoadedWordSearch(wordSearch, engine, memo, firstOnly=not fullResultsFlag,
+                                                      overlapping=overlapping, patterns=patterns)
+                    writeResultLines(file, wordSearch.words, results, fullResultsFlag, linePrefix)
+                    continue
+                except InvalidSearchPattern as patternError:
+                    error = str(patternError)
+
+            file.write("{}ERROR: {}\n".format(linePrefix, error))
+            failedCount += 1
+
+    return puzzleCount, failedCount
@@ -0,0 +1,372 @@
+"""
+########################################################################################################################
+# PERSISTENT ON-DISK CACHE OF GRID SEARCH INDEXES AND DICTIONARY TRIES
+# Author:           Angus Berg
+# Date Created:     12/11/2021
+########################################################################################################################
+"""
+import os
+import stat
+import pickle
+import tempfile
+from array import array
+from bisect import bisect_right
+from typing import List, Tuple, Dict, Sequence
+from WordSearch_Classes import WordSearchResult, WordSearch, gridFingerprint
+from WordSearch_Functions import extractAllInstancesInLine, extractInstancesAcrossAllLines
+import WordSearch_Dictionary
+
+#The version of the index format. Cached indexes written with any other version are never used and are evicted
+GRID_INDEX_VERSION: int = 1
+
+#The extensions of the kinds of cached file; Grid indexes and dictionary tries
+CACHE_FILE_EXTENSIONS: Tuple[str, ...] = (".idx", ".trie")
+
+#The default limit on the total size of the cached files in a cache directory
+DEFAULT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+
+"""
+#######################################################################
+# CLASS TO HOLD AN N-GRAM INDEX OF THE LINES OF A GRID
+#######################################################################
+"""
+class GridIndex:
+    #Initialisation function to build the index from the lines of the grid
+    def __init__(self, lineFamilies: List[Tuple[str, Sequence[str]]], gramLength: int = 3):
+        """
+        CLASS TO HOLD AN N-GRAM INDEX OF THE LINES OF A GRID
+
+        Every line of every family is given an ID, in the order that the lines are searched, and each n-gram of the
+        lower-cased lines maps to the IDs of the lines that contain it.
+
+        :param lineFamilies: The families of lines of the grid, as returned by "WordSearch.lineFamilies"
+        :param gramLength: The number of characters in each n-gram
+        """
+
+        self.version: int = GRID_INDEX_VERSION
+        self.gramLength: int = gramLength
+        self.familySizes: List[int] = [len(lines) for _, lines in lineFamilies]
+        self.grams: Dict[str, array] = dict()
+
+        lineId: int = 0
+        for _, lines in lineFamilies:
+            for line in lines:
+                lowerLine: str = line.lower()
+                for gram in set(lowerLine[ii:ii + gramLength] for ii in range(len(lowerLine) - gramLength + 1)):
+                    postings = self.grams.get(gram)
+                    if postings is None:
+                        postings = self.grams[gram] = array("i")
+                    postings.append(lineId)
+                lineId += 1
+
+    #Function to find the lines that could contain a word
+    def candidateLines(self, word: str) -> List[int]:
+        """
+        METHOD TO FIND THE LINES THAT COULD CONTAIN A WORD, FORWARDS OR BACKWARDS
+
+        :param word: The word that will be searched for
+        :return: The sorted IDs of every line that contains all the n-grams of the word or of its reversal, or None if
+                 the word is too short to be looked up and every line has to be searched
+        """
+
+        lowerWord: str = word.lower()
+        if len(lowerWord) < self.gramLength:
+            return None
+
+        candidates = set()
+        for pattern in set([lowerWord, lowerWord[::-1]]):
+            #Intersect the postings from the rarest n-gram up, stopping early if nothing is left
+            postingLists: List[array] = sorted([self.grams.get(pattern[ii:ii + self.gramLength], array("i"))
+                                                for ii in range(len(pattern) - self.gramLength + 1)], key=len)
+            patternLines = set(postingLists[0])
+            for postings in postingLists[1:]:
+                if len(patternLines) == 0:
+                    break
+                patternLines.intersection_update(postings)
+            candidates.update(patternLines)
+
+        return sorted(candidates)
+
+"""
+########################################################################################################################
+FUNCTION TO FIND THE DIRECTORY THAT CACHED INDEXES ARE KEPT IN
+"""
+def defaultCacheDirectory() -> str:
+    """
+    FUNCTION TO FIND THE DIRECTORY THAT CACHED INDEXES ARE KEPT IN
+
+    :return: The directory named by the "WORDSEARCH_CACHE_DIR" environment variable if it is set, or otherwise a
+             "wordsearch" folder in the user's cache directory
+    """
+
+    return os.environ.get("WORDSEARCH_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "wordsearch")
+
+"""
+########################################################################################################################
+FUNCTION TO FIND THE CURRENT VERSION OF A KIND OF CACHED FILE
+"""
+def cacheFileVersion(extension: str) -> int:
+    """
+    FUNCTION TO FIND THE CURRENT VERSION OF A KIND OF CACHED FILE
+
+    :param extension: The extension of the kind of file, being one of "CACHE_FILE_EXTENSIONS"
+    :return: The version of the format that files of the kind are written with. Those of any other version are evicted.
+    """
+
+    return GRID_INDEX_VERSION if extension == ".idx" else WordSearch_Dictionary.DICTIONARY_TRIE_VERSION
+
+"""
+########################################################################################################################
+FUNCTION TO FIND THE PATH OF A CACHED FILE
+"""
+def cacheFilePath(fingerprint: str, extension: str, cacheDirectory: str) -> str:
+    """
+    FUNCTION TO FIND THE PATH OF A CACHED FILE
+
+    :param fingerprint: The fingerprint of the contents that the file was built from
+    :param extension: The extension of the kind of file, being one of "CACHE_FILE_EXTENSIONS"
+    :param cacheDirectory: The directory that cached files are kept in
+    :return: The path of the file, named by the fingerprint and the current version of its kind
+    """
+
+    return os.path.join(cacheDirectory, "{}.v{}{}".format(fingerprint, cacheFileVersion(extension), extension))
+
+"""
+########################################################################################################################
+FUNCTION TO CHECK THAT A CACHED FILE CAN ONLY HAVE BEEN WRITTEN BY THE CURRENT USER
+"""
+def isTrustedCacheFile(fileStat: os.stat_result) -> bool:
+    """
+    FUNCTION TO CHECK THAT A CACHED FILE CAN ONLY HAVE BEEN WRITTEN BY THE CURRENT USER
+
+    Cached files are unpickled, which can run code, so a file that another user owns or could have changed is never
+    loaded. Platforms without owner IDs, such as Windows, rely on the permissions of the user's own cache directory.
+
+    :param fileStat: The status of the open file, as given by "os.fstat"
+    :return: True if the file is owned by the current user and can't be written by its group or by other users
+    """
+
+    if not hasattr(os, "getuid"):
+        return True
+    return fileStat.st_uid == os.getuid() and not fileStat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+"""
+########################################################################################################################
+FUNCTION TO LOAD A CACHED FILE
+"""
+def loadCacheFile(cachePath: str, expectedClass: type) -> object:
+    """
+    FUNCTION TO LOAD A CACHED FILE, MARKING IT AS RECENTLY USED
+
+    :param cachePath: The path of the file, as given by "cacheFilePath"
+    :param expectedClass: The class that the cached object must be an instance of
+    :return: The cached object, or None if there isn't a usable one at the path, or it could have been written by
+             another user
+    """
+
+    try:
+        with open(cachePath, "rb") as file:
+            #Check the file that was opened rather than the path, so that it can't be swapped between check and load
+            if not isTrustedCacheFile(os.fstat(file.fileno())):
+                return None
+            cachedObject = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+
+    if not isinstance(cachedObject, expectedClass):
+        return None
+
+    #Mark the file as recently used, so that it is the last to be evicted
+    try:
+        os.utime(cachePath)
+    except OSError:
+        pass
+    return cachedObject
+
+"""
+########################################################################################################################
+FUNCTION TO SAVE A FILE TO THE CACHE, EVICTING THE LEAST RECENTLY USED FILES IF THE CACHE IS FULL
+"""
+def saveCacheFile(cachedObject: object, cachePath: str, maxBytes: int = DEFAULT_CACHE_MAX_BYTES) -> str:
+    """
+    FUNCTION TO SAVE A FILE TO THE CACHE, EVICTING THE LEAST RECENTLY USED FILES IF THE CACHE IS FULL
+
+    :param cachedObject: The object to be saved
+    :param cachePath: The path of the file, as given by "cacheFilePath"
+    :param maxBytes: The limit on the total size of the cached files in the directory
+    :return: The path that the object was saved to
+    """
+
+    #The directory is made private to the user, as are the temporary files that are moved into it
+    cacheDirectory: str = os.path.dirname(cachePath)
+    os.makedirs(cacheDirectory, mode=0o700, exist_ok=True)
+
+    #Write to a temporary file and move it into place, so that readers never see a partly written file
+    fileHandle, temporaryPath = tempfile.mkstemp(dir=cacheDirectory, suffix=".tmp")
+    try:
+        with os.fdopen(fileHandle, "wb") as file:
+            pickle.dump(cachedObject, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporaryPath, cachePath)
+    except BaseException:
+        os.remove(temporaryPath)
+        raise
+
+    evictCacheFiles(cacheDirectory, maxBytes, keepPath=cachePath)
+    return cachePath
+
+"""
+########################################################################################################################
+FUNCTION TO EVICT OUT OF DATE AND LEAST RECENTLY USED FILES FROM THE CACHE
+"""
+def evictCacheFiles(cacheDirectory: str, maxBytes: int, keepPath: str = None) -> List[str]:
+    """
+    FUNCTION TO EVICT OUT OF DATE AND LEAST RECENTLY USED FILES FROM THE CACHE
+
+    Every kind of file in "CACHE_FILE_EXTENSIONS" counts towards the same limit, so the grid indexes and dictionary tries
+    share one cache directory and its size cap.
+
+    :param cacheDirectory: The directory that cached files are kept in
+    :param maxBytes: The limit on the total size of the cached files in the directory
+    :param keepPath: An optional path to a file that should never be evicted, such as one that was just written
+    :return: The list of paths that were evicted
+    """
+
+    evictedPaths: List[str] = []
+    cachedFiles: List[Tuple[float, int, str]] = []
+
+    #Remove files written with another version of their format, and list the rest with their last use and size
+    for entry in os.scandir(cacheDirectory):
+        extension: str = os.path.splitext(entry.name)[1]
+        if extension not in CACHE_FILE_EXTENSIONS:
+            continue
+        elif not entry.name.endswith(".v{}{}".format(cacheFileVersion(extension), extension)):
+            evictedPaths.append(entry.path)
+        else:
+            stat = entry.stat()
+            cachedFiles.append((stat.st_mtime, stat.st_size, entry.path))
+
+    #Evict the least recently used files until the cache fits within its limit
+    totalBytes: int = sum(ff[1] for ff in cachedFiles)
+    for _, size, path in sorted(cachedFiles):
+        if totalBytes <= maxBytes:
+            break
+        if path == keepPath:
+            continue
+        evictedPaths.append(path)
+        totalBytes -= size
+
+    for path in evictedPaths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return evictedPaths
+
+"""
+########################################################################################################################
+FUNCTION TO LOAD A CACHED INDEX FOR A GRID
+"""
+def loadGridIndex(fingerprint: str, cacheDirectory: str) -> GridIndex:
+    """
+    FUNCTION TO LOAD A CACHED INDEX FOR A GRID
+
+    :param fingerprint: The fingerprint of the grid, as given by "gridFingerprint"
+    :param cacheDirectory: The directory that cached indexes are kept in
+    :return: The cached index, or None if there isn't a usable index for the grid in the cache
+    """
+
+    gridIndex: GridIndex = loadCacheFile(cacheFilePath(fingerprint, ".idx", cacheDirectory), GridIndex)
+    if gridIndex is None or getattr(gridIndex, "version", None) != GRID_INDEX_VERSION:
+        return None
+    return gridIndex
+
+"""
+########################################################################################################################
+FUNCTION TO SAVE AN INDEX TO THE CACHE, EVICTING THE LEAST RECENTLY USED FILES IF THE CACHE IS FULL
+"""
+def saveGridIndex(gridIndex: GridIndex, fingerprint: str, cacheDirectory: str,
+                  maxBytes: int = DEFAULT_CACHE_MAX_BYTES) -> str:
+    """
+    FUNCTION TO SAVE AN INDEX TO THE CACHE, EVICTING THE LEAST RECENTLY USED FILES IF THE CACHE IS FULL
+
+    :param gridIndex: The index to be saved
+    :param fingerprint: The fingerprint of the grid, as given by "gridFingerprint"
+    :param cacheDirectory: The directory that cached indexes are kept in
+    :param maxBytes: The limit on the total size of the cached files in the directory
+    :return: The path that the index was saved to
+    """
+
+    return saveCacheFile(gridIndex, cacheFilePath(fingerprint, ".idx", cacheDirectory), maxBytes)
+
+"""
+########################################################################################################################
+FUNCTION TO LOAD THE INDEX FOR A GRID FROM THE CACHE, BUILDING AND CACHING IT IF IT ISN'T THERE
+"""
+def loadOrBuildGridIndex(wordSearch: WordSearch, cacheDirectory: str = None,
+                         maxBytes: int = DEFAULT_CACHE_MAX_BYTES) -> GridIndex:
+    """
+    FUNCTION TO LOAD THE INDEX FOR A GRID FROM THE CACHE, BUILDING AND CACHING IT IF IT ISN'T THERE
+
+    :param wordSearch: The word search whose grid is to be indexed
+    :param cacheDirectory: The directory that cached indexes are kept in. Defaults to "defaultCacheDirectory".
+    :param maxBytes: The limit on the total size of the cached indexes in the directory
+    :return: The index for the grid of the word search
+    """
+
+    cacheDirectory = cacheDirectory or defaultCacheDirectory()
+    fingerprint: str = gridFingerprint(wordSearch.horizontalLines)
+
+    gridIndex: GridIndex = loadGridIndex(fingerprint, cacheDirectory)
+    if gridIndex is None:
+        gridIndex = GridIndex(wordSearch.lineFamilies())
+        saveGridIndex(gridIndex, fingerprint, cacheDirectory, maxBytes)
+
+    return gridIndex
+
+"""
+########################################################################################################################
+FUNCTION TO EXTRACT ALL WORDS FROM A LOADED WORD SEARCH, ONLY SEARCHING THE LINES THAT THE INDEX ALLOWS
+"""
+def runIndexedWordSearch(wordSearch: WordSearch, cacheDirectory: str = None, gridIndex: GridIndex = None) \
+        -> Dict[str, List[WordSearchResult]]:
+    """
+    FUNCTION TO EXTRACT ALL WORDS FROM A LOADED WORD SEARCH, ONLY SEARCHING THE LINES THAT THE INDEX ALLOWS
+
+    :param wordSearch: The word search information that has been loaded into the required class
+    :param cacheDirectory: The directory that cached indexes are kept in. Defaults to "defaultCacheDirectory".
+    :param gridIndex: An index of the grid that is already held in memory, in which case the cache is not used
+    :return: A dictionary, keyed by the words that were searched for in the grid and containing each of their list of
+             "WordSearchResult" objects.
+    """
+
+    gridIndex = gridIndex or loadOrBuildGridIndex(wordSearch, cacheDirectory)
+    lineFamilies = wordSearch.lineFamilies()
+    gridHeight: int = len(wordSearch.horizontalLines)
+
+    #Find the first line ID of each family, so that a line ID can be turned back into a family and line index
+    familyStarts: List[int] = [0]
+    for familySize in gridIndex.familySizes[:-1]:
+        familyStarts.append(familyStarts[-1] + familySize)
+
+    outputDict: Dict[str, List[WordSearchResult]] = dict()
+    for searchWord in wordSearch.words:
+        candidates: List[int] = gridIndex.candidateLines(searchWord)
+
+        #Words too short to be looked up are searched for on every line
+        if candidates is None:
+            outputDict[searchWord] = extractInstancesAcrossAllLines(
+                searchWord, wordSearch.horizontalLines, wordSearch.verticalLines, wordSearch.diagonalLines,
+                wordSearch.antiDiagonalLines)
+            continue
+
+        #The candidate IDs are sorted, so the lines are searched in the same order as the standard search
+        results: List[WordSearchResult] = []
+        for lineId in candidates:
+            familyIndex: int = bisect_right(familyStarts, lineId) - 1
+            direction, lines = lineFamilies[familyIndex]
+            lineNum: int = lineId - familyStarts[familyIndex]
+            results.extend(extractAllInstancesInLine(searchWord, lines[lineNum], lineNum, direction=direction,
+                                                     gridHeight=gridHeight))
+        outputDict[searchWord] = results
+
+    return outputDict
@@ -5,7 +5,224 @@
 # Date Created:     12/11/2021
 ########################################################################################################################
 """
-from typing import Tuple, List
+import os
+import mmap
+from array import array
+from collections import OrderedDict
+from typing import Tuple, List, Iterable, Iterator, Sequence, TextIO, Union, Optional
+
+#The families of lines that are searched, in the order that their results are reported
+LINE_DIRECTIONS: Tuple[str, ...] = ("horizontal", "vertical", "diagonal", "antidiagonal")
+
+"""
+########################################################################################################################
+FUNCTION TO FIND THE GRID POSITION OF THE FIRST CHARACTER OF A DIAGONAL LINE
+"""
+def diagonalLineOrigin(lineIndex: int, gridHeight: int, anti: bool = False) -> Tuple[int, int]:
+    """
+    FUNCTION TO FIND THE GRID POSITION OF THE FIRST CHARACTER OF A DIAGONAL LINE
+
+    Diagonal lines run from top-left to bottom-right and are numbered from the bottom-left corner of the grid to the
+    top-right corner. Anti-diagonal lines run from bottom-left to top-right and are numbered from the top-left corner of
+    the grid to the bottom-right corner.
+
+    :param lineIndex: The index of the diagonal line within its family
+    :param gridHeight: The number of horizontal lines in the grid
+    :param anti: A boolean that, when True, indicates that the line is an anti-diagonal rather than a diagonal
+    :return: A tuple of ints containing the (X, Y) position of the first character of the line
+    """
+
+    if anti:
+        return max(0, lineIndex - (gridHeight - 1)), min(lineIndex, gridHeight - 1)
+    else:
+        return max(0, lineIndex - (gridHeight - 1)), max(0, (gridHeight - 1) - lineIndex)
+
+"""
+########################################################################################################################
+FUNCTION TO CONVERT A POSITION ALONG A LINE OF THE GRID INTO AN (X, Y) GRID POSITION
+"""
+def lineOffsetToGrid(direction: str, lineIndex: int, offset: int, gridHeight: int = 0) -> Tuple[int, int]:
+    """
+    FUNCTION TO CONVERT A POSITION ALONG A LINE OF THE GRID INTO AN (X, Y) GRID POSITION
+
+    :param direction: The family of the line, being one of "horizontal", "vertical", "diagonal" or "antidiagonal"
+    :param lineIndex: The index of the line within its family
+    :param offset: The index of the character within the line
+    :param gridHeight: The number of horizontal lines in the grid. Only needed for the diagonal families.
+    :return: A tuple of ints containing the (X, Y) position of the character in the grid
+    """
+
+    if direction == "horizontal":
+        return offset, lineIndex
+    elif direction == "vertical":
+        return lineIndex, offset
+    elif direction == "diagonal":
+        originX, originY = diagonalLineOrigin(lineIndex, gridHeight, False)
+        return originX + offset, originY + offset
+    elif direction == "antidiagonal":
+        originX, originY = diagonalLineOrigin(lineIndex, gridHeight, True)
+        return originX + offset, originY - offset
+    else:
+        raise ValueError("The line direction \"{}\" is not recognised".format(direction))
+
+"""
+########################################################################################################################
+FUNCTION TO FIND THE LINES THAT PASS THROUGH A CELL OF THE GRID
+"""
+def cellLinePositions(x: int, y: int, gridHeight: int) -> List[Tuple[str, int, int]]:
+    """
+    FUNCTION TO FIND THE LINES THAT PASS THROUGH A CELL OF THE GRID, AND WHERE ALONG EACH LINE THE CELL IS
+
+    :param x: The X position of the cell
+    :param y: The Y position of the cell
+    :param gridHeight: The number of horizontal lines in the grid
+    :return: A list of "(direction, lineIndex, offset)" tuples, one for each family of lines in "LINE_DIRECTIONS"
+    """
+
+    #The diagonals are numbered as described by "diagonalLineOrigin", and both start at their left-most cell
+    diagonalIndex: int = x - y + gridHeight - 1
+    antiDiagonalIndex: int = x + y
+    return [("horizontal", y, x), ("vertical", x, y),
+            ("diagonal", diagonalIndex, x - diagonalLineOrigin(diagonalIndex, gridHeight, False)[0]),
+            ("antidiagonal", antiDiagonalIndex, x - diagonalLineOrigin(antiDiagonalIndex, gridHeight, True)[0])]
+
+"""
+########################################################################################################################
+FUNCTION TO BUILD ONE FAMILY OF DIAGONAL LINES FROM THE HORIZONTAL LINES OF A GRID
+"""
+def buildDiagonalLines(horizontalLines: List[str], anti: bool = False) -> List[str]:
+    """
+    FUNCTION TO BUILD ONE FAMILY OF DIAGONAL LINES FROM THE HORIZONTAL LINES OF A GRID
+
+    :param horizontalLines: The horizontal lines of the grid, all of which must be the same length
+    :param anti: A boolean that, when True, builds the anti-diagonal lines rather than the diagonal lines
+    :return: The list of diagonal lines, ordered and read as described by "diagonalLineOrigin"
+    """
+
+    #Nothing to build for an empty grid
+    if len(horizontalLines) == 0:
+        return []
+
+    #Slice each diagonal out of the flattened grid with a fixed stride rather than indexing character by character
+    height: int = len(horizontalLines)
+    width: int = len(horizontalLines[0])
+    flatGrid: str = "".join(horizontalLines)
+
+    return [sliceDiagonalLine(flatGrid, width, height, lineIndex, anti) for lineIndex in range(width + height - 1)]
+
+"""
+########################################################################################################################
+FUNCTION TO SLICE A SINGLE DIAGONAL LINE OUT OF A FLATTENED GRID
+"""
+def sliceDiagonalLine(flatGrid: Union[str, bytes], width: int, height: int, lineIndex: int, anti: bool = False,
+                      offset: int = 0, rowStride: int = None) -> Union[str, bytes]:
+    """
+    FUNCTION TO SLICE A SINGLE DIAGONAL LINE OUT OF A FLATTENED GRID
+
+    :param flatGrid: The horizontal lines of the grid joined together into one string or buffer of bytes
+    :param width: The number of characters in each horizontal line
+    :param height: The number of horizontal lines
+    :param lineIndex: The index of the diagonal line, as described by "diagonalLineOrigin"
+    :param anti: A boolean that, when True, slices an anti-diagonal line rather than a diagonal line
+    :param offset: The index in the flattened grid of the first character of the grid
+    :param rowStride: The distance between the starts of consecutive rows. Defaults to the width, for grids that are
+                      joined without line breaks.
+    :return: The characters of the diagonal line, in reading order
+    """
+
+    rowStride = width if rowStride is None else rowStride
+    originX, originY = diagonalLineOrigin(lineIndex, height, anti)
+    start: int = offset + originY * rowStride + originX
+
+    if anti:
+        length: int = min(width - originX, originY + 1)
+        stride: int = 1 - rowStride
+    else:
+        length: int = min(width - originX, height - originY)
+        stride: int = 1 + rowStride
+
+    #Slicing backwards to the start of the flattened grid needs an open-ended stop rather than an index of -1
+    if length == 1:
+        return flatGrid[start:start + 1]
+    else:
+        stop: int = start + (length - 1) * stride + (1 if stride > 0 else -1)
+        return flatGrid[start:stop if stop >= 0 else None:stride]
+
+"""
+########################################################################################################################
+FUNCTION TO CREATE A FINGERPRINT OF THE CONTENT OF A GRID
+"""
+def gridFingerprint(horizontalLines: Sequence[str]) -> str:
+    """
+    FUNCTION TO CREATE A FINGERPRINT OF THE CONTENT OF A GRID
+
+    :param horizontalLines: The horizontal lines of the grid
+    :return: A hexadecimal SHA-256 digest of the lines of the grid
+    """
+
+    #Imported here as hashing is only needed by the caches and the server, not by a single small search
+    import hashlib
+
+    digest = hashlib.sha256()
+    for line in horizontalLines:
+        digest.update(line.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+"""
+########################################################################################################################
+FUNCTION TO CREATE A FINGERPRINT OF THE CONTENT OF A FILE
+"""
+def fileFingerprint(path: str) -> str:
+    """
+    FUNCTION TO CREATE A FINGERPRINT OF THE CONTENT OF A FILE, WITH THE SAME HASH AS "gridFingerprint"
+
+    :param path: The path to the file
+    :return: A hexadecimal SHA-256 digest of the bytes of the file
+    """
+
+    #Imported here as hashing is only needed by the caches and the server, not by a single small search
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+"""
+########################################################################################################################
+FUNCTION TO DROP THE NEW LINE CHARACTER FROM THE END OF A LINE READ FROM FILE
+"""
+def stripLineBreak(line: str) -> str:
+    """
+    FUNCTION TO DROP THE NEW LINE CHARACTER FROM THE END OF A LINE READ FROM FILE
+
+    :param line: The line as read from file
+    :return: The line without its trailing new line character, if it had one
+    """
+
+    if len(line) > 0 and line[-1] in "\n":
+        return line[:-1]
+    else:
+        return line
+
+"""
+########################################################################################################################
+FUNCTION TO READ THE SEARCH WORDS FROM AN OPEN FILE ONE LINE AT A TIME
+"""
+def readWordLines(file: TextIO) -> Iterator[str]:
+    """
+    FUNCTION TO READ THE SEARCH WORDS FROM AN OPEN FILE ONE LINE AT A TIME
+
+    :param file: The open file, positioned after the break-line that follows the grid
+    :return: A generator of the words in the file, skipping any blank lines
+    """
+
+    for line in file:
+        lineWithoutBreak: str = stripLineBreak(line)
+        if len(lineWithoutBreak) > 0:
+            yield lineWithoutBreak
 
 """
 #######################################################################
@@ -21,6 +238,9 @@ class InvalidWordSearchFile(Exception):
 #######################################################################
 """
 class WordSearchResult:
+    #The fixed set of attributes, so that each result is held without an instance dictionary
+    __slots__ = ("word", "startX", "startY", "endX", "endY")
+
     #Initialisation function for the results class
     def __init__(self, word: str, startPosition: Tuple[int, int], endPosition: Tuple[int, int]):
         """
@@ -51,6 +271,443 @@ class WordSearchResult:
         endPart = "(" + str(self.endX + offset) + ", " + str(self.endY + offset) + ")"
         return self.word + " " + startPart + " " + endPart
 
+"""
+#######################################################################
+# CLASS TO HOLD ALL THE RESULTS OF ONE WORD AS COLUMNS OF COORDINATES
+#######################################################################
+"""
+class ColumnarResults:
+    #Initialisation function to create the empty columns
+    def __init__(self, word: str):
+        """
+        CLASS TO HOLD ALL THE RESULTS OF ONE WORD AS COLUMNS OF COORDINATES
+
+        The word is held once and the coordinates in typed arrays, taking 16 bytes a result rather than an object each.
+        The container can be used in place of a list of "WordSearchResult" objects; Indexing and iterating it builds
+        the objects on demand.
+
+        :param word: The upper-case word that every result is for
+        """
+
+        self.word: str = word
+        self.startXs: array = array("i")
+        self.startYs: array = array("i")
+        self.endXs: array = array("i")
+        self.endYs: array = array("i")
+
+    #Function to add a result to the columns
+    def append(self, startPosition: Tuple[int, int], endPosition: Tuple[int, int]):
+        """
+        METHOD TO ADD A RESULT TO THE END OF THE COLUMNS
+
+        :param startPosition: A tuple of ints containing the (X, Y) position of the first letter of the word
+        :param endPosition: A tuple of ints containing the (X, Y) position of the last letter of the word
+        :return: No return, but the result is added
+        """
+
+        self.startXs.append(startPosition[0])
+        self.startYs.append(startPosition[1])
+        self.endXs.append(endPosition[0])
+        self.endYs.append(endPosition[1])
+
+    def __len__(self) -> int:
+        return len(self.startXs)
+
+    def __getitem__(self, index: int) -> WordSearchResult:
+        if isinstance(index, slice):
+            return [self[ii] for ii in range(*index.indices(len(self)))]
+        return WordSearchResult(self.word, (self.startXs[index], self.startYs[index]),
+                                (self.endXs[index], self.endYs[index]))
+
+    def __iter__(self) -> Iterator[WordSearchResult]:
+        for index in range(len(self)):
+            yield self[index]
+
+    #Function to format every result as an output line without building the result objects
+    def outputLines(self, offset: int = 0) -> Iterator[str]:
+        """
+        METHOD TO FORMAT EVERY RESULT AS AN OUTPUT LINE WITHOUT BUILDING THE RESULT OBJECTS
+
+        :param offset: An optional number by which to offset the coordinates
+        :return: A generator of the lines, each exactly as "WordSearchResult.createOutputLine" would give it
+        """
+
+        for startX, startY, endX, endY in zip(self.startXs, self.startYs, self.endXs, self.endYs):
+            yield "{} ({}, {}) ({}, {})".format(self.word, startX + offset, startY + offset, endX + offset,
+                                                endY + offset)
+
+"""
+#######################################################################
+# CLASS TO MEMOISE THE RESULTS OF SEARCHING FOR WORDS IN GRIDS
+#######################################################################
+"""
+class SearchMemo:
+    #Initialisation function for the memo
+    def __init__(self, maxEntries: int = 4096):
+        """
+        CLASS TO MEMOISE THE RESULTS OF SEARCHING FOR WORDS IN GRIDS
+
+        Results are keyed by the fingerprint of the grid and the lower-cased word, with a word and its reversal sharing
+        a single entry, so that case variants and reversals of a word that has already been searched for are served
+        without searching again. The least recently used entries are dropped once the memo is full.
+
+        :param maxEntries: The largest number of (grid, word) entries that the memo holds
+        """
+
+        self.maxEntries: int = maxEntries
+        self.entries: OrderedDict = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    #Function to find the results of a word in a grid from the memo
+    def lookup(self, fingerprint: str, word: str) -> Optional[List[WordSearchResult]]:
+        """
+        METHOD TO FIND THE RESULTS OF A WORD IN A GRID FROM THE MEMO
+
+        :param fingerprint: The fingerprint of the grid, as given by "gridFingerprint"
+        :param word: The word that was searched for
+        :return: The list of results for the word, in the order that the search finds them, or None on a miss
+        """
+
+        lowerWord: str = word.lower()
+        key: Tuple[str, str] = (fingerprint, min(lowerWord, lowerWord[::-1]))
+        lineResults = self.entries.get(key)
+        if lineResults is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        if lowerWord != key[1]:
+            lineResults = reverseLineResults(lineResults)
+        return [result for _, results in lineResults for result in results]
+
+    #Function to add the results of a word in a grid to the memo
+    def store(self, fingerprint: str, word: str, lineResults: List[Tuple[str, List[WordSearchResult]]]):
+        """
+        METHOD TO ADD THE RESULTS OF A WORD IN A GRID TO THE MEMO
+
+        :param fingerprint: The fingerprint of the grid, as given by "gridFingerprint"
+        :param word: The word that was searched for
+        :param lineResults: A list of "(direction, results)" tuples, one for each line with at least one result, in the
+                            order that the lines were searched
+        :return: No return, but the results are added to the memo and the least recently used entry may be dropped
+        """
+
+        lowerWord: str = word.lower()
+        key: Tuple[str, str] = (fingerprint, min(lowerWord, lowerWord[::-1]))
+        self.entries[key] = lineResults if lowerWord == key[1] else reverseLineResults(lineResults)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.maxEntries:
+            self.entries.popitem(last=False)
+
+"""
+########################################################################################################################
+FUNCTION TO TURN THE RESULTS OF A WORD, GROUPED BY LINE, INTO THE RESULTS OF THE REVERSED WORD
+"""
+def reverseLineResults(lineResults: List[Tuple[str, List[WordSearchResult]]]) \
+        -> List[Tuple[str, List[WordSearchResult]]]:
+    """
+    FUNCTION TO TURN THE RESULTS OF A WORD, GROUPED BY LINE, INTO THE RESULTS OF THE REVERSED WORD
+
+    Each line lists its backward results before its forward results. The forward results of a word are the backward
+    results of its reversal and the other way around, so the two groups swap places and every result swaps its ends.
+
+    :param lineResults: A list of "(direction, results)" tuples, one for each line with at least one result
+    :return: The list of "(direction, results)" tuples for the reversed word
+    """
+
+    reversedLines: List[Tuple[str, List[WordSearchResult]]] = []
+    for direction, results in lineResults:
+        #A result reads along its line if its end is further along the line than its start
+        if direction == "vertical":
+            forwardFlags: List[bool] = [rr.endY > rr.startY for rr in results]
+        else:
+            forwardFlags: List[bool] = [rr.endX > rr.startX for rr in results]
+
+        reversedResults: List[WordSearchResult] = []
+        for forwardFirst in [True, False]:
+            reversedResults.extend([WordSearchResult(rr.word[::-1], (rr.endX, rr.endY), (rr.startX, rr.startY))
+                                    for rr, ff in zip(results, forwardFlags) if ff == forwardFirst])
+        reversedLines.append((direction, reversedResults))
+
+    return reversedLines
+
+"""
+#######################################################################
+# CLASS TO LAZILY RE-READ THE WORD LIST OF A WORD SEARCH FILE
+#######################################################################
+"""
+class StreamedWordList:
+    #Initialisation function for the streamed word list
+    def __init__(self, path: str, startPosition: int):
+        """
+        CLASS TO LAZILY RE-READ THE WORD LIST OF A WORD SEARCH FILE
+
+        Each iteration re-opens the file and reads the words one line at a time, so the words can be searched for while
+        the rest of the list is still being read and the list is never held in memory.
+
+        :param path: The path to the file that contains the word search
+        :param startPosition: The position in the file, as given by "tell", of the line after the grid's break-line
+        """
+
+        self.path: str = path
+        self.startPosition: int = startPosition
+
+    #Function to iterate over the words in the file
+    def __iter__(self) -> Iterator[str]:
+        with open(self.path, "r") as file:
+            file.seek(self.startPosition)
+            yield from readWordLines(file)
+
+"""
+#######################################################################
+# CLASS TO HOLD A GRID AS A SINGLE CONTIGUOUS STRING WITH A ROW STRIDE
+#######################################################################
+"""
+class CompactGrid:
+    #Initialisation function to flatten the grid
+    def __init__(self, horizontalLines: List[str]):
+        """
+        CLASS TO HOLD A GRID AS A SINGLE CONTIGUOUS STRING WITH A ROW STRIDE
+
+        The rows, columns and diagonals of the grid are sliced out of the flattened grid only when they are asked for,
+        so no second copy of the grid is held in memory.
+
+        :param horizontalLines: The horizontal lines of the grid, all of which must be the same length
+        """
+
+        self.cells: Union[str, bytes, bytearray, List[str]] = "".join(horizontalLines)
+        self.height: int = len(horizontalLines)
+        self.width: int = len(horizontalLines[0]) if self.height > 0 else 0
+        self.offset: int = 0
+        self.rowStride: int = self.width
+        self.createViews()
+
+    #Function to create the views of each family of lines
+    def createViews(self):
+        """
+        METHOD TO CREATE THE VIEWS OF EACH FAMILY OF LINES, WHICH CAN BE USED IN PLACE OF LISTS OF LINES
+
+        :return: No return, but the "rows", "columns", "diagonals" and "antiDiagonals" views are set on the grid
+        """
+
+        self.rows: GridLineView = GridLineView(self, "horizontal")
+        self.columns: GridLineView = GridLineView(self, "vertical")
+        self.diagonals: GridLineView = GridLineView(self, "diagonal")
+        self.antiDiagonals: GridLineView = GridLineView(self, "antidiagonal")
+
+    #Function to count the lines in one family of lines
+    def lineCount(self, direction: str) -> int:
+        """
+        METHOD TO COUNT THE LINES IN ONE FAMILY OF LINES
+
+        :param direction: The family of lines, being one of "horizontal", "vertical", "diagonal" or "antidiagonal"
+        :return: The number of lines in the family
+        """
+
+        if direction == "horizontal":
+            return self.height
+        elif direction == "vertical":
+            return self.width
+        else:
+            return self.width + self.height - 1 if self.height > 0 else 0
+
+    #Function to slice a single line out of the grid
+    def line(self, direction: str, lineIndex: int) -> str:
+        """
+        METHOD TO SLICE A SINGLE LINE OUT OF THE GRID
+
+        :param direction: The family of the line, being one of "horizontal", "vertical", "diagonal" or "antidiagonal"
+        :param lineIndex: The index of the line within its family
+        :return: The characters of the line, in reading order
+        """
+
+        if direction == "horizontal":
+            lineStart: int = self.offset + lineIndex * self.rowStride
+            line = self.cells[lineStart:lineStart + self.width]
+        elif direction == "vertical":
+            line = self.cells[self.offset + lineIndex:self.offset + self.height * self.rowStride:self.rowStride]
+        else:
+            line = sliceDiagonalLine(self.cells, self.width, self.height, lineIndex, direction == "antidiagonal",
+                                     self.offset, self.rowStride)
+
+        #Grids held as bytes are only ever plain ASCII, so each byte decodes to exactly one character
+        if isinstance(line, str):
+            return line
+        elif isinstance(line, list):
+            return "".join(line)
+        else:
+            return line.decode("ascii")
+
+    #Function to change cells of the grid
+    def setCells(self, edits: Iterable[Tuple[int, int, str]]):
+        """
+        METHOD TO CHANGE CELLS OF THE GRID
+
+        The first edit turns the flattened string into a "bytearray", or into a list of characters if the grid or an
+        edit isn't plain ASCII. That copies the grid once, and from then on every edit is a single assignment, so an
+        edit costs the same however large the grid is. Grids mapped in place from a file can't be changed.
+
+        :param edits: The "(X, Y, character)" changes to make, in order. Each must be a single character in the grid.
+        :return: No return, but the lines sliced from the grid from now on include the new characters
+        """
+
+        if isinstance(self.cells, (bytes, mmap.mmap)):
+            raise ValueError("A grid that is mapped in place from its file can't be edited")
+
+        for x, y, character in edits:
+            if isinstance(self.cells, str):
+                self.cells = bytearray(self.cells, "ascii") if self.cells.isascii() and character.isascii() else \
+                    list(self.cells)
+            elif isinstance(self.cells, bytearray) and not character.isascii():
+                self.cells = list(self.cells.decode("ascii"))
+
+            cellIndex: int = self.offset + y * self.rowStride + x
+            self.cells[cellIndex] = ord(character) if isinstance(self.cells, bytearray) else character
+
+"""
+#######################################################################
+# CLASS TO HOLD A GRID IN PLACE IN A MEMORY MAPPED INPUT FILE
+#######################################################################
+"""
+class MappedGrid(CompactGrid):
+    #Initialisation function to wrap the mapped region of the file
+    def __init__(self, buffer: mmap.mmap, offset: int, width: int, height: int, rowStride: int):
+        """
+        CLASS TO HOLD A GRID IN PLACE IN A MEMORY MAPPED INPUT FILE
+
+        The lines of the grid are sliced straight out of the mapped file, so the grid is never read into memory as a
+        whole and every process that maps the same file shares the same page-cache pages.
+
+        :param buffer: The memory map of the whole input file
+        :param offset: The position in the file of the first character of the grid
+        :param width: The number of characters in each row of the grid
+        :param height: The number of rows in the grid
+        :param rowStride: The distance in bytes between the starts of consecutive rows, including the line break
+        """
+
+        self.cells: mmap.mmap = buffer
+        self.offset: int = offset
+        self.width: int = width
+        self.height: int = height
+        self.rowStride: int = rowStride
+        self.createViews()
+
+    #Function to release the memory map once the grid is no longer needed
+    def close(self):
+        """
+        METHOD TO RELEASE THE MEMORY MAP ONCE THE GRID IS NO LONGER NEEDED
+
+        :return: No return, but the lines of the grid can no longer be read
+        """
+
+        if not self.cells.closed:
+            self.cells.close()
+
+    def __enter__(self) -> "MappedGrid":
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+"""
+########################################################################################################################
+FUNCTION TO MEMORY MAP AN INPUT FILE AND LOCATE THE GRID WITHIN IT
+"""
+def mapGridFromFile(path: str) -> Tuple[MappedGrid, int]:
+    """
+    FUNCTION TO MEMORY MAP AN INPUT FILE AND LOCATE THE GRID WITHIN IT
+
+    The grid and the blank line that follows it are found by scanning the raw bytes of the file, without decoding it.
+
+    :param path: The path to the text or text-like file that contains the word search
+    :return: A tuple of the mapped grid and the position in the file at which the word list starts. The grid is None if
+             it can't be mapped in place, because it has non-ASCII characters or mixed line breaks.
+    """
+
+    #Map the whole file for reading; The map stays valid once the file itself has been closed
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            raise InvalidWordSearchFile("There was no content to be read from the provided input file")
+        buffer: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    #Close the map again if the file turns out not to hold a valid grid
+    try:
+        #Skip any blank lines ahead of the grid
+        fileSize: int = len(buffer)
+        gridStart: int = 0
+        while gridStart < fileSize and buffer[gridStart] in b"\r\n":
+            gridStart += 1
+        if gridStart == fileSize:
+            raise InvalidWordSearchFile("There was no content to be read from the provided input file")
+
+        #Use the first row to find the width of the grid and the style of line break
+        firstBreak: int = buffer.find(b"\n", gridStart)
+        if firstBreak == -1:
+            raise InvalidWordSearchFile("No words could be found in the file after the Word Search Grid was extracted")
+        breakLength: int = 2 if buffer[firstBreak - 1] == ord("\r") else 1
+        width: int = firstBreak - gridStart - (breakLength - 1)
+
+        #Walk the rows until the blank break-line, checking the length and characters of each row as it is found
+        height: int = 0
+        rowStart: int = gridStart
+        while rowStart < fileSize:
+            rowBreak: int = buffer.find(b"\n", rowStart)
+            rowBreak = fileSize if rowBreak == -1 else rowBreak
+            rowLength: int = rowBreak - rowStart - \
+                (1 if rowBreak > rowStart and buffer[rowBreak - 1] == ord("\r") else 0)
+
+            if rowLength == 0:
+                break
+            elif rowLength != width:
+                raise InvalidWordSearchFile("The lines of the Word Search Grid provided are not all the same length")
+            elif rowBreak - rowStart != width + breakLength - 1 or not buffer[rowStart:rowStart + width].isascii():
+                #The grid can't be read in place, so release the map before falling back to reading the file
+                buffer.close()
+                return None, 0
+
+            height += 1
+            rowStart = rowBreak + 1
+    except Exception:
+        buffer.close()
+        raise
+
+    return MappedGrid(buffer, gridStart, width, height, width + breakLength), min(rowStart, fileSize)
+
+"""
+#######################################################################
+# CLASS TO PRESENT ONE FAMILY OF LINES OF A COMPACT GRID AS A SEQUENCE
+#######################################################################
+"""
+class GridLineView:
+    #Initialisation function for the view
+    def __init__(self, grid: CompactGrid, direction: str):
+        """
+        CLASS TO PRESENT ONE FAMILY OF LINES OF A COMPACT GRID AS A SEQUENCE OF STRINGS
+
+        :param grid: The compact grid that the lines are sliced from
+        :param direction: The family of lines, being one of "horizontal", "vertical", "diagonal" or "antidiagonal"
+        """
+
+        self.grid: CompactGrid = grid
+        self.direction: str = direction
+
+    def __len__(self) -> int:
+        return self.grid.lineCount(self.direction)
+
+    def __getitem__(self, lineIndex: int) -> str:
+        if lineIndex < 0:
+            lineIndex += len(self)
+        if not 0 <= lineIndex < len(self):
+            raise IndexError("The line index {} is outside of the grid".format(lineIndex))
+        return self.grid.line(self.direction, lineIndex)
+
+    def __iter__(self) -> Iterator[str]:
+        for lineIndex in range(len(self)):
+            yield self.grid.line(self.direction, lineIndex)
+
 """
 #######################################################################
 # CLASS TO HOLD THE WORD SEARCH ITSELF. PARSES OUT FROM FILE
@@ -58,51 +715,204 @@ class WordSearchResult:
 """
 class WordSearch:
     #Initialisation function to build the word search from the input class
-    def __init__(self, path: str):
+    def __init__(self, path: str, streamWords: bool = False, compactGrid: bool = False, memoryMapped: bool = False,
+                 requireWords: bool = True):
         """
         CLASS TO HOLD A WORD SEARCH AS EXTRACTED FROM INPUT FILE
 
         :param path: The path to the text or text-like file that contains the word search
+        :param streamWords: A boolean that, when True, leaves the words in the file and reads them lazily each time the
+                            word list is iterated, rather than holding them all in memory. The grid is then held as a
+                            compact grid too, as streaming is for files too large to hold in full.
+        :param compactGrid: A boolean that, when True, holds the grid as a single "CompactGrid" and slices its lines
+                            out when they are used, rather than building every family of lines up front.
+        :param memoryMapped: A boolean that, when True, maps the file into memory and reads the lines of the grid
+                             straight out of the map. Grids that can't be mapped in place are read as compact grids.
+        :param requireWords: A boolean that, when False, allows the file to hold just a grid, for searches that take
+                             their words from elsewhere such as a dictionary.
         """
 
         #Initialise the tracking variables
-        breakLineFound: bool = False
         searchLines: List[str] = []
-        searchWords: List[str] = []
+        mappedGrid: MappedGrid = None
+        if memoryMapped:
+            mappedGrid, wordsPosition = mapGridFromFile(path)
 
-        #Open the file at the path and read in the lines, segmenting them into the required categories
+        #Open the file at the path and read the grid in line by line, stopping at the break-line
         with open(path, "r") as file:
-            lines = file.readlines()
-
-        for line in lines:
-            #Drop the new line character from the line
-            if len(line) == 0:
-                lineWithoutBreak: str = line
-            elif line[-1] in "\n":
-                lineWithoutBreak: str = line[:-1]
-            else:
-                lineWithoutBreak: str = line
-
-            #Branch to the correct handling of the line
-            if len(lineWithoutBreak) == 0:
-                #No content in line; If there is content in the search lines, the break-line has been found
-                breakLineFound = (len(searchLines) > 0)
-            elif breakLineFound:
-                #If this line is after the break-line, it is a word for the search; append to the list
-                searchWords.append(lineWithoutBreak)
-            else:
+            if mappedGrid is not None:
+                #The grid has already been found in the mapped file; Only the word list is read through the file
+                file.seek(wordsPosition)
+
+            while mappedGrid is None:
+                line: str = file.readline()
+                lineWithoutBreak: str = stripLineBreak(line)
+
+                if len(line) == 0 or (len(lineWithoutBreak) == 0 and len(searchLines) > 0):
+                    #End of file reached, or no content in line after the grid; The break-line has been found
+                    break
+                elif len(lineWithoutBreak) == 0:
+                    #Blank lines ahead of the grid are skipped
+                    continue
+                elif len(searchLines) > 0 and len(lineWithoutBreak) != len(searchLines[0]):
+                    #Check each line of the grid against the first as it is read, so that a bad file fails early
+                    raise InvalidWordSearchFile("The lines of the Word Search Grid provided are not all the same length")
+
                 #If this line has content and is before the break-line, it is a line of the search; append to the list
                 searchLines.append(lineWithoutBreak)
 
-        #Check that for misformatting and raise an error if the file read in is invalid
-        if len(searchLines) == 0:
-            raise InvalidWordSearchFile("There was no content to be read from the provided input file")
-        elif len(searchWords) == 0:
+            #Check that for misformatting and raise an error if the file read in is invalid
+            if mappedGrid is None and len(searchLines) == 0:
+                raise InvalidWordSearchFile("There was no content to be read from the provided input file")
+
+            #Either read the words in now or keep a re-readable view of them starting after the break-line
+            if streamWords:
+                searchWords = StreamedWordList(path, file.tell())
+                firstWord: str = next(readWordLines(file), None)
+            else:
+                searchWords: List[str] = list(readWordLines(file))
+                firstWord: str = searchWords[0] if len(searchWords) > 0 else None
+
+        if firstWord is None and requireWords:
+            if mappedGrid is not None:
+                mappedGrid.close()
             raise InvalidWordSearchFile("No words could be found in the file after the Word Search Grid was extracted")
-        elif len(set([len(line) for line in searchLines])) != 1:
+
+        self.words: Iterable[str] = searchWords
+
+        #Choose how the grid is held; Mapped grids that couldn't be mapped in place fall back to a compact grid, and
+        #streamed files don't build every family of lines up front either
+        if mappedGrid is not None:
+            self.grid: CompactGrid = mappedGrid
+        elif compactGrid or memoryMapped or streamWords:
+            self.grid: CompactGrid = CompactGrid(searchLines)
+        else:
+            self.grid: CompactGrid = None
+
+        if self.grid is not None:
+            #Hold the grid's views of its lines in place of the lists of lines
+            self.horizontalLines: Sequence[str] = self.grid.rows
+            self.verticalLines: Sequence[str] = self.grid.columns
+            self.diagonalLines: Sequence[str] = self.grid.diagonals
+            self.antiDiagonalLines: Sequence[str] = self.grid.antiDiagonals
+        else:
+            #Declare the needed values for this class, creating the vertical lines by zipping the horizontal lines
+            self.horizontalLines: Sequence[str] = searchLines
+            self.verticalLines: Sequence[str] = ["".join(list(zz)) for zz in zip(*searchLines)]
+
+            #Build both families of diagonal lines once, so that they are shared by every word that is searched for
+            self.diagonalLines: Sequence[str] = buildDiagonalLines(searchLines, False)
+            self.antiDiagonalLines: Sequence[str] = buildDiagonalLines(searchLines, True)
+
+    #Alternative constructor to rebuild a word search from lines that have already been extracted
+    @classmethod
+    def fromLineFamilies(cls, words: List[str], horizontalLines: List[str], verticalLines: List[str],
+                         diagonalLines: List[str], antiDiagonalLines: List[str]) -> "WordSearch":
+        """
+        METHOD TO REBUILD A WORD SEARCH FROM LINES THAT HAVE ALREADY BEEN EXTRACTED, WITHOUT READING A FILE
+
+        :param words: The list of words to be searched for
+        :param horizontalLines: The horizontal lines of the grid
+        :param verticalLines: The vertical lines of the grid
+        :param diagonalLines: The top-left to bottom-right diagonal lines of the grid
+        :param antiDiagonalLines: The bottom-left to top-right diagonal lines of the grid
+        :return: A word search holding the provided lines and words
+        """
+
+        wordSearch: WordSearch = cls.__new__(cls)
+        wordSearch.grid = None
+        wordSearch.words = words
+        wordSearch.horizontalLines = horizontalLines
+        wordSearch.verticalLines = verticalLines
+        wordSearch.diagonalLines = diagonalLines
+        wordSearch.antiDiagonalLines = antiDiagonalLines
+        return wordSearch
+
+    #Alternative constructor to build a word search from the lines of a grid held in memory
+    @classmethod
+    def fromGridLines(cls, words: List[str], gridLines: List[str], compactGrid: bool = False) -> "WordSearch":
+        """
+        METHOD TO BUILD A WORD SEARCH FROM THE HORIZONTAL LINES OF A GRID HELD IN MEMORY, WITHOUT READING A FILE
+
+        :param words: The list of words to be searched for
+        :param gridLines: The horizontal lines of the grid, all of which must be the same length
+        :param compactGrid: A boolean that, when True, holds the grid as a single "CompactGrid"
+        :return: A word search holding the grid and words
+        """
+
+        #Check the grid the same way that a file is checked when it is read
+        if len(gridLines) == 0 or len(gridLines[0]) == 0:
+            raise InvalidWordSearchFile("There was no content to be read from the provided input file")
+        elif any(len(line) != len(gridLines[0]) for line in gridLines):
             raise InvalidWordSearchFile("The lines of the Word Search Grid provided are not all the same length")
 
-        #Declare the needed values for this class, creating the vertical lines by zipping the horizontal lines
-        self.words: List[str] = searchWords
-        self.horizontalLines: List[str] = searchLines
-        self.verticalLines: List[str] = ["".join(list(zz)) for zz in zip(*searchLines)]
\ No newline at end of file
+        if compactGrid:
+            grid: CompactGrid = CompactGrid(gridLines)
+            wordSearch: WordSearch = cls.fromLineFamilies(words, grid.rows, grid.columns, grid.diagonals,
+                                                          grid.antiDiagonals)
+            wordSearch.grid = grid
+            return wordSearch
+
+        return cls.fromLineFamilies(words, list(gridLines), ["".join(list(zz)) for zz in zip(*gridLines)],
+                                    buildDiagonalLines(gridLines, False), buildDiagonalLines(gridLines, True))
+
+    #Function to list the families of lines in the word search in the order that they are searched
+    def lineFamilies(self) -> List[Tuple[str, Sequence[str]]]:
+        """
+        METHOD TO LIST THE FAMILIES OF LINES IN THE WORD SEARCH IN THE ORDER THAT THEY ARE SEARCHED
+
+        :return: A list of "(direction, lines)" tuples, one for each of the directions in "LINE_DIRECTIONS"
+        """
+
+        return [("horizontal", self.horizontalLines), ("vertical", self.verticalLines),
+                ("diagonal", self.diagonalLines), ("antidiagonal", self.antiDiagonalLines)]
+
+    #Function to map a character of one of the lines of the word search back to its position in the grid
+    def gridCoordinates(self, direction: str, lineIndex: int, offset: int) -> Tuple[int, int]:
+        """
+        METHOD TO MAP A CHARACTER OF ONE OF THE LINES OF THE WORD SEARCH BACK TO ITS POSITION IN THE GRID
+
+        :param direction: The family of the line, being one of "horizontal", "vertical", "diagonal" or "antidiagonal"
+        :param lineIndex: The index of the line within its family
+        :param offset: The index of the character within the line
+        :return: A tuple of ints containing the (X, Y) position of the character in the grid
+        """
+
+        return lineOffsetToGrid(direction, lineIndex, offset, len(self.horizontalLines))
+
+    #Function to change cells of the grid, updating only the lines that pass through them
+    def setCells(self, edits: Iterable[Tuple[int, int, str]]) -> List[Tuple[str, int]]:
+        """
+        METHOD TO CHANGE CELLS OF THE GRID, UPDATING ONLY THE ROW, COLUMN AND DIAGONAL LINES THAT PASS THROUGH THEM
+
+        :param edits: The "(X, Y, character)" changes to make, in order
+        :return: A list of the "(direction, lineIndex)" lines that were changed, in the order that they are searched
+        """
+
+        gridHeight: int = len(self.horizontalLines)
+        gridWidth: int = len(self.verticalLines)
+        edits = list(edits)
+        changedLines = set()
+
+        #Check every edit before making any of them, so that a bad edit leaves the grid as it was
+        for x, y, character in edits:
+            if len(character) != 1:
+                raise ValueError("A cell must be set to a single character, not \"{}\"".format(character))
+            elif not (0 <= x < gridWidth and 0 <= y < gridHeight):
+                raise IndexError("The cell ({}, {}) is outside of the grid".format(x, y))
+
+        if self.grid is not None:
+            #The views slice their lines from the grid, so only the grid itself needs to change
+            self.grid.setCells(edits)
+
+        familyLines = dict(self.lineFamilies()) if self.grid is None else None
+        for x, y, character in edits:
+            positions: List[Tuple[str, int, int]] = cellLinePositions(x, y, gridHeight)
+            if familyLines is not None:
+                for direction, lineIndex, offset in positions:
+                    line: str = familyLines[direction][lineIndex]
+                    familyLines[direction][lineIndex] = line[:offset] + character + line[offset + 1:]
+
+            changedLines.update((direction, lineIndex) for direction, lineIndex, _ in positions)
+
+        return sorted(changedLines, key=lambda cc: (LINE_DIRECTIONS.index(cc[0]), cc[1]))
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""
+########################################################################################################################
+# BULK SEARCHING OF A GRID FOR EVERY WORD OF A LARGE DICTIONARY
+# Author:           Angus Berg
+# Date Created:     12/11/2021
+########################################################################################################################
+"""
+from array import array
+from typing import List, Tuple, Dict, Iterable
+from WordSearch_Classes import WordSearchResult, WordSearch, lineOffsetToGrid, readWordLines, fileFingerprint
+
+#The version of the trie format. Cached tries written with any other version are never used and are evicted
+DICTIONARY_TRIE_VERSION: int = 2
+
+"""
+#######################################################################
+# CLASS TO HOLD A DICTIONARY OF WORDS AS A PREFIX TRIE
+#######################################################################
+"""
+class DictionaryTrie:
+    #Initialisation function to build the trie from the words of the dictionary
+    def __init__(self, words: Iterable[str]):
+        """
+        CLASS TO HOLD A DICTIONARY OF WORDS AS A PREFIX TRIE
+
+        The nodes are numbered breadth first, the root being 0, and each is reached by one edge, so that edge "i" leads
+        to node "i + 1". The edges of each node sit next to each other, from "firstEdges[node]" up to
+        "firstEdges[node + 1]", and "edgeCharacters" holds their characters as one string. A walk along a line then
+        finds each child with one search of a few characters, with no substrings built, and stops as soon as the
+        characters read are no word's prefix. The whole trie is held in a string and two typed arrays, about 9 bytes a
+        node. Words that differ only in case are held once, under the first spelling in the dictionary.
+
+        :param words: The words of the dictionary
+        """
+
+        self.version: int = DICTIONARY_TRIE_VERSION
+        self.words: List[str] = []
+
+        #Number the distinct lower-case words by their first spelling
+        wordIndexes: Dict[str, int] = dict()
+        for word in words:
+            lowerWord: str = word.lower()
+            if len(lowerWord) > 0 and lowerWord not in wordIndexes:
+                wordIndexes[lowerWord] = len(self.words)
+                self.words.append(word)
+
+        #Build the trie one depth at a time. In sorted order, the children of each depth come grouped by their parent
+        #in the same order as the parents, so each child's edge can simply be appended after the edges before it
+        childCounts: array = array("i", [0])
+        wordEnds: array = array("i", [-1])
+        edgeCharacters: List[str] = []
+        depthPrefixes: List[str] = [""]
+        depthStart: int = 0
+        longerWords: List[str] = sorted(wordIndexes)
+        while len(depthPrefixes) > 0:
+            depth: int = len(depthPrefixes[0])
+            longerWords = [word for word in longerWords if len(word) > depth]
+            childPrefixes: List[str] = []
+            parentPosition: int = 0
+            for word in longerWords:
+                childPrefix: str = word[:depth + 1]
+                if len(childPrefixes) > 0 and childPrefixes[-1] == childPrefix:
+                    continue
+                while depthPrefixes[parentPosition] != word[:depth]:
+                    parentPosition += 1
+
+                childCounts[depthStart + parentPosition] += 1
+                childCounts.append(0)
+                wordEnds.append(wordIndexes.get(childPrefix, -1))
+                edgeCharacters.append(childPrefix[-1])
+                childPrefixes.append(childPrefix)
+
+            depthStart += len(depthPrefixes)
+            depthPrefixes = childPrefixes
+
+        #Nodes that end no word hold -1, and the node that ends a word holds the index of the word
+        self.edgeCharacters: str = "".join(edgeCharacters)
+        self.wordEnds: array = wordEnds
+        self.firstEdges: array = array("i", [0])
+        for childCount in childCounts:
+            self.firstEdges.append(self.firstEdges[-1] + childCount)
+
+    #Function to find every instance of every word of the trie reading forwards along a line
+    def findLineSpans(self, lowerLine: str) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        METHOD TO FIND EVERY INSTANCE OF EVERY WORD OF THE TRIE READING FORWARDS ALONG A LINE
+
+        :param lowerLine: The lower-case line
+        :return: A dictionary from the index of each word found to the "(start, end)" offsets of all of its instances,
+                 overlapping or not, in order of their start
+        """
+
+        findEdge = self.edgeCharacters.find
+        firstEdges: array = self.firstEdges
+        wordEnds: array = self.wordEnds
+        lineSpans: Dict[int, List[Tuple[int, int]]] = dict()
+        lineLength: int = len(lowerLine)
+
+        for startOffset in range(lineLength):
+            node: int = 0
+            for endOffset in range(startOffset, lineLength):
+                edge: int = findEdge(lowerLine[endOffset], firstEdges[node], firstEdges[node + 1])
+                if edge < 0:
+                    break
+                node = edge + 1
+                wordIndex: int = wordEnds[node]
+                if wordIndex >= 0:
+                    lineSpans.setdefault(wordIndex, []).append((startOffset, endOffset))
+
+        return lineSpans
+
+"""
+########################################################################################################################
+FUNCTION TO KEEP THE LEFTMOST NON-OVERLAPPING SPANS OF A WORD
+"""
+def nonOverlappingSpans(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    FUNCTION TO KEEP THE LEFTMOST NON-OVERLAPPING SPANS OF A WORD, AS THE STANDARD STRING SEARCH FINDS THEM
+
+    :param spans: The "(start, end)" offsets of every instance of the word, in order of their start
+    :return: The spans that don't overlap a span kept before them
+    """
+
+    keptSpans: List[Tuple[int, int]] = []
+    for span in spans:
+        if len(keptSpans) == 0 or span[0] > keptSpans[-1][1]:
+            keptSpans.append(span)
+
+    return keptSpans
+
+"""
+########################################################################################################################
+FUNCTION TO FIND EVERY WORD OF A DICTIONARY THAT IS IN A LOADED WORD SEARCH
+"""
+def runDictionaryWordSearch(wordSearch: WordSearch, dictionaryTrie: DictionaryTrie, overlapping: bool = False) \
+        -> Dict[str, List[WordSearchResult]]:
+    """
+    FUNCTION TO FIND EVERY WORD OF A DICTIONARY THAT IS IN A LOADED WORD SEARCH
+
+    Every line is walked once forwards and once backwards from each of its cells, so the time taken depends on the size
+    of the grid and not on the size of the dictionary. The results of each word are the same, and in the same order, as
+    "runLoadedWordSearch" would give for it.
+
+    :param wordSearch: The word search whose grid is to be searched. Its own word list is not used.
+    :param dictionaryTrie: The trie of the dictionary
+    :param overlapping: A boolean that, when True, also keeps the instances that overlap an earlier instance
+    :return: A dictionary, keyed by the dictionary words that were found, in dictionary order, and containing each of
+             their list of "WordSearchResult" objects. Words that weren't found are left out.
+    """
+
+    gridHeight: int = len(wordSearch.horizontalLines)
+    wordResults: Dict[int, List[WordSearchResult]] = dict()
+    upperWords: List[str] = [word.lower().upper() for word in dictionaryTrie.words]
+
+    for direction, lines in wordSearch.lineFamilies():
+        for lineNum, line in enumerate(lines):
+            lowerLine: str = line.lower()
+            forwardSpans = dictionaryTrie.findLineSpans(lowerLine)
+            reversedSpans = dictionaryTrie.findLineSpans(lowerLine[::-1])
+
+            for wordIndex in sorted(set(forwardSpans).union(reversedSpans)):
+                lowerWord: str = dictionaryTrie.words[wordIndex].lower()
+
+                #Turn the reversed spans back into offsets along the line, read from the end of the word to its start
+                backwardSpans: List[Tuple[int, int]] = []
+                if lowerWord not in lowerWord[::-1]:
+                    backwardSpans = [(len(line) - 1 - ss[1], len(line) - 1 - ss[0])
+                                     for ss in reversed(reversedSpans.get(wordIndex, []))]
+                spansInOrder = [backwardSpans, forwardSpans.get(wordIndex, [])]
+                if not overlapping:
+                    spansInOrder = [nonOverlappingSpans(spans) for spans in spansInOrder]
+
+                searchResults: List[Tuple[int, int]] = [(ss[1], ss[0]) for ss in spansInOrder[0]] + spansInOrder[1]
+                wordResults.setdefault(wordIndex, []).extend(
+                    [WordSearchResult(upperWords[wordIndex], lineOffsetToGrid(direction, lineNum, ss[0], gridHeight),
+                                      lineOffsetToGrid(direction, lineNum, ss[1], gridHeight)) for ss in searchResults])
+
+    return {dictionaryTrie.words[wordIndex]: wordResults[wordIndex] for wordIndex in sorted(wordResults)
+            if len(wordResults[wordIndex]) > 0}
+
+"""
+########################################################################################################################
+FUNCTION TO LOAD THE TRIE FOR A DICTIONARY FILE FROM THE CACHE, BUILDING AND CACHING IT IF IT ISN'T THERE
+"""
+def loadOrBuildDictionaryTrie(dictionaryPath: str, cacheDirectory: str = None, maxBytes: int = None) \
+        -> DictionaryTrie:
+    """
+    FUNCTION TO LOAD THE TRIE FOR A DICTIONARY FILE FROM THE CACHE, BUILDING AND CACHING IT IF IT ISN'T THERE
+
+    :param dictionaryPath: The path to the dictionary, being a file with one word on each line
+    :param cacheDirectory: The directory that cached tries are kept in. Defaults to the directory of the grid indexes.
+    :param maxBytes: The limit on the total size of the cached tries and grid indexes in the directory. Defaults to
+                     "DEFAULT_CACHE_MAX_BYTES".
+    :return: The trie of the dictionary
+    """
+
+    #Imported here as the cache module loads the whole search pipeline, and itself imports this module
+    from WordSearch_Cache import defaultCacheDirectory, cacheFilePath, loadCacheFile, saveCacheFile, \
+        DEFAULT_CACHE_MAX_BYTES
+
+    #Key the cached trie by the contents of the dictionary, so that an edited dictionary is never served stale
+    triePath: str = cacheFilePath(fileFingerprint(dictionaryPath), ".trie", cacheDirectory or defaultCacheDirectory())
+    dictionaryTrie: DictionaryTrie = loadCacheFile(triePath, DictionaryTrie)
+    if dictionaryTrie is not None and getattr(dictionaryTrie, "version", None) == DICTIONARY_TRIE_VERSION:
+        return dictionaryTrie
+
+    with open(dictionaryPath, "r") as file:
+        dictionaryTrie = DictionaryTrie(readWordLines(file))
+    saveCacheFile(dictionaryTrie, triePath, maxBytes if maxBytes is not None else DEFAULT_CACHE_MAX_BYTES)
+
+    return dictionaryTrie
@@ -0,0 +1,395 @@
+"""
+########################################################################################################################
+# ALTERNATIVE SEARCH ENGINES USED BY THE WORD SEARCH PROGRAM
+# Author:           Angus Berg
+# Date Created:     12/11/2021
+########################################################################################################################
+"""
+from typing import List, Tuple, Dict, Iterator, Sequence, Any
+import WordSearch_Profiling
+from WordSearch_Classes import WordSearchResult, WordSearch
+
+#The smallest grid, in cells, and the longest word for which the "auto" engine hands a word to the NumPy engine.
+# - Longer words are left to the string search, which overtakes the NumPy engine for them on small alphabets
+NUMPY_MIN_GRID_CELLS: int = 10000
+NUMPY_MAX_WORD_LENGTH: int = 6
+
+#The forward reading direction of each family of lines, as an (X, Y) step, in the order that the families are searched
+FAMILY_STEPS: List[Tuple[str, Tuple[int, int]]] = [("horizontal", (1, 0)), ("vertical", (0, 1)),
+                                                   ("diagonal", (1, 1)), ("antidiagonal", (1, -1))]
+
+"""
+#######################################################################
+# AHO-CORASICK AUTOMATON BUILT OVER A SET OF SEARCH PATTERNS
+#######################################################################
+"""
+class AhoCorasickAutomaton:
+    #Initialisation function to build the automaton from the input patterns
+    def __init__(self, patterns: List[str]):
+        """
+        CLASS TO MATCH MANY PATTERNS AGAINST A STRING IN A SINGLE PASS
+
+        :param patterns: The list of patterns that the automaton will match. The index of a pattern in this list is the
+                         identifier that is reported when that pattern is matched.
+        """
+
+        #Initialise the root state of the automaton
+        self.patterns: List[str] = list(patterns)
+        self.transitions: List[Dict[str, int]] = [dict()]
+        self.failures: List[int] = [0]
+        self.outputs: List[List[int]] = [[]]
+
+        #Add every pattern to the trie, creating new states for characters that have not been seen at that depth
+        for patternIndex, pattern in enumerate(self.patterns):
+            state: int = 0
+            for char in pattern:
+                nextState = self.transitions[state].get(char)
+                if nextState is None:
+                    nextState = len(self.transitions)
+                    self.transitions[state][char] = nextState
+                    self.transitions.append(dict())
+                    self.failures.append(0)
+                    self.outputs.append([])
+                state = nextState
+            self.outputs[state].append(patternIndex)
+
+        #Build the failure links breadth first so that each state's fallback is complete before its children use it
+        queue: List[int] = list(self.transitions[0].values())
+        for state in queue:
+            for char, nextState in self.transitions[state].items():
+                queue.append(nextState)
+
+                #Follow the failure links of the parent until a state with a matching transition is found
+                fallback: int = self.failures[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.failures[fallback]
+                self.failures[nextState] = self.transitions[fallback].get(char, 0)
+
+                #Any pattern ending at the fallback state also ends at the new state
+                self.outputs[nextState].extend(self.outputs[self.failures[nextState]])
+
+    #Function to find every pattern that occurs in the provided text
+    def findMatches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        METHOD TO FIND EVERY OCCURRENCE OF EVERY PATTERN IN A STRING
+
+        :param text: The string that is to be searched for the patterns
+        :return: A generator of "(patternIndex, endIndex)" tuples, in order of the index at which each match ends.
+                 Overlapping matches are all reported.
+        """
+
+        transitions: List[Dict[str, int]] = self.transitions
+        failures: List[int] = self.failures
+        outputs: List[List[int]] = self.outputs
+
+        state: int = 0
+        for index, char in enumerate(text):
+            #Fall back until a transition exists for this character or the root is reached
+            while state and char not in transitions[state]:
+                state = failures[state]
+            state = transitions[state].get(char, 0)
+
+            for patternIndex in outputs[state]:
+                yield patternIndex, index
+
+"""
+#######################################################################
+# BIT-PARALLEL SHIFT-AND MATCHER BUILT OVER A SET OF SEARCH PATTERNS
+#######################################################################
+"""
+class BitParallelMatcher:
+    #Initialisation function to build the character masks from the input patterns
+    def __init__(self, patterns: List[str]):
+        """
+        CLASS TO MATCH MANY PATTERNS AGAINST A STRING IN A SINGLE PASS, ONE BIT FOR EACH PATTERN CHARACTER
+
+        The patterns are laid end to end in one integer, each taking a bit for each of its characters, and the state of
+        every partial match of every pattern is then advanced together with one shift, OR and AND per character of the
+        text. Python's integers have no fixed width, so the patterns don't need to be split into 64-bit groups.
+
+        :param patterns: The list of patterns that the matcher will match. The index of a pattern in this list is the
+                         identifier that is reported when that pattern is matched.
+        """
+
+        self.patterns: List[str] = list(patterns)
+        self.startMask: int = 0
+        self.endMask: int = 0
+        self.characterMasks: Dict[str, int] = dict()
+        self.endPatterns: Dict[int, int] = dict()
+
+        bitOffset: int = 0
+        for patternIndex, pattern in enumerate(self.patterns):
+            self.startMask |= 1 << bitOffset
+            for charIndex, char in enumerate(pattern):
+                self.characterMasks[char] = self.characterMasks.get(char, 0) | 1 << (bitOffset + charIndex)
+            bitOffset += len(pattern)
+            self.endMask |= 1 << (bitOffset - 1)
+            self.endPatterns[bitOffset - 1] = patternIndex
+
+    #Function to find every pattern that occurs in the provided text
+    def findMatches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        METHOD TO FIND EVERY OCCURRENCE OF EVERY PATTERN IN A STRING
+
+        :param text: The string that is to be searched for the patterns
+        :return: A generator of "(patternIndex, endIndex)" tuples, in order of the index at which each match ends.
+                 Overlapping matches are all reported.
+        """
+
+        characterMasks: Dict[str, int] = self.characterMasks
+        startMask: int = self.startMask
+        endMask: int = self.endMask
+
+        #Bit "i" of the state is set while the characters up to bit "i" of a pattern match the text just read
+        state: int = 0
+        for index, char in enumerate(text):
+            state = ((state << 1) | startMask) & characterMasks.get(char, 0)
+
+            matchedEnds: int = state & endMask
+            while matchedEnds:
+                lowestBit: int = matchedEnds & -matchedEnds
+                yield self.endPatterns[lowestBit.bit_length() - 1], index
+                matchedEnds ^= lowestBit
+
+"""
+########################################################################################################################
+FUNCTION TO EXTRACT ALL WORDS FROM A LOADED WORD SEARCH USING A SINGLE AHO-CORASICK AUTOMATON
+"""
+def runAhoCorasickWordSearch(wordSearch: WordSearch, overlapping: bool = False) -> Dict[str, List[WordSearchResult]]:
+    """
+    FUNCTION TO EXTRACT ALL WORDS FROM A LOADED WORD SEARCH USING A SINGLE AHO-CORASICK AUTOMATON
+
+    Every word and its reversal are built into one automaton, and each line of the grid is then walked exactly once.
+    The results are identical, in content and in order, to those of the standard per-word search.
+
+    :param wordSearch: The word search information that has been loaded into the required class
+    :param overlapping: A boolean that, when True, keeps every hit of the automaton rather than only the leftmost
+                        non-overlapping hits of each word
+    :return: A dictionary, keyed by the words that were searched for in the grid and containing each of their list of
+             "WordSearchResult" objects.
+    """
+
+    return runMultiPatternWordSearch(wordSearch, AhoCorasickAutomaton, overlapping)
+
+"""
+########################################################################################################################
+FUNCTION TO EXTRACT ALL WORDS FROM A LOADED WORD SEARCH USING A SINGLE BIT-PARALLEL MATCHER
+"""
+def runBitParallelWordSearch(wordSearch: WordSearch, overlapping: bool = False) -> Dict[str, List[WordSearchResult]]:
+    """
+    FUNCTION TO EXTRACT ALL WORDS FROM A LOADED WORD SEARCH USING A SINGLE BIT-PARALLEL MATCHER
+
+    :param wordSearch: The word search information that has been loaded into the required class
+    :param overlapping: A boolean that, when True, keeps every hit rather than only the leftmost non-overlapping hits
+    :return: A dictionary, keyed by the words that were searched for in the grid and containing each of their list of
+             "WordSearchResult" objects, identical to those of the standard per-word search.
+    """
+
+    return runMultiPatternWordSearch(wordSearch, BitParallelMatcher, overlapping)
+
+"""
+########################################################################################################################
+FUNCTION TO EXTRACT ALL WORDS FROM A LOADED WORD SEARCH WITH ONE MULTI-PATTERN MATCHER OVER EVERY WORD
+"""
+def runMultiPatternWordSearch(wordSearch: WordSearch, matcherClass: type, overlapping: bool = False) \
+        -> Dict[str, List[WordSearchResult]]:
+    """
+    FUNCTION TO EXTRACT ALL WORDS FROM A LOADED WORD SEARCH WITH ONE MULTI-PATTERN MATCHER OVER EVERY WORD
+
+    Every word and its reversal are built into one matcher, and each line of the grid is then read exactly once. The
+    results are identical, in content and in order, to those of the standard per-word search.
+
+    :param wordSearch: The word search information that has been loaded into the required class
+    :param matcherClass: The matcher to build, such as "AhoCorasickAutomaton", which is built from a list of patterns
+                         and has a "findMatches" method giving "(patternIndex, endIndex)" tuples in order of their end
+    :param overlapping: A boolean that, when True, keeps every hit of the matcher rather than only the leftmost
+                        non-overlapping hits of each word
+    :return: A dictionary, keyed by the words that were searched for in the grid and containing each of their list of
+             "WordSearchResult" objects.
+    """
+
+    #Build the distinct set of patterns; Each lower-case word has a forward and, unless a palindrome, a backward pattern
+    patternIndexes: Dict[str, int] = dict()
+    wordPatterns: Dict[str, Tuple[int, int]] = dict()
+    for searchWord in wordSearch.words:
+        lowerWord: str = searchWord.lower()
+        if lowerWord in wordPatterns or len(lowerWord) == 0:
+            #An empty word is never found, as it is by the standard search, so it isn't built into the matcher
+            continue
+
+        forwardIndex: int = patternIndexes.setdefault(lowerWord, len(patternIndexes))
+        backwardIndex: int = -1
+        if lowerWord not in lowerWord[::-1]:
+            backwardIndex = patternIndexes.setdefault(lowerWord[::-1], len(patternIndexes))
+        wordPatterns[lowerWord] = (forwardIndex, backwardIndex)
+
+    #Map each pattern back to the words that use it, so that only the words with hits on a line are examined
+    patternWords: List[List[str]] = [[] for _ in patternIndexes]
+    for lowerWord, (forwardIndex, backwardIndex) in wordPatterns.items():
+        patternWords[forwardIndex].append(lowerWord)
+        if backwardIndex >= 0:
+            patternWords[backwardIndex].append(lowerWord)
+
+    patterns: List[str] = sorted(patternIndexes, key=patternIndexes.get)
+    matcher = matcherClass(patterns)
+    lowerResults: Dict[str, List[WordSearchResult]] = {lowerWord: [] for lowerWord in wordPatterns}
+
+    #The lines walked are counted if a profile is being collected, but the matcher makes no "str.index" calls
+    counters = WordSearch_Profiling.activeCounters
+    if counters is not None:
+        counters.markUncounted("indexCalls")
+
+    #Walk every line once, in the same family order as the standard search to preserve its ordering
+    for direction, lines in wordSearch.lineFamilies():
+        for lineNum, line in enumerate(lines):
+            if counters is not None:
+                counters.countLine(len(line))
+
+            #Keep only the leftmost non-overlapping hits for each pattern, as the standard string search does, unless
+            #overlapping hits have been asked for
+            lineHits: Dict[int, List[Tuple[int, int]]] = dict()
+            for patternIndex, endIndex in matcher.findMatches(line.lower()):
+                startIndex: int = endIndex - len(patterns[patternIndex]) + 1
+                hits = lineHits.setdefault(patternIndex, [])
+                if overlapping or len(hits) == 0 or startIndex > hits[-1][1]:
+                    hits.append((startIndex, endIndex))
+
+            #Combine the hits for each affected word, backward hits before forward hits
+            touchedWords = set(word for patternIndex in lineHits for word in patternWords[patternIndex])
+            for lowerWord in touchedWords:
+                forwardIndex, backwardIndex = wordPatterns[lowerWord]
+                searchResults: List[Tuple[int, int]] = [(hh[1], hh[0]) for hh in lineHits.get(backwardIndex, [])]
+                searchResults.extend(lineHits.get(forwardIndex, []))
+
+                upperWord: str = lowerWord.upper()
+                lowerResults[lowerWord].extend(
+                    [WordSearchResult(upperWord, wordSearch.gridCoordinates(direction, lineNum, hh[0]),
+                                      wordSearch.gridCoordinates(direction, lineNum, hh[1])) for hh in searchResults])
+
+    #Key the results by the original words, giving each word its own list as the standard search does
+    return {searchWord: list(lowerResults.get(searchWord.lower(), [])) for searchWord in wordSearch.words}
+
+"""
+########################################################################################################################
+FUNCTION TO LOAD THE GRID INTO A NUMPY ARRAY OF LOWER-CASE CHARACTER CODES
+"""
+def buildNumpyGrid(horizontalLines: Sequence[str]) -> Any:
+    """
+    FUNCTION TO LOAD THE GRID INTO A NUMPY ARRAY OF LOWER-CASE CHARACTER CODES
+
+    NumPy is only imported when this function is called, so it is only needed by runs that use the NumPy engine.
+
+    :param horizontalLines: The horizontal lines of the grid
+    :return: A two-dimensional array of the code points of the grid, indexed by [Y, X], or None if lower-casing the grid
+             would change the length of any of its lines
+    """
+
+    import numpy
+
+    lowerLines: List[str] = [line.lower() for line in horizontalLines]
+    width: int = len(lowerLines[0]) if len(lowerLines) > 0 else 0
+    if any(len(line) != width for line in lowerLines):
+        return None
+
+    #Single byte codes are used where possible, as they are four times cheaper to compare than full code points
+    flatGrid: str = "".join(lowerLines)
+    if flatGrid.isascii():
+        codes = numpy.frombuffer(flatGrid.encode("ascii"), dtype=numpy.uint8)
+    else:
+        codes = numpy.frombuffer(flatGrid.encode("utf-32-le"), dtype=numpy.uint32)
+    return codes.reshape((len(lowerLines), width))
+
+"""
+########################################################################################################################
+FUNCTION TO FIND ALL THE INSTANCES OF A WORD IN A NUMPY GRID BY COMPARING SHIFTED SLICES OF THE GRID
+"""
+def extractInstancesWithNumpy(word: str, numpyGrid: Any) -> List[WordSearchResult]:
+    """
+    FUNCTION TO FIND ALL THE INSTANCES OF A WORD IN A NUMPY GRID BY COMPARING SHIFTED SLICES OF THE GRID
+
+    The cells matching the first letter are found by comparing the whole grid at once, and the candidates for every
+    direction are then narrowed together by comparing each following letter against the cells shifted by that letter's
+    distance from the start. The results are the same, and in the same order, as those
+    of "extractInstancesAcrossAllLines" over every family of lines.
+
+    :param word: The word that will be searched for in the grid
+    :param numpyGrid: The grid as built by "buildNumpyGrid"
+    :return: A list of the "WordSearchResults" class containing every instance of the word that was found.
+    """
+
+    import numpy
+
+    lowerWord: str = word.lower()
+    upperWord: str = lowerWord.upper()
+    wordCodes: List[int] = [ord(char) for char in lowerWord]
+    wordLength: int = len(wordCodes)
+    height, width = numpyGrid.shape
+    palindrome: bool = lowerWord in lowerWord[::-1]
+    extractionResults: List[WordSearchResult] = []
+
+    #Compare the whole grid against the first letter once, as the cells that match are shared by every direction
+    if wordLength == 0:
+        return extractionResults
+    letterYs, letterXs = numpy.nonzero(numpyGrid == wordCodes[0])
+    if len(letterXs) == 0:
+        return extractionResults
+
+    for direction, (stepX, stepY) in FAMILY_STEPS:
+        familyHits: List[Tuple[Any, Any, Any, Any, Any]] = []
+
+        #Backward hits read against the direction of the lines, forward hits read along it
+        for backward in ([False] if palindrome else [True, False]):
+            dx, dy = (-stepX, -stepY) if backward else (stepX, stepY)
+
+            #Keep the candidate start cells for which the whole word fits inside the grid in this direction
+            endXs = letterXs + dx * (wordLength - 1)
+            endYs = letterYs + dy * (wordLength - 1)
+            inGrid = (endXs >= 0) & (endXs < width) & (endYs >= 0) & (endYs < height)
+            startXs, startYs = letterXs[inGrid], letterYs[inGrid]
+
+            #Narrow the candidates one letter at a time by looking up the shifted cells, stopping once none remain
+            for index in range(1, wordLength):
+                if len(startXs) == 0:
+                    break
+                matches = numpyGrid[startYs + index * dy, startXs + index * dx] == wordCodes[index]
+                startXs, startYs = startXs[matches], startYs[matches]
+
+            if len(startXs) == 0:
+                continue
+
+            #Find the line and offset of the end of each hit that comes first along the line
+            leadXs = startXs + dx * (wordLength - 1) if backward else startXs
+            leadYs = startYs + dy * (wordLength - 1) if backward else startYs
+            if direction == "horizontal":
+                lineNums, offsets = leadYs, leadXs
+            elif direction == "vertical":
+                lineNums, offsets = leadXs, leadYs
+            else:
+                lineNums = leadXs - leadYs + (height - 1) if direction == "diagonal" else leadXs + leadYs
+                offsets = leadXs - numpy.maximum(0, lineNums - (height - 1))
+
+            familyHits.append((lineNums, numpy.full(len(startXs), 1 if not backward else 0), offsets, startXs,
+                               startYs))
+
+        if len(familyHits) == 0:
+            continue
+
+        #Order the hits as the line scan would; By line, backward hits first, then along the line
+        lineNums, forwardFlags, offsets, startXs, startYs = [numpy.concatenate(parts) for parts in zip(*familyHits)]
+        order = numpy.lexsort((offsets, forwardFlags, lineNums))
+
+        #Drop hits that overlap an earlier hit in the same line and direction, as the string search does
+        lastKey: Tuple[int, int] = (-1, -1)
+        lastEnd: int = -1
+        for lineNum, forwardFlag, offset, startX, startY in zip(lineNums[order].tolist(), forwardFlags[order].tolist(),
+                                                                 offsets[order].tolist(), startXs[order].tolist(),
+                                                                 startYs[order].tolist()):
+            if (lineNum, forwardFlag) == lastKey and offset <= lastEnd:
+                continue
+            lastKey, lastEnd = (lineNum, forwardFlag), offset + wordLength - 1
+
+            dx, dy = (stepX, stepY) if forwardFlag else (-stepX, -stepY)
+            extractionResults.append(WordSearchResult(upperWord, (startX, startY),
+                                                      (startX + dx * (wordLength - 1), startY + dy * (wordLength - 1))))
+
+    return extractionResults
@@ -6,23 +6,61 @@
 ########################################################################################################################
 """
 import os
-from pathlib import Path
-from typing import List, Tuple, Dict
-from WordSearch_Classes import WordSearchResult, WordSearch
+import heapq
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import islice
+from typing import List, Tuple, Dict, Set, Sequence, Iterable, Iterator, TextIO, Callable, Any
+import WordSearch_Profiling
+from WordSearch_Classes import WordSearchResult, WordSearch, SearchMemo, ColumnarResults, lineOffsetToGrid, \
+    gridFingerprint
+from WordSearch_Patterns import isPatternWord, runPatternWordSearch
+from WordSearch_Engines import AhoCorasickAutomaton, runAhoCorasickWordSearch, runBitParallelWordSearch, \
+    buildNumpyGrid, extractInstancesWithNumpy, NUMPY_MIN_GRID_CELLS, NUMPY_MAX_WORD_LENGTH
+
+#The size of the write buffer used for the results file
+OUTPUT_BUFFER_BYTES: int = 1024 * 1024
+
+#The offset numbers in use for each output path, as (directory modification time, offsets in use, next offset to try),
+#so that a directory is only listed again once something other than this process has changed it. Only the most recently
+#used output paths are kept, so that a long-lived process such as the server doesn't grow it without limit.
+OUTPUT_OFFSET_CACHE_MAX_ENTRIES: int = 1024
+outputOffsetCache: OrderedDict = OrderedDict()
+
+#The ways of matching a word along a line; "index" repeats the string search, "singlepass" walks the line only once and
+#"auto" picks between them for each line
+LINE_MATCHERS: Tuple[str, ...] = ("index", "singlepass", "auto")
+
+#The shortest line that the "auto" matcher will consider walking in a single pass, as shorter lines are always quicker
+#to search with "str.index"
+SINGLE_PASS_MIN_LINE_LENGTH: int = 1024
+
+#The orders that the results of each word can be ranked in; "found" keeps the order that the search finds them in
+RESULT_RANKINGS: Tuple[str, ...] = ("found", "topleft", "longest", "direction")
+
+#The reading directions as (X, Y) steps, in the order the "direction" ranking puts them; Forwards, then backwards
+DIRECTION_PRIORITY: Tuple[Tuple[int, int], ...] = ((1, 0), (0, 1), (1, 1), (1, -1), (-1, 0), (0, -1), (-1, -1), (-1, 1))
 
 """
 ########################################################################################################################
 FUNCTION TO FIND INSTANCES OF A WORD IN A STRING
 """
-def findWordsInString(word: str, source: str) -> List[Tuple[int, int]]:
+def findWordsInString(word: str, source: str, overlapping: bool = False) -> List[Tuple[int, int]]:
     """
     FUNCTION TO FIND INSTANCES OF A WORD IN A STRING
 
     :param word: The word to be found in the source string
     :param source: The source string that will be search
-    :return: A list of "(start, end)" index tuples showing where in the source the word was found
+    :param overlapping: A boolean that, when True, also finds the instances that overlap an earlier instance, such as
+                        both instances of "aa" in "aaa". By default each search carries on after the end of the last
+                        instance found.
+    :return: A list of "(start, end)" index tuples showing where in the source the word was found. An empty word is
+             never found, as it would match at every index without the search moving along.
     """
 
+    if len(word) == 0:
+        return []
+
     #Initialise the tracking index and output list
     currentStart: int = 0
     outputList: List[Tuple[int, int]] = []
@@ -32,18 +70,168 @@ def findWordsInString(word: str, source: str) -> List[Tuple[int, int]]:
         try:
             currentIndex: int = source.index(word, currentStart)
             outputList.append((currentIndex, currentIndex + len(word) - 1))
-            currentStart = outputList[-1][1] + 1
+            currentStart = currentIndex + 1 if overlapping else outputList[-1][1] + 1
         except ValueError:
             break
 
     #Return the list of indexes
     return outputList
 
+"""
+########################################################################################################################
+FUNCTION TO BUILD THE AUTOMATON THAT MATCHES A WORD AND ITS REVERSAL TOGETHER
+"""
+@lru_cache(maxsize=1024)
+def lineSpanAutomaton(lowerWord: str) -> AhoCorasickAutomaton:
+    """
+    FUNCTION TO BUILD THE AUTOMATON THAT MATCHES A WORD AND ITS REVERSAL TOGETHER
+
+    The automatons are cached, so each word is only built once however many lines it is searched for in.
+
+    :param lowerWord: The lower-case word
+    :return: An automaton whose pattern 0 is the word and pattern 1, unless the word is a palindrome, its reversal
+    """
+
+    return AhoCorasickAutomaton([lowerWord] if lowerWord in lowerWord[::-1] else [lowerWord, lowerWord[::-1]])
+
+"""
+########################################################################################################################
+FUNCTION TO FIND THE SHORTEST PERIOD OF A WORD
+"""
+@lru_cache(maxsize=1024)
+def wordPeriod(lowerWord: str) -> int:
+    """
+    FUNCTION TO FIND THE SHORTEST PERIOD OF A WORD
+
+    :param lowerWord: The lower-case word
+    :return: The smallest shift that lines the word up with itself, such as 1 for "aaaa", 2 for "abab" and the length
+             of the word when it cannot overlap itself at all
+    """
+
+    #Build the prefix function, the longest border of the whole word giving its period
+    borderLengths: List[int] = [0] * len(lowerWord)
+    for ii in range(1, len(lowerWord)):
+        borderLength: int = borderLengths[ii - 1]
+        while borderLength > 0 and lowerWord[ii] != lowerWord[borderLength]:
+            borderLength = borderLengths[borderLength - 1]
+        borderLengths[ii] = borderLength + 1 if lowerWord[ii] == lowerWord[borderLength] else borderLength
+
+    return len(lowerWord) - (borderLengths[-1] if len(lowerWord) > 0 else 0)
+
+"""
+########################################################################################################################
+FUNCTION TO CHOOSE HOW A WORD IS MATCHED ALONG A LINE
+"""
+def chooseLineMatcher(lowerWord: str, lowerLine: str, overlapping: bool = False) -> str:
+    """
+    FUNCTION TO CHOOSE HOW A WORD IS MATCHED ALONG A LINE
+
+    "str.index" runs in C and is the quicker matcher unless overlapping instances are packed densely along a long line,
+    when restarting the search one letter after every hit re-reads the word at almost every offset. The number of
+    overlapping hits is estimated from a count of the non-overlapping ones and the period of the word, and the line is
+    walked in a single pass once they would cover at least half of it.
+
+    :param lowerWord: The lower-case word to be found in the line
+    :param lowerLine: The lower-case line of the word search that is being examined
+    :param overlapping: A boolean that, when True, also finds the instances that overlap an earlier instance
+    :return: Either "index" or "singlepass"
+    """
+
+    if not overlapping or len(lowerLine) < SINGLE_PASS_MIN_LINE_LENGTH or len(lowerWord) == 0:
+        return "index"
+
+    #A word that cannot overlap itself has no more overlapping hits than the non-overlapping count
+    period: int = wordPeriod(lowerWord)
+    if period == len(lowerWord):
+        return "index"
+
+    hitCount: int = lowerLine.count(lowerWord)
+    if lowerWord not in lowerWord[::-1]:
+        hitCount += lowerLine.count(lowerWord[::-1])
+    return "singlepass" if hitCount * len(lowerWord) // period * 2 >= len(lowerLine) else "index"
+
+"""
+########################################################################################################################
+FUNCTION TO FIND THE FORWARD AND BACKWARD INSTANCES OF A WORD IN A LINE WITH ONE WALK ALONG IT
+"""
+def findLineSpansInOnePass(lowerWord: str, lowerLine: str, overlapping: bool = False) -> List[Tuple[int, int]]:
+    """
+    FUNCTION TO FIND THE FORWARD AND BACKWARD INSTANCES OF A WORD IN A LINE WITH ONE WALK ALONG IT
+
+    Both directions are matched by a single automaton, so the line is read once in linear time whatever its contents.
+    The spans are the same, and in the same order, as those of "findLineSpans" with the "index" matcher.
+
+    :param lowerWord: The lower-case word to be found in the line
+    :param lowerLine: The lower-case line of the word search that is being examined
+    :param overlapping: A boolean that, when True, keeps the instances that overlap an earlier instance
+    :return: A list of "(start, end)" offsets, with the backward instances ahead of the forward instances
+    """
+
+    forwardResults: List[Tuple[int, int]] = []
+    backwardResults: List[Tuple[int, int]] = []
+    for patternIndex, endIndex in lineSpanAutomaton(lowerWord).findMatches(lowerLine):
+        #The automaton reports every instance; Keep the leftmost non-overlapping ones unless overlaps are wanted
+        hits: List[Tuple[int, int]] = forwardResults if patternIndex == 0 else backwardResults
+        startIndex: int = endIndex - len(lowerWord) + 1
+        if overlapping or len(hits) == 0 or startIndex > hits[-1][1]:
+            hits.append((startIndex, endIndex))
+
+    searchResults: List[Tuple[int, int]] = [(ff[1], ff[0]) for ff in backwardResults]
+    searchResults.extend(forwardResults)
+    return searchResults
+
+"""
+########################################################################################################################
+FUNCTION TO FIND THE SPANS OF THE FORWARD AND BACKWARD INSTANCES OF A WORD IN A LINE
+"""
+def findLineSpans(lowerWord: str, lowerLine: str, overlapping: bool = False, matcher: str = "auto") \
+        -> List[Tuple[int, int]]:
+    """
+    FUNCTION TO FIND THE SPANS OF THE FORWARD AND BACKWARD INSTANCES OF A WORD IN A LINE
+
+    :param lowerWord: The lower-case word to be found in the line
+    :param lowerLine: The lower-case line of the word search that is being examined
+    :param overlapping: A boolean that, when True, also finds the instances that overlap an earlier instance
+    :param matcher: How the line is matched, being one of "LINE_MATCHERS". "index" searches the line once for the word
+                    and once for its reversal, while "singlepass" finds both with one walk along the line. "auto"
+                    picks between the two with "chooseLineMatcher".
+    :return: A list of "(start, end)" offsets along the line of the first and last letters of each instance, with the
+             backward instances ahead of the forward instances. The start is after the end for a backward instance.
+    """
+
+    if matcher == "auto":
+        matcher = chooseLineMatcher(lowerWord, lowerLine, overlapping)
+
+    if matcher == "singlepass":
+        if WordSearch_Profiling.activeCounters is not None:
+            WordSearch_Profiling.activeCounters.countLine(len(lowerLine))
+        return findLineSpansInOnePass(lowerWord, lowerLine, overlapping)
+    elif matcher != "index":
+        raise ValueError("The line matcher \"{}\" is not recognised".format(matcher))
+
+    #Extract all instances of the word in the line, both forwards and backwards
+    forwardResults: List[Tuple[int, int]] = findWordsInString(lowerWord, lowerLine, overlapping)
+    backwardResults: List[Tuple[int, int]] = findWordsInString(lowerWord[::-1], lowerLine, overlapping)
+
+    #Count the work done on this line if a profile is being collected
+    if WordSearch_Profiling.activeCounters is not None:
+        WordSearch_Profiling.activeCounters.countLine(len(lowerLine), forwardResults, backwardResults,
+                                                      overlapping=overlapping)
+
+    #Reverse the backward result order and append the results together, unless the word is a palindrome
+    if lowerWord in lowerWord[::-1]:
+        return forwardResults
+
+    searchResults: List[Tuple[int, int]] = [(ff[1], ff[0]) for ff in backwardResults]
+    searchResults.extend(forwardResults)
+    return searchResults
+
 """
 ########################################################################################################################
 FUNCTION TO FIND FORWARD AND BACKWARD INSTANCES OF A WORD IN A LONGER STRING AND RETURN A LIST OF THE RESULTS CLASS
 """
-def extractAllInstancesInLine(word: str, line: str, lineNum: int, vertical: bool = False) -> List[WordSearchResult]:
+def extractAllInstancesInLine(word: str, line: str, lineNum: int, vertical: bool = False, direction: str = None,
+                              gridHeight: int = 0, overlapping: bool = False) -> List[WordSearchResult]:
     """
     FUNCTION TO FIND FORWARD AND BACKWARD INSTANCES OF A WORD IN A LONGER STRING
 
@@ -52,35 +240,72 @@ def extractAllInstancesInLine(word: str, line: str, lineNum: int, vertical: bool
     :param lineNum: The index of the line that is being examined
     :param vertical: A boolean telling the function whether or not the line being examined is vertical.
                      False means that the line is a horizontal row.
+    :param direction: An optional line family, being one of "horizontal", "vertical", "diagonal" or "antidiagonal",
+                      which takes the place of the vertical flag when provided.
+    :param gridHeight: The number of horizontal lines in the grid. Only needed for the diagonal directions.
+    :param overlapping: A boolean that, when True, also finds the instances that overlap an earlier instance
     :return: A list of the "WordSearchResults" class containing every instance of the word that was found.
     """
 
-    #Convert the word and line to all lower-case
+    #Convert the word and line to all lower-case, and find the instances of the word
     lowerWord: str = word.lower()
-    lowerLine: str = line.lower()
+    searchResults: List[Tuple[int, int]] = findLineSpans(lowerWord, line.lower(), overlapping)
+
+    #Branch based on the direction of the line and construct the results, all sharing the one upper-case word
+    upperWord: str = lowerWord.upper()
+    if direction in ("diagonal", "antidiagonal"):
+        return [WordSearchResult(upperWord, lineOffsetToGrid(direction, lineNum, dd[0], gridHeight),
+                                 lineOffsetToGrid(direction, lineNum, dd[1], gridHeight)) for dd in searchResults]
+    elif vertical or direction == "vertical":
+        return [WordSearchResult(upperWord, (lineNum, yy[0]), (lineNum, yy[1])) for yy in searchResults]
+    else:
+        return [WordSearchResult(upperWord, (xx[0], lineNum), (xx[1], lineNum)) for xx in searchResults]
 
-    #Extract all instances of the word in the line, both forwards and backwards
-    forwardResults: List[Tuple[int, int]] = findWordsInString(lowerWord, lowerLine)
-    backwardResults: List[Tuple[int, int]] = findWordsInString(lowerWord[::-1], lowerLine)
+"""
+########################################################################################################################
+FUNCTION TO LAZILY FIND THE INSTANCES OF A WORD ON ALL LINES, ONE LINE AT A TIME
+"""
+def iterateInstancesAcrossAllLines(word: str, horizontalLines: Sequence[str], verticalLines: Sequence[str],
+                                   diagonalLines: Sequence[str] = None, antiDiagonalLines: Sequence[str] = None,
+                                   overlapping: bool = False) \
+        -> Iterator[WordSearchResult]:
+    """
+    FUNCTION TO LAZILY FIND THE INSTANCES OF A WORD ON ALL LINES, ONE LINE AT A TIME
 
-    #Reverse the backward result order and append the results together, unless the word is a palindrome
-    if lowerWord in lowerWord[::-1]:
-        searchResults: List[Tuple[int, int]] = forwardResults
-    else:
-        searchResults: List[Tuple[int, int]] = [(ff[1], ff[0]) for ff in backwardResults]
-        searchResults.extend(forwardResults)
+    The results come out in the same order as "extractInstancesAcrossAllLines" gives them, but each line is only
+    searched when the results before it have been used up, so a caller that stops early skips the rest of the grid.
 
-    #Branch based on if this line is vertical or horizontal and construct the results
-    if vertical:
-        return [WordSearchResult(lowerWord.upper(), (lineNum, yy[0]), (lineNum, yy[1])) for yy in searchResults]
-    else:
-        return [WordSearchResult(lowerWord.upper(), (xx[0], lineNum), (xx[1], lineNum)) for xx in searchResults]
+    :param word: The word that will be searched for in the lines
+    :param horizontalLines: The set of horizontal lines that will be searched for instances of the word
+    :param verticalLines: The set of vertical lines that will be searched for instances of the word
+    :param diagonalLines: The optional set of top-left to bottom-right diagonal lines that will be searched for
+                          instances of the word. The grid height used to place these is taken from the horizontal lines.
+    :param antiDiagonalLines: The optional set of bottom-left to top-right diagonal lines that will be searched for
+                              instances of the word
+    :param overlapping: A boolean that, when True, also finds the instances that overlap an earlier instance
+    :return: A generator of the "WordSearchResults" class for every instance of the word
+    """
+
+    #Yield the results for the horizontal lines, then the vertical lines
+    for index, line in enumerate(horizontalLines):
+        yield from extractAllInstancesInLine(word, line, index, False, overlapping=overlapping)
+
+    for index, line in enumerate(verticalLines):
+        yield from extractAllInstancesInLine(word, line, index, True, overlapping=overlapping)
+
+    #Yield the results for the diagonal lines, if they have been provided
+    for direction, lines in (("diagonal", diagonalLines), ("antidiagonal", antiDiagonalLines)):
+        for index, line in enumerate(lines or []):
+            yield from extractAllInstancesInLine(word, line, index, direction=direction,
+                                                 gridHeight=len(horizontalLines), overlapping=overlapping)
 
 """
 ########################################################################################################################
 FUNCTION TO FIND ALL THE INSTANCES OF A WORD ON ALL LINES AND RETURN THE LIST OF RESULTS
 """
-def extractInstancesAcrossAllLines(word: str, horizontalLines: List[str], verticalLines: List[str]) \
+def extractInstancesAcrossAllLines(word: str, horizontalLines: Sequence[str], verticalLines: Sequence[str],
+                                   diagonalLines: Sequence[str] = None, antiDiagonalLines: Sequence[str] = None,
+                                   overlapping: bool = False) \
         -> List[WordSearchResult]:
     """
     FUNCTION TO FIND ALL THE INSTANCES OF A WORD ON ALL LINES AND RETURN THE LIST OF RESULTS
@@ -88,56 +313,371 @@ def extractInstancesAcrossAllLines(word: str, horizontalLines: List[str], vertic
     :param word: The word that will be searched for in the lines
     :param horizontalLines: The set of horizontal lines that will be searched for instances of the word
     :param verticalLines: The set of vertical lines that will be searched for instances of the word
+    :param diagonalLines: The optional set of top-left to bottom-right diagonal lines that will be searched for
+                          instances of the word. The grid height used to place these is taken from the horizontal lines.
+    :param antiDiagonalLines: The optional set of bottom-left to top-right diagonal lines that will be searched for
+                              instances of the word
+    :param overlapping: A boolean that, when True, also finds the instances that overlap an earlier instance
     :return: A list of the "WordSearchResults" class containing every instance of the word that was found.
     """
 
-    #Get the results for the horizontal lines
-    extractionResults: List[WordSearchResult] = []
-    for index, line in enumerate(horizontalLines):
-        extractionResults.extend(extractAllInstancesInLine(word, line, index, False))
+    #Run the lazy search through to the end, collecting every result
+    return list(iterateInstancesAcrossAllLines(word, horizontalLines, verticalLines, diagonalLines, antiDiagonalLines,
+                                               overlapping))
 
-    #Get the results for the vertical lines
-    for index, line in enumerate(verticalLines):
-        extractionResults.extend(extractAllInstancesInLine(word, line, index, True))
+"""
+########################################################################################################################
+FUNCTION TO FIND ALL THE INSTANCES OF A WORD IN A LOADED WORD SEARCH AND STORE THEM AS COLUMNS OF COORDINATES
+"""
+def extractColumnarInstances(word: str, wordSearch: WordSearch, overlapping: bool = False) -> ColumnarResults:
+    """
+    FUNCTION TO FIND ALL THE INSTANCES OF A WORD IN A LOADED WORD SEARCH AND STORE THEM AS COLUMNS OF COORDINATES
+
+    :param word: The word that will be searched for in the lines
+    :param wordSearch: The word search information that has been loaded into the required class
+    :param overlapping: A boolean that, when True, also finds the instances that overlap an earlier instance
+    :return: The results of the word, in the same order as "extractInstancesAcrossAllLines" finds them, without a
+             "WordSearchResult" object being built for any of them
+    """
+
+    lowerWord: str = word.lower()
+    columns: ColumnarResults = ColumnarResults(lowerWord.upper())
+    gridHeight: int = len(wordSearch.horizontalLines)
+
+    for direction, lines in wordSearch.lineFamilies():
+        for index, line in enumerate(lines):
+            for startOffset, endOffset in findLineSpans(lowerWord, line.lower(), overlapping):
+                columns.append(lineOffsetToGrid(direction, index, startOffset, gridHeight),
+                               lineOffsetToGrid(direction, index, endOffset, gridHeight))
+
+    return columns
+
+"""
+########################################################################################################################
+FUNCTION TO FIND ALL THE INSTANCES OF A WORD IN A LOADED WORD SEARCH, GROUPED BY THE LINE THEY WERE FOUND ON
+"""
+def extractInstancesByLine(word: str, wordSearch: WordSearch) -> List[Tuple[str, List[WordSearchResult]]]:
+    """
+    FUNCTION TO FIND ALL THE INSTANCES OF A WORD IN A LOADED WORD SEARCH, GROUPED BY THE LINE THEY WERE FOUND ON
+
+    :param word: The word that will be searched for in the lines
+    :param wordSearch: The word search information that has been loaded into the required class
+    :return: A list of "(direction, results)" tuples, one for each line with at least one result, in the same order as
+             "extractInstancesAcrossAllLines" finds them
+    """
+
+    lineResults: List[Tuple[str, List[WordSearchResult]]] = []
+    for direction, lines in wordSearch.lineFamilies():
+        for index, line in enumerate(lines):
+            results = extractAllInstancesInLine(word, line, index, direction=direction,
+                                                gridHeight=len(wordSearch.horizontalLines))
+            if len(results) > 0:
+                lineResults.append((direction, results))
+
+    return lineResults
+
+"""
+########################################################################################################################
+FUNCTION TO GET THE SORT KEY OF A RANKING OF RESULTS
+"""
+def resultRankingKey(ranking: str) -> Callable[[WordSearchResult], Tuple[int, ...]]:
+    """
+    FUNCTION TO GET THE SORT KEY OF A RANKING OF RESULTS
+
+    "topleft" puts the results that start nearest the top of the grid first, then those nearest its left, then those
+    that end nearest the top left. "longest" puts the results that span the greatest distance across the grid first,
+    which puts diagonal results ahead of straight ones, and "direction" puts them in the order of "DIRECTION_PRIORITY".
+    Both break ties in the same way as "topleft".
+
+    :param ranking: The name of the ranking, being one of "RESULT_RANKINGS" other than "found"
+    :return: A function that gives the key of a result, the best ranked result having the smallest key
+    """
+
+    def topLeftKey(result: WordSearchResult) -> Tuple[int, ...]:
+        return result.startY, result.startX, result.endY, result.endX
+
+    def longestKey(result: WordSearchResult) -> Tuple[int, ...]:
+        return (-((result.endX - result.startX) ** 2 + (result.endY - result.startY) ** 2),) + topLeftKey(result)
 
-    #Return the full list of results that have been extracted
-    return extractionResults
+    def directionKey(result: WordSearchResult) -> Tuple[int, ...]:
+        #A result of a single letter has no direction, and is ranked after every direction
+        step: Tuple[int, int] = ((result.endX > result.startX) - (result.endX < result.startX),
+                                 (result.endY > result.startY) - (result.endY < result.startY))
+        priority: int = DIRECTION_PRIORITY.index(step) if step in DIRECTION_PRIORITY else len(DIRECTION_PRIORITY)
+        return (priority,) + topLeftKey(result)
+
+    rankingKeys = {"topleft": topLeftKey, "longest": longestKey, "direction": directionKey}
+    if ranking not in rankingKeys:
+        raise ValueError("The result ranking \"{}\" is not recognised".format(ranking))
+    return rankingKeys[ranking]
+
+"""
+########################################################################################################################
+FUNCTION TO RANK THE RESULTS OF A WORD, KEEPING NO MORE THAN A GIVEN NUMBER OF THE BEST OF THEM
+"""
+def rankResults(results: Iterable[WordSearchResult], ranking: str = "found", maxHits: int = None) \
+        -> List[WordSearchResult]:
+    """
+    FUNCTION TO RANK THE RESULTS OF A WORD, KEEPING NO MORE THAN A GIVEN NUMBER OF THE BEST OF THEM
+
+    The results are read one at a time, and when a limit is given only the best "maxHits" of those read so far are
+    held, in a heap, so a lazy search of a word with millions of instances needs memory for just the results kept.
+    Results that rank the same stay in the order they were found, so the ranking is the same on every run.
+
+    :param results: The results of the word, such as a list or a generator that is still searching
+    :param ranking: The name of the ranking, being one of "RESULT_RANKINGS"
+    :param maxHits: The most results to keep. All of them are kept when not provided.
+    :return: A list of the best ranked results, best first. With the "found" ranking, these are the first found.
+    """
+
+    if ranking == "found":
+        #The search already gives the results in this order, so a lazy search can stop once enough are found
+        return list(islice(results, maxHits))
+    elif maxHits is None:
+        return sorted(results, key=resultRankingKey(ranking))
+    else:
+        return heapq.nsmallest(maxHits, results, key=resultRankingKey(ranking))
+
+"""
+########################################################################################################################
+FUNCTION TO CHECK THAT A WORD LIST FROM OUTSIDE THE PROGRAM CAN BE SEARCHED FOR
+"""
+def checkWordList(words: Any) -> List[str]:
+    """
+    FUNCTION TO CHECK THAT A WORD LIST FROM OUTSIDE THE PROGRAM CAN BE SEARCHED FOR
+
+    Word lists read from a file are always strings, but those decoded from JSON may hold anything, and a single string
+    would otherwise be searched for one letter at a time.
+
+    :param words: The decoded word list
+    :return: The word list, as a list
+    """
+
+    if not isinstance(words, list):
+        raise ValueError("The words must be a list of strings, not {}".format(type(words).__name__))
+    for word in words:
+        if not isinstance(word, str):
+            raise ValueError("Each word must be a string, not {}".format(type(word).__name__))
+        elif len(word) == 0:
+            raise ValueError("The words must not be empty")
+
+    return words
+
+"""
+########################################################################################################################
+FUNCTION TO CHECK THAT THE OPTIONS OF A SEARCH CAN BE USED TOGETHER
+"""
+def checkSearchOptions(engine: str = "standard", memoise: bool = False, columnar: bool = False,
+                       overlapping: bool = False, firstOnly: bool = False, ranked: bool = False):
+    """
+    FUNCTION TO CHECK THAT THE OPTIONS OF A SEARCH CAN BE USED TOGETHER
+
+    :param engine: The name of the search engine, as accepted by "runLoadedWordSearch"
+    :param memoise: Whether a memo of earlier results is to be used
+    :param columnar: Whether the results of each word are to be held as columns of coordinates
+    :param overlapping: Whether overlapping matches are to be found
+    :param firstOnly: Whether only the first result of each word is wanted
+    :param ranked: Whether the results are to be ranked or cut down by "runRankedWordSearch"
+    :return: No return, but a ValueError is raised for the first combination of options that isn't supported
+    """
+
+    if overlapping and engine not in ("standard", "ahocorasick", "bitparallel"):
+        raise ValueError("The search engine \"{}\" does not support overlapping matches".format(engine))
+    elif (memoise or columnar) and engine != "standard":
+        raise ValueError("The search engine \"{}\" does not support {}".format(
+            engine, "the result memo" if memoise else "columnar results"))
+    elif memoise and overlapping:
+        raise ValueError("The result memo does not support overlapping matches")
+    elif columnar and (firstOnly or ranked):
+        #Columnar results hold every result in the order found, so they can't be cut down to the first or the best
+        raise ValueError("Columnar results can't be combined with {}".format(
+            "first-match mode" if firstOnly else "a ranking or most hits"))
 
 """
 ########################################################################################################################
 FUNCTION TO EXTRACT ALL WORDS FROM A LOADED WORD SEARCH
 """
-def runLoadedWordSearch(wordSearch: WordSearch) -> Dict[str, List[WordSearchResult]]:
+def runLoadedWordSearch(wordSearch: WordSearch, engine: str = "standard", memo: SearchMemo = None,
+                        firstOnly: bool = False, columnar: bool = False, overlapping: bool = False,
+                        patterns: bool = False) -> Dict[str, List[WordSearchResult]]:
     """
     FUNCTION TO EXTRACT ALL WORDS FROM A LOADED WORD SEARCH
 
     :param wordSearch: The word search information that has been loaded into the required class
+    :param engine: The name of the search engine to use. "standard" scans every line once per word, while
+                   "ahocorasick" builds a single automaton over all the words and scans every line once. "numpy"
+                   compares shifted copies of the whole grid for each word, and "auto" uses the NumPy engine for the
+                   short words of large grids and the standard engine otherwise. "indexed" only searches the lines
+                   that an n-gram index of the grid allows, keeping the index in an on-disk cache for later runs.
+                   "bitparallel" advances a Shift-And state over every word at once, one bit per word character.
+    :param memo: An optional memo of earlier results, used to skip words that have already been searched for in the
+                 same grid, in any case and in either direction. Only the standard engine supports this.
+    :param firstOnly: A boolean that, when True, lets the standard engine stop searching for each word as soon as it
+                      has found the first result, which is the same result that a full search would list first. The list
+                      for each word then holds at most that one result.
+    :param columnar: A boolean that, when True, has the standard engine store the results of each word in a
+                     "ColumnarResults" container rather than a list, which takes far less memory for dense grids. It
+                     can't be combined with "firstOnly", which holds just one result, or with the other engines.
+    :param overlapping: A boolean that, when True, also finds the instances of each word that overlap an earlier
+                        instance on the same line. Only the standard, Aho-Corasick and bit-parallel engines support
+                        this, and it can't be combined with the memo.
+    :param patterns: A boolean that, when True, treats every word as a wildcard pattern such as "C?T" or "[AEIOU]..S".
+                     Words marked with the "PATTERN_MARKER" are treated as patterns either way, and are searched for
+                     with a bitset index of the grid while the other words go to the chosen engine.
     :return: A dictionary, keyed by the words that were searched for in the grid and containing each of their list of
              "WordSearchResult" objects.
     """
 
+    #Refuse the options that the chosen engine would otherwise silently ignore
+    checkSearchOptions(engine, memo is not None, columnar, overlapping, firstOnly)
+
+    #Search for the patterns over a bitset index of the grid, and for the plain words with the chosen engine
+    patternWords: List[str] = [word for word in wordSearch.words if patterns or isPatternWord(word)]
+    if len(patternWords) > 0:
+        plainSearch: WordSearch = WordSearch.fromLineFamilies(
+            [word for word in wordSearch.words if not (patterns or isPatternWord(word))], wordSearch.horizontalLines,
+            wordSearch.verticalLines, wordSearch.diagonalLines, wordSearch.antiDiagonalLines)
+        plainResults = runLoadedWordSearch(plainSearch, engine, memo, firstOnly, columnar, overlapping) \
+            if len(plainSearch.words) > 0 else dict()
+        plainResults.update(runPatternWordSearch(wordSearch, patternWords, firstOnly, overlapping))
+
+        #The patterns are matched against bitsets of the lines, so the lines they read are not counted
+        if WordSearch_Profiling.activeCounters is not None:
+            WordSearch_Profiling.activeCounters.markUncounted("linesScanned", "indexCalls")
+        return {searchWord: plainResults[searchWord] for searchWord in wordSearch.words}
+
+    #Hand off to the alternative engine if one has been requested
+    if engine == "ahocorasick":
+        return runAhoCorasickWordSearch(wordSearch, overlapping)
+    elif engine == "bitparallel":
+        return runBitParallelWordSearch(wordSearch, overlapping)
+    elif engine == "indexed":
+        #Imported here as the cache module builds on the functions in this module
+        from WordSearch_Cache import runIndexedWordSearch
+        return runIndexedWordSearch(wordSearch)
+    elif engine not in ("standard", "numpy", "auto"):
+        raise ValueError("The search engine \"{}\" is not recognised".format(engine))
+
+    #Load the grid for the NumPy engine if it may be used; The automatic engine only uses it when it is worthwhile
+    numpyGrid = None
+    gridCells: int = len(wordSearch.horizontalLines) * len(wordSearch.verticalLines)
+    if engine == "numpy" or (engine == "auto" and gridCells >= NUMPY_MIN_GRID_CELLS):
+        try:
+            numpyGrid = buildNumpyGrid(wordSearch.horizontalLines)
+        except ImportError:
+            if engine == "numpy":
+                raise
+
+    #The NumPy engine compares the whole grid at once rather than reading it line by line, so it isn't counted
+    if numpyGrid is not None and WordSearch_Profiling.activeCounters is not None:
+        WordSearch_Profiling.activeCounters.markUncounted("linesScanned", "indexCalls")
+
     #Declare the empty output dictionary
     outputDict: Dict[str, List[WordSearchResult]] = dict()
 
+    #Serve the words from the memo where possible, searching for and memoising the rest
+    if memo is not None:
+        fingerprint: str = gridFingerprint(wordSearch.horizontalLines)
+        for searchWord in wordSearch.words:
+            results = memo.lookup(fingerprint, searchWord)
+            if results is None:
+                lineResults = extractInstancesByLine(searchWord, wordSearch)
+                memo.store(fingerprint, searchWord, lineResults)
+                results = [result for _, lineResult in lineResults for result in lineResult]
+            outputDict[searchWord] = results
+
+        return outputDict
+
+    #Take just the first result of the lazy search for each word if that is all that is needed
+    if firstOnly and engine == "standard":
+        for searchWord in wordSearch.words:
+            firstResult: WordSearchResult = next(iterateInstancesAcrossAllLines(
+                searchWord, wordSearch.horizontalLines, wordSearch.verticalLines, wordSearch.diagonalLines,
+                wordSearch.antiDiagonalLines, overlapping), None)
+            outputDict[searchWord] = [firstResult] if firstResult is not None else []
+
+        return outputDict
+
+    #Store the results of each word as columns of coordinates if asked
+    if columnar:
+        for searchWord in wordSearch.words:
+            outputDict[searchWord] = extractColumnarInstances(searchWord, wordSearch, overlapping)
+
+        return outputDict
+
     #Perform the extraction for each of the words in the word-search. Add the entries as a new part of the dictionary
     for searchWord in wordSearch.words:
-        results: List[WordSearchResult] = \
-            extractInstancesAcrossAllLines(searchWord, wordSearch.horizontalLines, wordSearch.verticalLines)
+        if numpyGrid is not None and (engine == "numpy" or len(searchWord) <= NUMPY_MAX_WORD_LENGTH):
+            results: List[WordSearchResult] = extractInstancesWithNumpy(searchWord, numpyGrid)
+        else:
+            results: List[WordSearchResult] = \
+                extractInstancesAcrossAllLines(searchWord, wordSearch.horizontalLines, wordSearch.verticalLines,
+                                               wordSearch.diagonalLines, wordSearch.antiDiagonalLines, overlapping)
 
         outputDict[searchWord] = results
 
     #Return the dictionary with the relevant entries
     return outputDict
 
+"""
+########################################################################################################################
+FUNCTION TO EXTRACT ALL WORDS FROM A LOADED WORD SEARCH, RANKING THE RESULTS OF EACH WORD
+"""
+def runRankedWordSearch(wordSearch: WordSearch, ranking: str = "found", maxHits: int = None,
+                        engine: str = "standard", memo: SearchMemo = None, overlapping: bool = False,
+                        patterns: bool = False) -> Dict[str, List[WordSearchResult]]:
+    """
+    FUNCTION TO EXTRACT ALL WORDS FROM A LOADED WORD SEARCH, RANKING THE RESULTS OF EACH WORD
+
+    The standard engine's lazy search is ranked as it runs, holding no more than "maxHits" results of each word. The
+    results of the other engines are ranked once they have all been found.
+
+    :param wordSearch: The word search information that has been loaded into the required class
+    :param ranking: The order to list the results of each word in, being one of "RESULT_RANKINGS"
+    :param maxHits: The most results to keep for each word, being the best ranked. A value of 1 gives the best ranked
+                    result of each word, and all of them are kept when not provided.
+    :param engine: The name of the search engine to use, as accepted by "runLoadedWordSearch"
+    :param memo: An optional memo of earlier results, as accepted by "runLoadedWordSearch"
+    :param overlapping: A boolean that, when True, also finds the instances that overlap an earlier instance
+    :param patterns: A boolean that, when True, treats every word as a wildcard pattern
+    :return: A dictionary, keyed by the words that were searched for in the grid and containing each of their list of
+             ranked "WordSearchResult" objects.
+    """
+
+    if ranking not in RESULT_RANKINGS:
+        raise ValueError("The result ranking \"{}\" is not recognised".format(ranking))
+    elif maxHits is not None and maxHits < 1:
+        raise ValueError("The most hits for each word must be at least 1, not {}".format(maxHits))
+    checkSearchOptions(engine, memo is not None, overlapping=overlapping, ranked=True)
+
+    #The standard engine's lazy search is ranked as it runs, so a word with many instances never has them all held
+    if engine == "standard" and memo is None and not patterns and \
+            not any(isPatternWord(word) for word in wordSearch.words):
+        return {searchWord: rankResults(iterateInstancesAcrossAllLines(
+            searchWord, wordSearch.horizontalLines, wordSearch.verticalLines, wordSearch.diagonalLines,
+            wordSearch.antiDiagonalLines, overlapping), ranking, maxHits) for searchWord in wordSearch.words}
+
+    #The other engines give every result at once, so rank them afterwards; In the order found, the first is enough
+    fullResults = runLoadedWordSearch(wordSearch, engine, memo, firstOnly=ranking == "found" and maxHits == 1,
+                                      overlapping=overlapping, patterns=patterns)
+    return {searchWord: rankResults(results, ranking, maxHits) for searchWord, results in fullResults.items()}
+
 """
 ########################################################################################################################
 FUNCTION TO DETERMINE WHAT THE OUTPUT FILE PATH SHOULD BE BASED ON THE INPUT FILE PATH
 """
-def determineOutputPath(inputPath: str) -> str:
+def determineOutputPath(inputPath: str, claim: bool = False) -> str:
     """
     FUNCTION TO DETERMINE WHAT THE OUTPUT FILE PATH SHOULD BE BASED ON THE INPUT FILE PATH
 
+    The directory is listed to find the offset numbers already used, and the lowest free one is taken, so gaps left by
+    deleted files are filled. The offsets in use are kept in "outputOffsetCache" along with the modification time of
+    the directory, so later runs on the same input only list the directory again if another writer has changed it. The
+    least recently used output paths are dropped once it holds "OUTPUT_OFFSET_CACHE_MAX_ENTRIES" of them.
+
     :param inputPath: The input file path for this project run
+    :param claim: A boolean that, when True, creates the output file as it is chosen so that no other run, in this
+                  process or any other, can be given the same path. Without it the path is only checked to be free.
     :return: A valid but currently unused output file path in the same directory as the input
     """
 
@@ -157,35 +697,145 @@ def determineOutputPath(inputPath: str) -> str:
 
     #Join the path parts together
     outputPath: str = breakChar.join(dirParts)
+    directory, separator, _ = outputPath.rpartition(breakChar)
+    directory = directory or separator or "."
 
-    #Check that this file doesn't already exist. Append on an offset number if it does
-    if Path(outputPath).is_file():
-        #Add an offset to ensure that the file path isn't filled
-        count: int = 1
+    #Use the offsets found earlier unless the directory has changed since, dropping them and listing it again if it has
+    cachedOffsets: Tuple[int, Set[int], int] = outputOffsetCache.pop(outputPath, None)
+    if cachedOffsets is not None and cachedOffsets[0] == directoryModifiedTime(directory):
+        _, usedOffsets, offset = cachedOffsets
+    else:
+        usedOffsets: Set[int] = usedOutputOffsets(outputPath, breakChar)
+        offset: int = 0
+
+    #Take the lowest free offset, creating the file exclusively if it is to be claimed
+    while True:
+        while offset in usedOffsets:
+            offset += 1
+        offsetPath: str = outputPath if offset == 0 else \
+            "{}_{}.{}".format(outputPath[:outputPath.rindex(".")], offset, outputPath[outputPath.rindex(".") + 1:])
+        if claim:
+            try:
+                os.close(os.open(offsetPath, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                usedOffsets.add(offset)
+                break
+            except FileExistsError:
+                #Another writer has taken paths since the directory was listed, so list it again
+                usedOffsets = usedOutputOffsets(outputPath, breakChar) | {offset}
+                offset = 0
+        elif os.path.isfile(offsetPath):
+            usedOffsets.add(offset)
+        else:
+            break
 
-        while True:
-            pathParts: List[str] = outputPath.split(".")
-            offsetPath: str = ".".join(pathParts[:-1]) + "_" + str(count) + "." + pathParts[-1]
+    #Note the modification time after this run's own claim, so that only changes made by other writers are re-listed
+    outputOffsetCache[outputPath] = (directoryModifiedTime(directory), usedOffsets, offset)
+    while len(outputOffsetCache) > OUTPUT_OFFSET_CACHE_MAX_ENTRIES:
+        outputOffsetCache.popitem(last=False)
+    return offsetPath
 
-            #See if the offset path is unique. If not, increment the count and loop
-            if Path(offsetPath).is_file():
-                count += 1
-            else:
-                outputPath = offsetPath
+"""
+########################################################################################################################
+FUNCTION TO READ THE MODIFICATION TIME OF A DIRECTORY
+"""
+def directoryModifiedTime(directory: str) -> int:
+    """
+    FUNCTION TO READ THE MODIFICATION TIME OF A DIRECTORY
+
+    :param directory: The path of the directory
+    :return: The modification time in nanoseconds, which changes whenever a file is added to or removed from the
+             directory, or -1 if it can't be read
+    """
+
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return -1
+
+"""
+########################################################################################################################
+FUNCTION TO FIND THE OFFSET NUMBERS IN USE FOR AN OUTPUT PATH WITH A SINGLE LISTING OF ITS DIRECTORY
+"""
+def usedOutputOffsets(outputPath: str, breakChar: str = "/") -> Set[int]:
+    """
+    FUNCTION TO FIND THE OFFSET NUMBERS IN USE FOR AN OUTPUT PATH WITH A SINGLE LISTING OF ITS DIRECTORY
+
+    :param outputPath: The output path before any offset is added, such as "Folder/Puzzle.out"
+    :param breakChar: The character that splits the directories of the path
+    :return: The set of offset numbers whose files exist, where offset 0 is the output path itself and offset 1 is
+             "Folder/Puzzle_1.out"
+    """
+
+    directory, separator, outputFile = outputPath.rpartition(breakChar)
+    outputStem, _, outputType = outputFile.rpartition(".")
+
+    try:
+        fileNames: List[str] = os.listdir(directory or separator or ".")
+    except OSError:
+        return set()
+
+    #Read the offset number out of each "{stem}_{offset}.{type}" file name
+    usedOffsets: Set[int] = {0} if outputFile in fileNames else set()
+    for fileName in fileNames:
+        if fileName.startswith(outputStem + "_") and fileName.endswith("." + outputType):
+            offsetText: str = fileName[len(outputStem) + 1:len(fileName) - len(outputType) - 1]
+            if offsetText.isdigit():
+                usedOffsets.add(int(offsetText))
+
+    return usedOffsets
+
+"""
+########################################################################################################################
+FUNCTION TO WRITE THE OUTPUT LINES FOR THE RESULTS OF A WORD SEARCH TO AN OPEN TEXT STREAM
+"""
+def writeResultLines(file: TextIO, wordList: Iterable[str], results: Dict[str, Iterable[WordSearchResult]],
+                     showAll: bool = False, linePrefix: str = ""):
+    """
+    FUNCTION TO WRITE THE OUTPUT LINES FOR THE RESULTS OF A WORD SEARCH TO AN OPEN TEXT STREAM
+
+    :param file: The open text stream, such as a file or "io.StringIO", that the lines are written to
+    :param wordList: The list of words that were searched for in the word search
+    :param results: The word-keyed dictionary containing the results of the word search
+    :param showAll: A boolean indicating whether the top result for each word or all the results for each word should
+                    be written out.
+    :param linePrefix: An optional string written at the start of every line, such as the ID of the puzzle in a batch
+    :return: No return, but a line is written for each result, or for each word that was not found
+    """
+
+    write = file.write
+    for word in wordList:
+        #Pull the content if it exists and write the output lines.
+        # - Offset of 1 applied so that the top corner is coded as (1,1) rather than the python standard of (0,0)
+        wordResults = results.get(word)
+        resultsWritten: bool = False
+
+        #Columnar results can be formatted straight from their coordinates
+        if showAll and isinstance(wordResults, ColumnarResults) and len(wordResults) > 0:
+            for outputLine in wordResults.outputLines(1):
+                write(linePrefix + outputLine + "\n")
+            continue
+
+        for item in (wordResults if wordResults is not None else ()):
+            write(linePrefix + item.createOutputLine(1) + "\n")
+            resultsWritten = True
+            if not showAll:
                 break
 
-    #Return the derived output path
-    return outputPath
+        if not resultsWritten:
+            write(linePrefix + word.upper() + " not found\n")
 
 """
 ########################################################################################################################
 FUNCTION TO WRITE THE RESULTS OF OF THE WORD SEARCH PROCESS TO FILE
 """
-def writeTheResultsToFile(wordList: List[str], outputPath: str, results: Dict[str, List[WordSearchResult]],
+def writeTheResultsToFile(wordList: Iterable[str], outputPath: str, results: Dict[str, Iterable[WordSearchResult]],
                           showAll: bool = False) -> str:
     """
     FUNCTION TO WRITE THE RESULTS OF OF THE WORD SEARCH PROCESS TO FILE
 
+    Each line is handed to a buffered file as soon as it is formatted, so the memory used does not grow with the
+    number of results. The results of a word may be any iterable, including a generator that is still searching.
+
     :param wordList: The list of words that were searched for in the word search
     :param outputPath: The output path that the results are to be written to
     :param results: The word-keyed dictionary containing the results of the word search
@@ -195,28 +845,49 @@ def writeTheResultsToFile(wordList: List[str], outputPath: str, results: Dict[st
              written.
     """
 
-    #Run through the words in the list, adding their results to the output content string
-    outputContent: str = ""
-
-    for word in wordList:
-        #Pull the content if it exists and convert to the output string.
-        # - Offset of 1 applied so that the top corner is coded as (1,1) rather than the python standard of (0,0)
-        try:
-            if showAll and len(results[word]) > 0:
-                currentResult = "\n".join([item.createOutputLine(1) for item in results[word]])
-            elif showAll:
-                currentResult = word.upper() + " not found"
-            else:
-                currentResult = results[word][0].createOutputLine(1)
-        except (KeyError, IndexError):
-            currentResult = word.upper() + " not found"
-
-        #Add the entry to the output string
-        outputContent += currentResult + "\n"
-
-    #Write the information out to file
-    with open(outputPath, "w") as file:
-        file.write(outputContent)
+    #Run through the words in the list, writing their results out as they are formatted
+    with open(outputPath, "w", buffering=OUTPUT_BUFFER_BYTES) as file:
+        writeResultLines(file, wordList, results, showAll)
 
     #Return from writing to file; Return a message with the output path infixed
-    return "Results of word search written out. The output file is \"{}\"".format(outputPath)
\ No newline at end of file
+    return "Results of word search written out. The output file is \"{}\"".format(outputPath)
+
+"""
+########################################################################################################################
+FUNCTION TO REMOVE A VALUED OPTION, SUCH AS "--jobs 4", FROM THE COMMAND LINE ARGUMENTS
+"""
+def popOption(arguments: List[str], option: str) -> str:
+    """
+    FUNCTION TO REMOVE A VALUED OPTION, SUCH AS "--jobs 4", FROM THE COMMAND LINE ARGUMENTS
+
+    :param arguments: The command line arguments. The option and its value are removed from this list in place.
+    :param option: The name of the option, including its leading dashes
+    :return: The value given for the option, or None if the option was not provided
+    """
+
+    if option not in arguments:
+        return None
+
+    index: int = arguments.index(option)
+    value: str = arguments[index + 1] if index + 1 < len(arguments) else None
+    del arguments[index:index + 2]
+    return value
+
+"""
+########################################################################################################################
+FUNCTION TO REMOVE A FLAG OPTION, SUCH AS "--stream", FROM THE COMMAND LINE ARGUMENTS
+"""
+def popFlag(arguments: List[str], option: str) -> bool:
+    """
+    FUNCTION TO REMOVE A FLAG OPTION, SUCH AS "--stream", FROM THE COMMAND LINE ARGUMENTS
+
+    :param arguments: The command line arguments. The flag is removed from this list in place.
+    :param option: The name of the flag, including its leading dashes
+    :return: A boolean indicating whether or not the flag was provided
+    """
+
+    if option not in arguments:
+        return False
+
+    arguments.remove(option)
+    return True
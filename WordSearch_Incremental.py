@@ -0,0 +1,136 @@
+"""
+########################################################################################################################
+# INCREMENTAL RE-SEARCHING OF A WORD SEARCH AS ITS GRID IS EDITED
+# Author:           Angus Berg
+# Date Created:     12/11/2021
+########################################################################################################################
+"""
+from typing import List, Tuple, Dict, Set
+from WordSearch_Classes import WordSearchResult, WordSearch, LINE_DIRECTIONS, cellLinePositions
+from WordSearch_Functions import extractAllInstancesInLine
+
+"""
+#######################################################################
+# CLASS TO KEEP THE RESULTS OF A WORD SEARCH UP TO DATE AS ITS GRID IS EDITED
+#######################################################################
+"""
+class IncrementalSearch:
+    #Initialisation function to run the full search once
+    def __init__(self, wordSearch: WordSearch):
+        """
+        CLASS TO KEEP THE RESULTS OF A WORD SEARCH UP TO DATE AS ITS GRID IS EDITED
+
+        The results of each word are held line by line, so that an edit only re-searches the row, column and diagonal
+        lines through the changed cells. Whole lines are re-searched, rather than just the cells near the edit, as the
+        non-overlapping matches further along a line can shift when an earlier match appears or disappears. Only the
+        words holding the character that a cell had or has now are re-searched, as no other word's matches can change.
+
+        :param wordSearch: The word search to keep the results of. Its grid is changed in place by "editCells".
+        """
+
+        self.wordSearch: WordSearch = wordSearch
+        self.lineResults: Dict[str, Dict[Tuple[int, int], List[WordSearchResult]]] = dict()
+        self.characterWords: Dict[str, Set[str]] = dict()
+        self.wordOrder: Dict[str, int] = dict()
+
+        gridHeight: int = len(wordSearch.horizontalLines)
+        for searchWord in dict.fromkeys(wordSearch.words):
+            wordLines: Dict[Tuple[int, int], List[WordSearchResult]] = dict()
+            for familyIndex, (direction, lines) in enumerate(wordSearch.lineFamilies()):
+                for index, line in enumerate(lines):
+                    results = extractAllInstancesInLine(searchWord, line, index, direction=direction,
+                                                        gridHeight=gridHeight)
+                    if len(results) > 0:
+                        wordLines[(familyIndex, index)] = results
+            self.lineResults[searchWord] = wordLines
+
+            #Index the word under each of its characters, as matching ignores case
+            self.wordOrder[searchWord] = len(self.wordOrder)
+            for character in set(searchWord.lower()):
+                self.characterWords.setdefault(character, set()).add(searchWord)
+
+    #Function to give the current results of every word
+    def results(self) -> Dict[str, List[WordSearchResult]]:
+        """
+        METHOD TO GIVE THE CURRENT RESULTS OF EVERY WORD
+
+        :return: A dictionary of the results of each word, the same as "runLoadedWordSearch" would give for the grid as
+                 it is now
+        """
+
+        return {searchWord: [result for lineKey in sorted(wordLines) for result in wordLines[lineKey]]
+                for searchWord, wordLines in self.lineResults.items()}
+
+    #Function to edit cells of the grid and re-search the lines through them
+    def editCells(self, edits: List[Tuple[int, int, str]]) \
+            -> Tuple[Dict[str, List[WordSearchResult]], Dict[str, List[WordSearchResult]]]:
+        """
+        METHOD TO EDIT CELLS OF THE GRID AND RE-SEARCH ONLY THE LINES THAT PASS THROUGH THEM
+
+        :param edits: The "(X, Y, character)" changes to make, in order
+        :return: A tuple of two dictionaries, the first holding the results that the edits added and the second the
+                 results that they removed. Words whose results didn't change are left out of both.
+        """
+
+        edits = list(edits)
+        gridHeight: int = len(self.wordSearch.horizontalLines)
+        gridWidth: int = len(self.wordSearch.verticalLines)
+
+        #Note the characters that each line loses and gains. Edits outside the grid are rejected by "setCells" below
+        lineCharacters: Dict[Tuple[str, int], Set[str]] = dict()
+        for x, y, character in edits:
+            if 0 <= x < gridWidth and 0 <= y < gridHeight:
+                editCharacters: Set[str] = {self.wordSearch.horizontalLines[y][x].lower(), character.lower()}
+                for direction, lineIndex, _ in cellLinePositions(x, y, gridHeight):
+                    lineCharacters.setdefault((direction, lineIndex), set()).update(editCharacters)
+
+        changedLines: List[Tuple[str, int]] = self.wordSearch.setCells(edits)
+        familyLines = dict(self.wordSearch.lineFamilies())
+        addedResults: Dict[str, List[WordSearchResult]] = dict()
+        removedResults: Dict[str, List[WordSearchResult]] = dict()
+
+        for direction, lineIndex in changedLines:
+            lineKey: Tuple[int, int] = (LINE_DIRECTIONS.index(direction), lineIndex)
+            line: str = familyLines[direction][lineIndex]
+            lineWords: Set[str] = set()
+            for character in lineCharacters[(direction, lineIndex)]:
+                lineWords.update(self.characterWords.get(character, ()))
+
+            #Re-search the words in the order of the word list, skipping any too long to fit on the line
+            for searchWord in sorted(lineWords, key=self.wordOrder.__getitem__):
+                if len(searchWord) > len(line):
+                    continue
+
+                wordLines = self.lineResults[searchWord]
+                newResults: List[WordSearchResult] = extractAllInstancesInLine(
+                    searchWord, line, lineIndex, direction=direction, gridHeight=gridHeight)
+                oldResults: List[WordSearchResult] = wordLines.pop(lineKey, [])
+                if len(newResults) > 0:
+                    wordLines[lineKey] = newResults
+
+                #Compare the results of the line by their coordinates
+                oldSpans = set(resultSpan(rr) for rr in oldResults)
+                newSpans = set(resultSpan(rr) for rr in newResults)
+                if oldSpans != newSpans:
+                    addedResults.setdefault(searchWord, []).extend(
+                        [rr for rr in newResults if resultSpan(rr) not in oldSpans])
+                    removedResults.setdefault(searchWord, []).extend(
+                        [rr for rr in oldResults if resultSpan(rr) not in newSpans])
+
+        #Leave each word out of the dictionary that it has nothing in, as it may only have gained or only lost results
+        return ({word: results for word, results in addedResults.items() if len(results) > 0},
+                {word: results for word, results in removedResults.items() if len(results) > 0})
+
+"""
+########################################################################################################################
+FUNCTION TO GIVE THE COORDINATES OF A RESULT, FOR COMPARING RESULTS
+"""
+def resultSpan(result: WordSearchResult) -> Tuple[int, int, int, int]:
+    """
+    FUNCTION TO GIVE THE COORDINATES OF A RESULT, FOR COMPARING RESULTS
+
+    :param result: The result
+    :return: A tuple of the start X, start Y, end X and end Y of the result
+    """
+
+    return result.startX, result.startY, result.endX, result.endY
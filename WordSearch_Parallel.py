@@ -0,0 +1,192 @@
+"""
+########################################################################################################################
+# WORD-LEVEL PARALLEL SEARCHING OF A SINGLE LARGE WORD SEARCH
+# Author:           Angus Berg
+# Date Created:     12/11/2021
+########################################################################################################################
+"""
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Dict, Tuple, Sequence, Iterator
+import WordSearch_Profiling
+from WordSearch_Classes import WordSearchResult, WordSearch
+from WordSearch_Functions import runLoadedWordSearch
+
+#The type code and size of each entry of the table of line end offsets at the start of the shared memory block
+OFFSET_TYPE_CODE: str = "q"
+OFFSET_BYTES: int = array(OFFSET_TYPE_CODE).itemsize
+
+#The shared memory block attached by this worker process, and the grid lines read from it. Set once by the initialiser.
+workerSharedBlock: shared_memory.SharedMemory = None
+workerLineFamilies: List["SharedLines"] = []
+
+"""
+#######################################################################
+# CLASS TO PRESENT GRID LINES HELD IN SHARED MEMORY AS A SEQUENCE
+#######################################################################
+"""
+class SharedLines:
+    #Initialisation function for the lines
+    def __init__(self, lineBytes: memoryview, lineEnds: memoryview, firstLine: int, lineCount: int):
+        """
+        CLASS TO PRESENT A FAMILY OF GRID LINES HELD IN SHARED MEMORY AS A SEQUENCE OF STRINGS
+
+        Each line is decoded from the shared block only when it is read, so a worker never holds its own copy of the
+        whole grid.
+
+        :param lineBytes: The encoded lines of every family, back to back
+        :param lineEnds: The offset into "lineBytes" of the end of each line of every family
+        :param firstLine: The index in "lineEnds" of the first line of this family
+        :param lineCount: The number of lines in this family
+        """
+
+        self.lineBytes: memoryview = lineBytes
+        self.lineEnds: memoryview = lineEnds
+        self.firstLine: int = firstLine
+        self.lineCount: int = lineCount
+
+    def __len__(self) -> int:
+        return self.lineCount
+
+    def __getitem__(self, lineIndex: int) -> str:
+        if lineIndex < 0:
+            lineIndex += self.lineCount
+        if not 0 <= lineIndex < self.lineCount:
+            raise IndexError("The line index {} is outside of the grid".format(lineIndex))
+
+        endIndex: int = self.firstLine + lineIndex
+        startOffset: int = self.lineEnds[endIndex - 1] if endIndex > 0 else 0
+        return str(self.lineBytes[startOffset:self.lineEnds[endIndex]], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for lineIndex in range(self.lineCount):
+            yield self[lineIndex]
+
+"""
+########################################################################################################################
+FUNCTION TO LAY THE FAMILIES OF GRID LINES OUT AS BYTES FOR SHARED MEMORY
+"""
+def encodeLineFamilies(lineFamilies: List[Sequence[str]]) -> bytes:
+    """
+    FUNCTION TO LAY THE FAMILIES OF GRID LINES OUT AS BYTES FOR SHARED MEMORY
+
+    The bytes start with a table holding the end offset of every line, followed by the encoded lines back to back, so
+    a line can hold any character and is found without scanning for a separator.
+
+    :param lineFamilies: The lines of each family, in the order of "lineFamilies"
+    :return: The offsets table followed by the encoded lines
+    """
+
+    encodedLines: List[bytes] = [line.encode("utf-8") for lines in lineFamilies for line in lines]
+    lineEnds: array = array(OFFSET_TYPE_CODE)
+    lineEnd: int = 0
+    for encodedLine in encodedLines:
+        lineEnd += len(encodedLine)
+        lineEnds.append(lineEnd)
+
+    return lineEnds.tobytes() + b"".join(encodedLines)
+
+"""
+########################################################################################################################
+FUNCTION TO ATTACH TO THE GRID LINES IN SHARED MEMORY WHEN A WORKER PROCESS STARTS
+"""
+def attachSharedGrid(memoryName: str, byteCount: int, familySizes: List[int]):
+    """
+    FUNCTION TO ATTACH TO THE GRID LINES IN SHARED MEMORY WHEN A WORKER PROCESS STARTS
+
+    :param memoryName: The name of the shared memory block holding the grid lines, as laid out by "encodeLineFamilies"
+    :param byteCount: The number of bytes of the block that hold the offsets table and the encoded lines
+    :param familySizes: The number of lines in each of the families of lines, in the order of "lineFamilies"
+    :return: No return, but the block stays attached for the life of the worker and its lines are stored in
+             "workerLineFamilies" for the tasks of this worker
+    """
+
+    #Attach to the block, keeping it open while the worker runs; The parent process is responsible for unlinking it
+    global workerSharedBlock
+    workerSharedBlock = shared_memory.SharedMemory(name=memoryName)
+    tableBytes: int = sum(familySizes) * OFFSET_BYTES
+    lineEnds: memoryview = workerSharedBlock.buf[:tableBytes].cast(OFFSET_TYPE_CODE)
+    lineBytes: memoryview = workerSharedBlock.buf[tableBytes:byteCount]
+
+    #Split the lines back out into their families without copying them
+    workerLineFamilies.clear()
+    firstLine: int = 0
+    for familySize in familySizes:
+        workerLineFamilies.append(SharedLines(lineBytes, lineEnds, firstLine, familySize))
+        firstLine += familySize
+
+"""
+########################################################################################################################
+FUNCTION TO SEARCH FOR ONE SHARD OF THE WORD LIST IN A WORKER PROCESS
+"""
+def searchWordShard(words: List[str], engine: str = "standard", overlapping: bool = False, patterns: bool = False) \
+        -> Dict[str, List[WordSearchResult]]:
+    """
+    FUNCTION TO SEARCH FOR ONE SHARD OF THE WORD LIST IN A WORKER PROCESS
+
+    :param words: The words of this shard
+    :param engine: The name of the search engine to use, as accepted by "runLoadedWordSearch"
+    :param overlapping: A boolean that, when True, also finds the instances that overlap an earlier instance
+    :param patterns: A boolean that, when True, treats every word as a wildcard pattern
+    :return: The results dictionary for the words of this shard
+    """
+
+    return runLoadedWordSearch(WordSearch.fromLineFamilies(words, *workerLineFamilies), engine,
+                               overlapping=overlapping, patterns=patterns)
+
+"""
+########################################################################################################################
+FUNCTION TO EXTRACT ALL WORDS FROM A LOADED WORD SEARCH, SPLITTING THE WORD LIST ACROSS WORKER PROCESSES
+"""
+def runShardedWordSearch(wordSearch: WordSearch, workers: int, engine: str = "standard", overlapping: bool = False,
+                         patterns: bool = False) -> Dict[str, List[WordSearchResult]]:
+    """
+    FUNCTION TO EXTRACT ALL WORDS FROM A LOADED WORD SEARCH, SPLITTING THE WORD LIST ACROSS WORKER PROCESSES
+
+    The grid lines are placed in shared memory once and read in place by each worker, so only the words of each shard
+    are sent with a task. The results are returned in the same order as "runLoadedWordSearch" returns them.
+
+    :param wordSearch: The word search information that has been loaded into the required class
+    :param workers: The number of worker processes to use
+    :param engine: The name of the search engine to use in each worker, as accepted by "runLoadedWordSearch"
+    :param overlapping: A boolean that, when True, also finds the instances that overlap an earlier instance
+    :param patterns: A boolean that, when True, treats every word as a wildcard pattern
+    :return: A dictionary, keyed by the words that were searched for in the grid and containing each of their list of
+             "WordSearchResult" objects.
+    """
+
+    #The lines are searched in the worker processes, whose counters are not sent back
+    if WordSearch_Profiling.activeCounters is not None:
+        WordSearch_Profiling.activeCounters.markUncounted("linesScanned", "indexCalls")
+
+    #Split the distinct words into more shards than workers so that slow shards don't hold up the whole run
+    uniqueWords: List[str] = list(dict.fromkeys(wordSearch.words))
+    shardCount: int = max(1, min(len(uniqueWords), workers * 4))
+    shardSize: int = -(-len(uniqueWords) // shardCount)
+    shards: List[List[str]] = [uniqueWords[ii:ii + shardSize] for ii in range(0, len(uniqueWords), shardSize)]
+
+    #Place every family of lines into a single shared memory block, behind a table of where each line ends
+    lineFamilies: List[Tuple[str, Sequence[str]]] = wordSearch.lineFamilies()
+    encodedLines: bytes = encodeLineFamilies([lines for _, lines in lineFamilies])
+    familySizes: List[int] = [len(lines) for _, lines in lineFamilies]
+
+    sharedBlock = shared_memory.SharedMemory(create=True, size=max(1, len(encodedLines)))
+    try:
+        sharedBlock.buf[:len(encodedLines)] = encodedLines
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=attachSharedGrid,
+                                 initargs=(sharedBlock.name, len(encodedLines), familySizes)) as executor:
+            shardResults: List[Dict[str, List[WordSearchResult]]] = \
+                list(executor.map(searchWordShard, shards, [engine] * len(shards), [overlapping] * len(shards),
+                                  [patterns] * len(shards)))
+    finally:
+        sharedBlock.close()
+        sharedBlock.unlink()
+
+    #Merge the shard results back together in the original word order
+    mergedResults: Dict[str, List[WordSearchResult]] = dict()
+    for shardResult in shardResults:
+        mergedResults.update(shardResult)
+
+    return {searchWord: mergedResults[searchWord] for searchWord in wordSearch.words}
@@ -0,0 +1,283 @@
+"""
+########################################################################################################################
+# WILDCARD AND CHARACTER-CLASS PATTERN SEARCHING OVER A BITSET INDEX OF THE GRID
+# Author:           Angus Berg
+# Date Created:     12/11/2021
+########################################################################################################################
+"""
+from typing import List, Tuple, Dict, Iterator, FrozenSet, Optional
+from WordSearch_Classes import WordSearchResult, WordSearch, lineOffsetToGrid
+
+#The prefix that marks a word of the word list as a pattern, such as "~C?T"
+PATTERN_MARKER: str = "~"
+
+#The characters that match any single character of the grid
+PATTERN_WILDCARDS: str = "?."
+
+#A parsed pattern; One entry per character position, each being None for a wildcard or "(negated, characters)"
+PatternClasses = List[Optional[Tuple[bool, FrozenSet[str]]]]
+
+"""
+#######################################################################
+# CUSTOM EXCEPTION CLASS THROWN WHEN PARSING INVALID SEARCH PATTERNS
+#######################################################################
+"""
+class InvalidSearchPattern(ValueError):
+    pass
+
+"""
+#######################################################################
+# CLASS TO HOLD THE PER-CHARACTER POSITION BITSETS OF EVERY LINE OF A GRID
+#######################################################################
+"""
+class PatternIndex:
+    #Initialisation function to build the bitsets of every line
+    def __init__(self, wordSearch: WordSearch):
+        """
+        CLASS TO HOLD THE PER-CHARACTER POSITION BITSETS OF EVERY LINE OF A GRID
+
+        For each lower-cased line, every character that appears on it maps to an integer with bit "i" set when the
+        character is at offset "i". A pattern is then matched against a whole line with a handful of shifts and ANDs,
+        and a line is skipped as soon as one of the pattern's positions can't be matched anywhere on it.
+
+        :param wordSearch: The word search information that has been loaded into the required class
+        """
+
+        self.gridHeight: int = len(wordSearch.horizontalLines)
+        self.lineFamilies: List[Tuple[str, List[str]]] = []
+        self.lineBits: List[List[Dict[str, int]]] = []
+
+        for direction, lines in wordSearch.lineFamilies():
+            lowerLines: List[str] = [line.lower() for line in lines]
+            self.lineFamilies.append((direction, lowerLines))
+            self.lineBits.append([characterBitsets(line) for line in lowerLines])
+
+    #Function to find the instances of a pattern across every line, one line at a time
+    def iterateInstances(self, pattern: str, overlapping: bool = False) -> Iterator[WordSearchResult]:
+        """
+        METHOD TO LAZILY FIND THE INSTANCES OF A PATTERN ACROSS EVERY LINE OF THE GRID
+
+        The lines are searched in the same order as the standard search, with the backward instances of each line
+        ahead of its forward instances, and a pattern that reads the same both ways is only searched for forwards.
+
+        :param pattern: The pattern, with or without its marker
+        :param overlapping: A boolean that, when True, also finds the instances that overlap an earlier instance
+        :return: A generator of the "WordSearchResults" class for every instance, each holding the upper-case
+                 characters that the pattern matched, in reading order
+        """
+
+        forwardClasses: PatternClasses = parsePattern(pattern)
+        backwardClasses: PatternClasses = forwardClasses[::-1]
+        palindrome: bool = forwardClasses == backwardClasses
+
+        for (direction, lines), familyBits in zip(self.lineFamilies, self.lineBits):
+            for lineNum, (line, lineBits) in enumerate(zip(lines, familyBits)):
+                backwardSpans: List[Tuple[int, int]] = [] if palindrome else \
+                    findPatternSpans(backwardClasses, lineBits, len(line), overlapping)
+                forwardSpans: List[Tuple[int, int]] = findPatternSpans(forwardClasses, lineBits, len(line), overlapping)
+
+                searchResults: List[Tuple[int, int]] = [(bb[1], bb[0]) for bb in backwardSpans]
+                searchResults.extend(forwardSpans)
+                for startOffset, endOffset in searchResults:
+                    matchedText: str = line[min(startOffset, endOffset):max(startOffset, endOffset) + 1]
+                    if startOffset > endOffset:
+                        matchedText = matchedText[::-1]
+                    yield WordSearchResult(matchedText.upper(),
+                                           lineOffsetToGrid(direction, lineNum, startOffset, self.gridHeight),
+                                           lineOffsetToGrid(direction, lineNum, endOffset, self.gridHeight))
+
+"""
+########################################################################################################################
+FUNCTION TO CHECK WHETHER A WORD OF THE WORD LIST IS MARKED AS A PATTERN
+"""
+def isPatternWord(word: str) -> bool:
+    """
+    FUNCTION TO CHECK WHETHER A WORD OF THE WORD LIST IS MARKED AS A PATTERN
+
+    :param word: The word from the word list
+    :return: True if the word starts with the "PATTERN_MARKER"
+    """
+
+    return word.startswith(PATTERN_MARKER)
+
+"""
+########################################################################################################################
+FUNCTION TO PARSE A PATTERN INTO THE CHARACTERS ALLOWED AT EACH POSITION
+"""
+def parsePattern(pattern: str) -> PatternClasses:
+    """
+    FUNCTION TO PARSE A PATTERN INTO THE CHARACTERS ALLOWED AT EACH POSITION
+
+    "?" and "." match any one character, "[AEIOU]" any one of the listed characters, "[A-F]" any in the range,
+    "[^AEIOU]" any character that isn't listed, and a backslash matches the character after it literally. Every other
+    character matches itself. Matching ignores case, as the standard search does.
+
+    :param pattern: The pattern, with or without its marker
+    :return: A list with one entry for each character position of the pattern, being None for a wildcard or a
+             "(negated, characters)" tuple of the lower-case characters that are or, when negated, are not allowed
+    """
+
+    if isPatternWord(pattern):
+        pattern = pattern[len(PATTERN_MARKER):]
+    lowerPattern: str = pattern.lower()
+
+    patternClasses: PatternClasses = []
+    index: int = 0
+    while index < len(lowerPattern):
+        character: str = lowerPattern[index]
+        if character in PATTERN_WILDCARDS:
+            patternClasses.append(None)
+        elif character == "\\":
+            if index + 1 >= len(lowerPattern):
+                raise InvalidSearchPattern("The pattern \"{}\" ends with an unfinished escape".format(pattern))
+            index += 1
+            patternClasses.append((False, frozenset(lowerPattern[index])))
+        elif character == "[":
+            closingIndex: int = lowerPattern.find("]", index + 1)
+            if closingIndex < 0:
+                raise InvalidSearchPattern("The pattern \"{}\" has an unclosed character class".format(pattern))
+            patternClasses.append(parseCharacterClass(lowerPattern[index + 1:closingIndex], pattern))
+            index = closingIndex
+        else:
+            patternClasses.append((False, frozenset(character)))
+        index += 1
+
+    if len(patternClasses) == 0:
+        raise InvalidSearchPattern("The pattern \"{}\" is empty".format(pattern))
+    return patternClasses
+
+"""
+########################################################################################################################
+FUNCTION TO PARSE THE CONTENTS OF A CHARACTER CLASS
+"""
+def parseCharacterClass(classContents: str, pattern: str) -> Tuple[bool, FrozenSet[str]]:
+    """
+    FUNCTION TO PARSE THE CONTENTS OF A CHARACTER CLASS, BEING THE TEXT BETWEEN ITS SQUARE BRACKETS
+
+    :param classContents: The lower-case text between the brackets
+    :param pattern: The full pattern, for the error messages
+    :return: A "(negated, characters)" tuple of the characters listed by the class
+    """
+
+    negated: bool = classContents.startswith("^")
+    if negated:
+        classContents = classContents[1:]
+
+    characters = set()
+    index: int = 0
+    while index < len(classContents):
+        #A dash between two characters is a range, while a dash at either end is itself
+        if index + 2 < len(classContents) and classContents[index + 1] == "-":
+            if classContents[index] > classContents[index + 2]:
+                raise InvalidSearchPattern("The pattern \"{}\" has a backwards range".format(pattern))
+            characters.update(chr(cc) for cc in range(ord(classContents[index]), ord(classContents[index + 2]) + 1))
+            index += 3
+        else:
+            characters.add(classContents[index])
+            index += 1
+
+    if len(characters) == 0:
+        raise InvalidSearchPattern("The pattern \"{}\" has an empty character class".format(pattern))
+    return negated, frozenset(characters)
+
+"""
+########################################################################################################################
+FUNCTION TO BUILD THE POSITION BITSET OF EACH CHARACTER OF A LINE
+"""
+def characterBitsets(line: str) -> Dict[str, int]:
+    """
+    FUNCTION TO BUILD THE POSITION BITSET OF EACH CHARACTER OF A LINE
+
+    :param line: The line
+    :return: A dictionary from each character on the line to an integer with bit "i" set where it is at offset "i"
+    """
+
+    #Each bitset is read from a string of ones and zeros, built by translating the reversed line in one go
+    reversedLine: str = line[::-1]
+    distinctCharacters = set(line)
+    bitsets: Dict[str, int] = dict()
+    for character in distinctCharacters:
+        translation = {ord(cc): "1" if cc == character else "0" for cc in distinctCharacters}
+        bitsets[character] = int(reversedLine.translate(translation), 2)
+
+    return bitsets
+
+"""
+########################################################################################################################
+FUNCTION TO FIND THE INSTANCES OF A PARSED PATTERN ON ONE LINE FROM ITS BITSETS
+"""
+def findPatternSpans(patternClasses: PatternClasses, lineBits: Dict[str, int], lineLength: int,
+                     overlapping: bool = False) -> List[Tuple[int, int]]:
+    """
+    FUNCTION TO FIND THE INSTANCES OF A PARSED PATTERN ON ONE LINE FROM ITS BITSETS
+
+    :param patternClasses: The pattern, as returned by "parsePattern"
+    :param lineBits: The bitsets of the line, as returned by "characterBitsets"
+    :param lineLength: The number of characters in the line
+    :param overlapping: A boolean that, when True, also keeps the instances that overlap an earlier instance
+    :return: A list of "(start, end)" offsets of the leftmost non-overlapping instances, or of every instance
+    """
+
+    patternLength: int = len(patternClasses)
+    if patternLength > lineLength:
+        return []
+
+    #Start with every offset that the pattern fits at, and knock out those where any one position doesn't match
+    lineMask: int = (1 << lineLength) - 1
+    matchStarts: int = (1 << (lineLength - patternLength + 1)) - 1
+    for offset, patternClass in enumerate(patternClasses):
+        if patternClass is None:
+            continue
+
+        negated, characters = patternClass
+        positionBits: int = 0
+        for character in characters:
+            positionBits |= lineBits.get(character, 0)
+        if negated:
+            positionBits = ~positionBits & lineMask
+
+        matchStarts &= positionBits >> offset
+        if matchStarts == 0:
+            return []
+
+    #Read the offsets off from the lowest bit up, dropping those that overlap the last instance kept unless wanted
+    spans: List[Tuple[int, int]] = []
+    while matchStarts:
+        startOffset: int = (matchStarts & -matchStarts).bit_length() - 1
+        spans.append((startOffset, startOffset + patternLength - 1))
+        if overlapping:
+            matchStarts &= matchStarts - 1
+        else:
+            matchStarts &= ~((1 << (startOffset + patternLength)) - 1)
+
+    return spans
+
+"""
+########################################################################################################################
+FUNCTION TO EXTRACT ALL THE PATTERNS OF A WORD LIST FROM A LOADED WORD SEARCH
+"""
+def runPatternWordSearch(wordSearch: WordSearch, patternWords: List[str], firstOnly: bool = False,
+                         overlapping: bool = False, patternIndex: PatternIndex = None) \
+        -> Dict[str, List[WordSearchResult]]:
+    """
+    FUNCTION TO EXTRACT ALL THE PATTERNS OF A WORD LIST FROM A LOADED WORD SEARCH
+
+    :param wordSearch: The word search information that has been loaded into the required class
+    :param patternWords: The patterns to search for, with or without their markers
+    :param firstOnly: A boolean that, when True, stops searching for each pattern at its first instance
+    :param overlapping: A boolean that, when True, also finds the instances that overlap an earlier instance
+    :param patternIndex: An index of the grid that is already held in memory. One is built when not provided.
+    :return: A dictionary, keyed by the patterns and containing each of their list of "WordSearchResult" objects
+    """
+
+    patternIndex = patternIndex or PatternIndex(wordSearch)
+    outputDict: Dict[str, List[WordSearchResult]] = dict()
+    for pattern in patternWords:
+        instances: Iterator[WordSearchResult] = patternIndex.iterateInstances(pattern, overlapping)
+        if firstOnly:
+            firstResult: WordSearchResult = next(instances, None)
+            outputDict[pattern] = [firstResult] if firstResult is not None else []
+        else:
+            outputDict[pattern] = list(instances)
+
+    return outputDict
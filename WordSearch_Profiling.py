@@ -0,0 +1,194 @@
+"""
+########################################################################################################################
+# PER-STAGE PROFILING OF THE WORD SEARCH PROGRAM
+# Author:           Angus Berg
+# Date Created:     12/11/2021
+########################################################################################################################
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import List, Tuple, Dict, Set, Any
+
+#The environment variable that turns profiling on. A value of "stderr" or "-" writes to stderr, any other is a file path
+PROFILE_ENVIRONMENT_VARIABLE: str = "WORDSEARCH_PROFILE"
+
+#The counters of the profile being collected, or None when profiling is turned off. Set by "StageProfiler".
+activeCounters = None
+
+"""
+#######################################################################
+# CLASS TO COUNT THE WORK DONE BY THE LINE-BY-LINE SEARCH
+#######################################################################
+"""
+class SearchCounters:
+    #Initialisation function to zero the counters
+    def __init__(self):
+        """
+        CLASS TO COUNT THE WORK DONE BY THE LINE-BY-LINE SEARCH
+        """
+
+        self.linesScanned: int = 0
+        self.indexCalls: int = 0
+        self.uncounted: Set[str] = set()
+
+    #Function to count one line searched by "extractAllInstancesInLine"
+    def countLine(self, lineLength: int, *searchResults: List[Tuple[int, int]], overlapping: bool = False):
+        """
+        METHOD TO COUNT ONE LINE SEARCHED BY "extractAllInstancesInLine"
+
+        :param lineLength: The number of characters in the line
+        :param searchResults: The lists of "(start, end)" tuples returned by each "findWordsInString" call on the line
+        :param overlapping: Whether the calls were for overlapping matches, where each search restarts after the start
+                            of the last hit rather than after its end
+        :return: No return, but the counters are updated
+        """
+
+        self.linesScanned += 1
+        for results in searchResults:
+            #Every hit is one call, plus the call that fails unless the last hit ran to the end of the line
+            nextStart: int = results[-1][0 if overlapping else 1] + 1 if len(results) > 0 else 0
+            self.indexCalls += len(results) + (1 if nextStart < lineLength else 0)
+
+    #Function to mark the counters that the search in use doesn't record
+    def markUncounted(self, *names: str):
+        """
+        METHOD TO MARK THE COUNTERS THAT THE SEARCH IN USE DOESN'T RECORD, SUCH AS FOR THE NUMPY ENGINE OR WORKERS
+
+        :param names: The names of the counters, being "linesScanned" or "indexCalls"
+        :return: No return, but the counters are reported as None rather than as a count of 0
+        """
+
+        self.uncounted.update(names)
+
+"""
+#######################################################################
+# CLASS TO TIME THE STAGES OF ONE RUN AND REPORT THEM WITH ITS COUNTERS
+#######################################################################
+"""
+class StageProfiler:
+    #Initialisation function to set where the profile is to be written
+    def __init__(self, target: str = None, inputPath: str = None):
+        """
+        CLASS TO TIME THE STAGES OF ONE RUN AND REPORT THEM WITH ITS COUNTERS
+
+        Used as a context manager around the run. While it is open, the line searches add to its counters,
+        and on a successful exit the profile is written as a single line of JSON. When the target is None nothing is
+        timed, counted or written.
+
+        :param target: Where to write the profile; "stderr" or "-" for stderr, or otherwise the path of a stats file
+                       that is appended to. None turns profiling off.
+        :param inputPath: The path of the input file being profiled, recorded in the profile
+        """
+
+        self.target: str = target
+        self.enabled: bool = target is not None
+        self.counters: SearchCounters = SearchCounters()
+        self.stages: Dict[str, float] = dict()
+        self.metrics: Dict[str, Any] = {"input": inputPath}
+        self.previousCounters = None
+
+    #Function to start collecting the counters
+    def __enter__(self):
+        global activeCounters
+        if self.enabled:
+            self.previousCounters = activeCounters
+            activeCounters = self.counters
+        return self
+
+    #Function to stop collecting the counters and write out the profile
+    def __exit__(self, errorType, errorValue, traceback):
+        global activeCounters
+        if self.enabled:
+            activeCounters = self.previousCounters
+            if errorType is None:
+                self.writeProfile()
+        return False
+
+    #Function to time one stage of the run
+    def stage(self, name: str):
+        """
+        METHOD TO TIME ONE STAGE OF THE RUN
+
+        :param name: The name that the stage is recorded under
+        :return: A context manager that times the code inside it, or does nothing if profiling is turned off
+        """
+
+        return self.timedStage(name) if self.enabled else nullcontext()
+
+    #Function to time one stage of the run while profiling is turned on
+    @contextmanager
+    def timedStage(self, name: str):
+        """
+        METHOD TO TIME ONE STAGE OF THE RUN, ADDING TO ANY TIME ALREADY RECORDED UNDER THE SAME NAME
+
+        :param name: The name that the stage is recorded under
+        """
+
+        startTime: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - startTime
+
+    #Function to record a single value in the profile
+    def record(self, name: str, value: Any):
+        """
+        METHOD TO RECORD A SINGLE VALUE IN THE PROFILE
+
+        :param name: The name of the value
+        :param value: The value, which must be JSON serialisable
+        :return: No return, but the value is kept if profiling is turned on
+        """
+
+        if self.enabled:
+            self.metrics[name] = value
+
+    #Function to build the profile
+    def profile(self) -> Dict[str, Any]:
+        """
+        METHOD TO BUILD THE PROFILE
+
+        :return: A dictionary of the recorded values, the time of each stage and the search counters
+        """
+
+        profile: Dict[str, Any] = dict(self.metrics)
+        profile["stages"] = dict(self.stages)
+        profile["totalSeconds"] = sum(self.stages.values())
+        for name in ("linesScanned", "indexCalls"):
+            profile[name] = None if name in self.counters.uncounted else getattr(self.counters, name)
+        return profile
+
+    #Function to write the profile to its target
+    def writeProfile(self):
+        """
+        METHOD TO WRITE THE PROFILE TO ITS TARGET AS ONE LINE OF JSON
+
+        :return: No return, but the profile is written to stderr or appended to the stats file
+        """
+
+        #Imported here as profiles are only written when profiling is turned on
+        import json
+
+        profileLine: str = json.dumps(self.profile()) + "\n"
+        if self.target in ("stderr", "-"):
+            sys.stderr.write(profileLine)
+        else:
+            #A single write in append mode, so that the lines of parallel runs don't interleave
+            with open(self.target, "a") as file:
+                file.write(profileLine)
+
+"""
+########################################################################################################################
+FUNCTION TO FIND WHERE PROFILES SHOULD BE WRITTEN
+"""
+def profileTargetFromEnvironment() -> str:
+    """
+    FUNCTION TO FIND WHERE PROFILES SHOULD BE WRITTEN WHEN NO TARGET HAS BEEN GIVEN
+
+    :return: The value of the "WORDSEARCH_PROFILE" environment variable, or None if it is unset, empty or "0"
+    """
+
+    target: str = os.environ.get(PROFILE_ENVIRONMENT_VARIABLE)
+    return target if target not in (None, "", "0") else None
@@ -0,0 +1,655 @@
+"""
+########################################################################################################################
+# LONG-RUNNING WORD SEARCH SERVER WITH A REGISTRY OF LOADED GRIDS
+# Author:           Angus Berg
+# Date Created:     12/11/2021
+########################################################################################################################
+"""
+import io
+import os
+import sys
+import json
+import time
+import socket
+import random
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Dict, Any, Union
+from WordSearch_Classes import WordSearch, InvalidWordSearchFile, gridFingerprint
+from WordSearch_Functions import runLoadedWordSearch, writeResultLines, checkWordList, popOption
+from WordSearch_Cache import GridIndex, loadOrBuildGridIndex, runIndexedWordSearch
+
+#The default limit on the estimated memory held by the grids and indexes of a registry
+DEFAULT_REGISTRY_MAX_BYTES: int = 1024 * 1024 * 1024
+
+#The longest request line that the server will read, which bounds the size of a grid sent inline
+MAX_REQUEST_BYTES: int = 256 * 1024 * 1024
+
+"""
+#######################################################################
+# EXCEPTION RAISED BY THE CLIENT WHEN THE SERVER REPORTS AN ERROR
+#######################################################################
+"""
+class WordSearchServerError(Exception):
+    pass
+
+"""
+#######################################################################
+# CLASS TO HOLD ONE GRID IN THE REGISTRY
+#######################################################################
+"""
+class RegisteredGrid:
+    #Initialisation function to hold the parsed grid
+    def __init__(self, gridId: str, wordSearch: WordSearch):
+        """
+        CLASS TO HOLD ONE PARSED GRID IN THE REGISTRY, ALONG WITH ITS INDEX ONCE ONE HAS BEEN BUILT
+
+        :param gridId: The ID that clients use to refer to the grid
+        :param wordSearch: The parsed word search. Its own word list is not used.
+        """
+
+        self.gridId: str = gridId
+        self.wordSearch: WordSearch = wordSearch
+        self.gridIndex: GridIndex = None
+        self.activeRequests: int = 0
+        self.lastUsed: float = time.monotonic()
+        self.gridBytes: int = estimateWordSearchBytes(wordSearch)
+        self.indexBytes: int = 0
+
+    #Function to give the estimated memory held by the grid and its index
+    def estimatedBytes(self) -> int:
+        """
+        METHOD TO GIVE THE ESTIMATED MEMORY HELD BY THE GRID AND ITS INDEX
+
+        :return: The estimated number of bytes
+        """
+
+        return self.gridBytes + self.indexBytes
+
+"""
+########################################################################################################################
+FUNCTION TO ESTIMATE THE MEMORY HELD BY THE LINES OF A WORD SEARCH
+"""
+def estimateWordSearchBytes(wordSearch: WordSearch) -> int:
+    """
+    FUNCTION TO ESTIMATE THE MEMORY HELD BY THE LINES OF A WORD SEARCH
+
+    :param wordSearch: The word search whose lines are held
+    :return: The estimated number of bytes, counting every family of lines for grids that hold them as lists
+    """
+
+    if getattr(wordSearch, "grid", None) is not None:
+        return wordSearch.grid.width * wordSearch.grid.height
+
+    return sum(sys.getsizeof(line) for _, lines in wordSearch.lineFamilies() for line in lines)
+
+"""
+########################################################################################################################
+FUNCTION TO ESTIMATE THE MEMORY HELD BY A GRID INDEX
+"""
+def estimateIndexBytes(gridIndex: GridIndex) -> int:
+    """
+    FUNCTION TO ESTIMATE THE MEMORY HELD BY A GRID INDEX
+
+    :param gridIndex: The index of the grid
+    :return: The estimated number of bytes of the n-grams and their postings
+    """
+
+    return sum(sys.getsizeof(gram) + sys.getsizeof(postings) for gram, postings in gridIndex.grams.items())
+
+"""
+#######################################################################
+# CLASS TO HOLD THE LOADED GRIDS UNDER THEIR IDS
+#######################################################################
+"""
+class GridRegistry:
+    #Initialisation function to create the empty registry
+    def __init__(self, maxBytes: int = DEFAULT_REGISTRY_MAX_BYTES):
+        """
+        CLASS TO HOLD PARSED GRIDS UNDER THEIR IDS, EVICTING IDLE GRIDS WHEN A MEMORY LIMIT IS PASSED
+
+        The registry is only used from the server's event loop, so it doesn't need a lock.
+
+        :param maxBytes: The limit on the estimated memory held by the grids and their indexes
+        """
+
+        self.maxBytes: int = maxBytes
+        self.entries: "OrderedDict[str, RegisteredGrid]" = OrderedDict()
+        self.evictions: int = 0
+
+    #Function to give the estimated memory held by every grid
+    def totalBytes(self) -> int:
+        """
+        METHOD TO GIVE THE ESTIMATED MEMORY HELD BY EVERY GRID AND INDEX IN THE REGISTRY
+
+        :return: The estimated number of bytes
+        """
+
+        return sum(entry.estimatedBytes() for entry in self.entries.values())
+
+    #Function to add a grid to the registry
+    def register(self, wordSearch: WordSearch, gridId: str = None) -> str:
+        """
+        METHOD TO ADD A PARSED GRID TO THE REGISTRY, REPLACING ANY GRID ALREADY HELD UNDER THE SAME ID
+
+        :param wordSearch: The parsed word search
+        :param gridId: The ID to hold the grid under. Defaults to the fingerprint of the grid.
+        :return: The ID that the grid is held under
+        """
+
+        gridId = gridId or gridFingerprint(wordSearch.horizontalLines)
+        self.entries[gridId] = RegisteredGrid(gridId, wordSearch)
+        self.entries.move_to_end(gridId)
+        self.evictIdle(keepId=gridId)
+        return gridId
+
+    #Function to take a grid out of the registry
+    def unregister(self, gridId: str) -> bool:
+        """
+        METHOD TO TAKE A GRID OUT OF THE REGISTRY
+
+        :param gridId: The ID of the grid
+        :return: A boolean indicating whether or not the grid was held
+        """
+
+        return self.entries.pop(gridId, None) is not None
+
+    #Function to mark a grid as in use by a request
+    def acquire(self, gridId: str) -> RegisteredGrid:
+        """
+        METHOD TO MARK A GRID AS IN USE BY A REQUEST, SO THAT IT ISN'T EVICTED UNTIL IT IS RELEASED
+
+        :param gridId: The ID of the grid
+        :return: The registered grid
+        """
+
+        entry: RegisteredGrid = self.entries.get(gridId)
+        if entry is None:
+            raise KeyError("The grid \"{}\" is not loaded".format(gridId))
+
+        entry.activeRequests += 1
+        entry.lastUsed = time.monotonic()
+        self.entries.move_to_end(gridId)
+        return entry
+
+    #Function to mark a grid as no longer in use by a request
+    def release(self, entry: RegisteredGrid):
+        """
+        METHOD TO MARK A GRID AS NO LONGER IN USE BY A REQUEST, EVICTING IDLE GRIDS IF THE REGISTRY HAS GROWN
+
+        :param entry: The registered grid, as returned by "acquire"
+        :return: No return, but other idle grids may be evicted
+        """
+
+        entry.activeRequests -= 1
+        if entry.gridIndex is not None and entry.indexBytes == 0:
+            entry.indexBytes = estimateIndexBytes(entry.gridIndex)
+        self.evictIdle(keepId=entry.gridId)
+
+    #Function to evict idle grids until the registry is within its limit
+    def evictIdle(self, keepId: str = None) -> List[str]:
+        """
+        METHOD TO EVICT THE LEAST RECENTLY USED IDLE GRIDS UNTIL THE REGISTRY IS WITHIN ITS MEMORY LIMIT
+
+        :param keepId: The ID of a grid that should never be evicted, such as the one that was just used
+        :return: The IDs of the grids that were evicted
+        """
+
+        evictedIds: List[str] = []
+        totalBytes: int = self.totalBytes()
+
+        #The entries are kept in order of use, so the least recently used are looked at first
+        for gridId, entry in list(self.entries.items()):
+            if totalBytes <= self.maxBytes:
+                break
+            if gridId == keepId or entry.activeRequests > 0:
+                continue
+
+            del self.entries[gridId]
+            totalBytes -= entry.estimatedBytes()
+            evictedIds.append(gridId)
+
+        self.evictions += len(evictedIds)
+        return evictedIds
+
+"""
+########################################################################################################################
+FUNCTION TO SEARCH FOR A LIST OF WORDS IN A REGISTERED GRID
+"""
+def searchRegisteredGrid(entry: RegisteredGrid, words: List[str], engine: str = "standard", showAll: bool = False,
+                         outputFormat: str = "json") -> Dict[str, Any]:
+    """
+    FUNCTION TO SEARCH FOR A LIST OF WORDS IN A REGISTERED GRID
+
+    :param entry: The registered grid
+    :param words: The words to search for
+    :param engine: The name of the search engine to use. The "indexed" engine keeps its index with the grid.
+    :param showAll: A boolean that, when True, returns every result of each word rather than just the first
+    :param outputFormat: "json" to return the 0-based coordinates of each result, or "out" to return the text of the
+                         results file that "writeTheResultsToFile" would write, whose coordinates are 1-based
+    :return: The body of the response
+    """
+
+    #Search the grid with the request's words, sharing the registered lines rather than copying them
+    wordSearch: WordSearch = entry.wordSearch
+    requestSearch: WordSearch = WordSearch.fromLineFamilies(
+        words, wordSearch.horizontalLines, wordSearch.verticalLines, wordSearch.diagonalLines,
+        wordSearch.antiDiagonalLines)
+
+    if engine == "indexed":
+        if entry.gridIndex is None:
+            entry.gridIndex = loadOrBuildGridIndex(wordSearch)
+        results = runIndexedWordSearch(requestSearch, gridIndex=entry.gridIndex)
+    else:
+        results = runLoadedWordSearch(requestSearch, engine, firstOnly=not showAll)
+
+    if outputFormat == "out":
+        outputStream: io.StringIO = io.StringIO()
+        writeResultLines(outputStream, words, results, showAll)
+        return {"output": outputStream.getvalue()}
+    elif outputFormat != "json":
+        raise ValueError("The output format \"{}\" is not recognised".format(outputFormat))
+
+    #Give each result as [startX, startY, endX, endY], keeping just the first of each word unless all are wanted
+    return {"results": {word: [[rr.startX, rr.startY, rr.endX, rr.endY] for rr in
+                               (wordResults if showAll else list(wordResults)[:1])]
+                        for word, wordResults in results.items()}}
+
+"""
+#######################################################################
+# CLASS TO SERVE WORD SEARCHES OVER A LOCAL SOCKET
+#######################################################################
+"""
+class WordSearchServer:
+    #Initialisation function to set up the server around a registry
+    def __init__(self, registry: GridRegistry = None):
+        """
+        CLASS TO SERVE WORD SEARCHES OVER A UNIX SOCKET OR A LOCALHOST TCP PORT
+
+        Each request and response is a single line of JSON. A request names its operation with "op":
+          - "load" parses a grid from a "path" on the server, or from inline "lines", and returns its "id"
+          - "search" searches a loaded grid "id" for a list of non-empty "words", with optional "engine", "all" and "format". The
+            "json" format gives each result as 0-based [startX, startY, endX, endY] coordinates, while the "out" format
+            gives the text of the results file, whose coordinates are 1-based as they are in every results file
+          - "unload" removes a grid "id" from the registry
+          - "stats" reports the grids held and the memory they are estimated to use
+        Any failure is reported as an "error" in the response, and the connection stays open. A request line over
+        "MAX_REQUEST_BYTES" is also answered with an "error", after which the connection is closed.
+
+        :param registry: The registry of loaded grids. Defaults to a new registry with the default memory limit.
+        """
+
+        self.registry: GridRegistry = registry or GridRegistry()
+        self.server: asyncio.AbstractServer = None
+        self.loop: asyncio.AbstractEventLoop = None
+        self.thread: threading.Thread = None
+        self.socketPath: str = None
+
+    #Function to handle a single request
+    async def handleRequest(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        METHOD TO HANDLE A SINGLE REQUEST
+
+        Parsing and searching run in a worker thread, so that the server keeps accepting requests while they run.
+
+        :param request: The decoded request
+        :return: The response to send back
+        """
+
+        if not isinstance(request, dict):
+            raise ValueError("Each request must be a JSON object")
+
+        operation: str = request.get("op")
+        if operation == "load":
+            if request.get("path") is not None:
+                wordSearch = await asyncio.to_thread(WordSearch, request["path"], False,
+                                                     bool(request.get("compact", False)))
+            else:
+                wordSearch = await asyncio.to_thread(WordSearch.fromGridLines, [], request.get("lines") or [],
+                                                     bool(request.get("compact", False)))
+            gridId: str = self.registry.register(wordSearch, request.get("id"))
+            return {"id": gridId, "width": len(wordSearch.verticalLines), "height": len(wordSearch.horizontalLines)}
+
+        elif operation == "search":
+            #Check the words before the grid is acquired, so that a bad request never ties up a grid or a thread
+            words: List[str] = checkWordList(request.get("words", []))
+            entry: RegisteredGrid = self.registry.acquire(request.get("id"))
+            try:
+                return await asyncio.to_thread(searchRegisteredGrid, entry, words,
+                                               request.get("engine", "standard"), bool(request.get("all", False)),
+                                               request.get("format", "json"))
+            finally:
+                self.registry.release(entry)
+
+        elif operation == "unload":
+            return {"unloaded": self.registry.unregister(request.get("id"))}
+
+        elif operation == "stats":
+            return {"grids": [{"id": entry.gridId, "bytes": entry.estimatedBytes(),
+                               "indexed": entry.gridIndex is not None, "activeRequests": entry.activeRequests}
+                              for entry in self.registry.entries.values()],
+                    "totalBytes": self.registry.totalBytes(), "maxBytes": self.registry.maxBytes,
+                    "evictions": self.registry.evictions}
+
+        raise ValueError("The operation \"{}\" is not recognised".format(operation))
+
+    #Function to serve one client connection
+    async def handleConnection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        METHOD TO SERVE ONE CLIENT CONNECTION, ANSWERING ITS REQUESTS IN ORDER UNTIL IT DISCONNECTS
+
+        :param reader: The stream that the requests are read from
+        :param writer: The stream that the responses are written to
+        :return: No return
+        """
+
+        try:
+            while True:
+                #A line over the stream's limit can't be read, so report it and close as the stream can't be resumed
+                try:
+                    requestLine: bytes = await reader.readline()
+                except ValueError:
+                    writer.write(json.dumps({"error": "The request line is longer than the limit of {} bytes".format(
+                        MAX_REQUEST_BYTES)}).encode("utf-8") + b"\n")
+                    await writer.drain()
+                    break
+
+                if len(requestLine) == 0:
+                    break
+
+                try:
+                    response: Dict[str, Any] = await self.handleRequest(json.loads(requestLine))
+                except (InvalidWordSearchFile, OSError, UnicodeDecodeError, KeyError, ValueError, TypeError) as error:
+                    response = {"error": str(error.args[0]) if len(error.args) > 0 else str(error)}
+
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    #Function to start listening for connections
+    async def start(self, socketPath: str = None, host: str = "127.0.0.1", port: int = 0) \
+            -> Union[str, Tuple[str, int]]:
+        """
+        METHOD TO START LISTENING FOR CONNECTIONS
+
+        :param socketPath: The path of a Unix socket to listen on. When not given, a TCP port is used instead.
+        :param host: The host to listen on for TCP connections. Only localhost should be used, as there is no security.
+        :param port: The TCP port to listen on. A port of 0 picks a free port.
+        :return: The address being listened on; the socket path, or a tuple of the host and port
+        """
+
+        if socketPath is not None:
+            self.socketPath = socketPath
+            self.server = await asyncio.start_unix_server(self.handleConnection, path=socketPath,
+                                                          limit=MAX_REQUEST_BYTES)
+            return socketPath
+
+        self.server = await asyncio.start_server(self.handleConnection, host=host, port=port, limit=MAX_REQUEST_BYTES)
+        return self.server.sockets[0].getsockname()[:2]
+
+    #Function to run the server on a background thread
+    def startInThread(self, socketPath: str = None, host: str = "127.0.0.1", port: int = 0) \
+            -> Union[str, Tuple[str, int]]:
+        """
+        METHOD TO RUN THE SERVER ON ITS OWN EVENT LOOP IN A BACKGROUND THREAD, SUCH AS FOR TESTS AND LOAD TESTS
+
+        :param socketPath: The path of a Unix socket to listen on, as for "start"
+        :param host: The host to listen on for TCP connections, as for "start"
+        :param port: The TCP port to listen on, as for "start"
+        :return: The address being listened on, as for "start"
+        """
+
+        self.loop = asyncio.new_event_loop()
+        startup: Dict[str, Any] = dict()
+        ready: threading.Event = threading.Event()
+
+        def runLoop():
+            asyncio.set_event_loop(self.loop)
+            try:
+                startup["address"] = self.loop.run_until_complete(self.start(socketPath, host, port))
+            except OSError as error:
+                startup["error"] = error
+            ready.set()
+            if "error" not in startup:
+                self.loop.run_forever()
+
+        self.thread = threading.Thread(target=runLoop, daemon=True)
+        self.thread.start()
+        ready.wait()
+        if "error" in startup:
+            raise startup["error"]
+        return startup["address"]
+
+    #Function to stop a server that was started on a background thread
+    def stopThread(self):
+        """
+        METHOD TO STOP A SERVER THAT WAS STARTED BY "startInThread"
+
+        :return: No return, but the server is closed and its thread has finished
+        """
+
+        async def closeServer():
+            self.server.close()
+            await self.server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(closeServer(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.removeSocketFile()
+
+    #Function to remove the Unix socket file once the server has stopped
+    def removeSocketFile(self):
+        """
+        METHOD TO REMOVE THE UNIX SOCKET FILE ONCE THE SERVER HAS STOPPED, IF IT WAS LISTENING ON ONE
+
+        :return: No return
+        """
+
+        if self.socketPath is not None and os.path.exists(self.socketPath):
+            os.remove(self.socketPath)
+
+"""
+#######################################################################
+# CLASS TO CONNECT TO A RUNNING SERVER
+#######################################################################
+"""
+class WordSearchClient:
+    #Initialisation function to connect to the server
+    def __init__(self, address: Union[str, Tuple[str, int]]):
+        """
+        CLASS TO CONNECT TO A RUNNING WORD SEARCH SERVER AND SEND IT REQUESTS
+
+        :param address: The path of the server's Unix socket, or a tuple of its host and TCP port
+        """
+
+        if isinstance(address, str):
+            self.connection: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.connection: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.connection.connect(address)
+        self.stream = self.connection.makefile("rwb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, errorType, errorValue, traceback):
+        self.close()
+        return False
+
+    #Function to send one request and wait for its response
+    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        METHOD TO SEND ONE REQUEST AND WAIT FOR ITS RESPONSE
+
+        :param payload: The request, as described by "WordSearchServer"
+        :return: The decoded response
+        """
+
+        self.stream.write(json.dumps(payload).encode("utf-8") + b"\n")
+        self.stream.flush()
+        responseLine: bytes = self.stream.readline()
+        if len(responseLine) == 0:
+            raise WordSearchServerError("The server closed the connection")
+
+        response: Dict[str, Any] = json.loads(responseLine)
+        if "error" in response:
+            raise WordSearchServerError(response["error"])
+        return response
+
+    #Function to load a grid into the server
+    def load(self, path: str = None, lines: List[str] = None, gridId: str = None, compact: bool = False) -> str:
+        """
+        METHOD TO LOAD A GRID INTO THE SERVER, FROM A FILE THAT THE SERVER CAN READ OR FROM LINES SENT WITH THE REQUEST
+
+        :param path: The path of a word search file, as seen by the server
+        :param lines: The horizontal lines of a grid, used when no path is given
+        :param gridId: The ID to hold the grid under. Defaults to the fingerprint of the grid.
+        :param compact: A boolean that, when True, has the server hold the grid as a compact grid
+        :return: The ID that the grid is held under
+        """
+
+        return self.request({"op": "load", "path": path, "lines": lines, "id": gridId, "compact": compact})["id"]
+
+    #Function to search a loaded grid
+    def search(self, gridId: str, words: List[str], showAll: bool = False, engine: str = "standard",
+               outputFormat: str = "json") -> Union[Dict[str, List[List[int]]], str]:
+        """
+        METHOD TO SEARCH A LOADED GRID FOR A LIST OF WORDS
+
+        :param gridId: The ID of the grid
+        :param words: The words to search for
+        :param showAll: A boolean that, when True, returns every result of each word rather than just the first
+        :param engine: The name of the search engine to use
+        :param outputFormat: "json" for the coordinates of each result, or "out" for the text of a results file
+        :return: A dictionary of the "[startX, startY, endX, endY]" results of each word, or the results file text
+        """
+
+        response: Dict[str, Any] = self.request({"op": "search", "id": gridId, "words": list(words), "all": showAll,
+                                                 "engine": engine, "format": outputFormat})
+        return response["output"] if outputFormat == "out" else response["results"]
+
+    #Function to remove a grid from the server
+    def unload(self, gridId: str) -> bool:
+        """
+        METHOD TO REMOVE A GRID FROM THE SERVER
+
+        :param gridId: The ID of the grid
+        :return: A boolean indicating whether or not the grid was loaded
+        """
+
+        return self.request({"op": "unload", "id": gridId})["unloaded"]
+
+    #Function to fetch the server's statistics
+    def stats(self) -> Dict[str, Any]:
+        """
+        METHOD TO FETCH THE GRIDS HELD BY THE SERVER AND THE MEMORY THEY ARE ESTIMATED TO USE
+
+        :return: The statistics, as described by "WordSearchServer"
+        """
+
+        return self.request({"op": "stats"})
+
+    #Function to close the connection
+    def close(self):
+        """
+        METHOD TO CLOSE THE CONNECTION TO THE SERVER
+
+        :return: No return
+        """
+
+        self.stream.close()
+        self.connection.close()
+
+"""
+########################################################################################################################
+FUNCTION TO LOAD TEST A RUNNING SERVER WITH MANY CONCURRENT CLIENTS
+"""
+def runLoadTest(address: Union[str, Tuple[str, int]], gridId: str, words: List[str], clients: int = 8,
+                requestsPerClient: int = 50, wordsPerRequest: int = 10, seed: int = 0) -> Dict[str, Any]:
+    """
+    FUNCTION TO LOAD TEST A RUNNING SERVER WITH MANY CONCURRENT CLIENTS
+
+    Each client holds its own connection and sends its requests one after another, each for a random sample of the
+    words, while the other clients do the same.
+
+    :param address: The address of the server
+    :param gridId: The ID of a grid already loaded into the server
+    :param words: The words that requests are sampled from
+    :param clients: The number of concurrent clients
+    :param requestsPerClient: The number of requests that each client sends
+    :param wordsPerRequest: The number of words in each request
+    :param seed: The seed used to sample the words
+    :return: A dictionary of the number of requests and errors, the throughput and the latency percentiles in seconds
+    """
+
+    def runClient(clientNumber: int) -> Tuple[List[float], int]:
+        generator: random.Random = random.Random(seed * 1000 + clientNumber)
+        latencies: List[float] = []
+        errors: int = 0
+        with WordSearchClient(address) as client:
+            for _ in range(requestsPerClient):
+                requestWords: List[str] = generator.sample(words, min(wordsPerRequest, len(words)))
+                startTime: float = time.perf_counter()
+                try:
+                    client.search(gridId, requestWords)
+                except WordSearchServerError:
+                    errors += 1
+                latencies.append(time.perf_counter() - startTime)
+        return latencies, errors
+
+    testStart: float = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        clientResults: List[Tuple[List[float], int]] = list(executor.map(runClient, range(clients)))
+    testTime: float = time.perf_counter() - testStart
+
+    latencies: List[float] = sorted(latency for clientLatencies, _ in clientResults for latency in clientLatencies)
+    return {"requests": len(latencies), "errors": sum(cc[1] for cc in clientResults), "seconds": testTime,
+            "requestsPerSecond": len(latencies) / testTime if testTime > 0 else 0.0,
+            "p50Seconds": latencies[len(latencies) // 2] if latencies else 0.0,
+            "p95Seconds": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0,
+            "maxSeconds": latencies[-1] if latencies else 0.0}
+
+"""
+########################################################################################################################
+Run the server, or a load test against a temporary server, from here if this is the main
+"""
+if __name__ == '__main__':
+    arguments: List[str] = sys.argv[1:]
+    socketOption: str = popOption(arguments, "--socket")
+    portOption: str = popOption(arguments, "--port") or "8765"
+    maxBytesOption: str = popOption(arguments, "--max-bytes") or str(DEFAULT_REGISTRY_MAX_BYTES)
+    loadTestOption: str = popOption(arguments, "--load-test")
+    clientsOption: str = popOption(arguments, "--clients") or "8"
+    requestsOption: str = popOption(arguments, "--requests") or "50"
+
+    wordSearchServer: WordSearchServer = WordSearchServer(GridRegistry(int(maxBytesOption)))
+
+    if loadTestOption is not None:
+        #Serve the puzzle from a background thread and drive it with the client stand-ins
+        serverAddress = wordSearchServer.startInThread(socketOption, port=0)
+        with WordSearchClient(serverAddress) as setupClient:
+            loadedId: str = setupClient.load(path=loadTestOption)
+        puzzleWords: List[str] = list(WordSearch(loadTestOption).words)
+        print(json.dumps(runLoadTest(serverAddress, loadedId, puzzleWords, int(clientsOption), int(requestsOption)),
+                         indent=2))
+        wordSearchServer.stopThread()
+
+    else:
+        async def serveForever():
+            address = await wordSearchServer.start(socketOption, port=int(portOption))
+            print("Serving word searches on {}".format(address))
+            async with wordSearchServer.server:
+                await wordSearchServer.server.serve_forever()
+
+        try:
+            asyncio.run(serveForever())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            wordSearchServer.removeSocketFile()
@@ -6,10 +6,33 @@
 ########################################################################################################################
 """
 import os
+import sys
+import mmap
+import json
 import pytest
-from typing import List, Dict
+import itertools
+import subprocess
+from typing import List, Dict, Tuple
 import WordSearch_Functions as wsFunc
-from WordSearch_Classes import WordSearchResult, WordSearch, InvalidWordSearchFile
+import WordSearch_Engines as wsEng
+import WordSearch as wsMain
+import WordSearch_Profiling as wsProf
+import WordSearch_Patterns as wsPat
+from WordSearch_Classes import WordSearchResult, WordSearch, InvalidWordSearchFile, buildDiagonalLines, \
+    CompactGrid, MappedGrid, SearchMemo, ColumnarResults, mapGridFromFile
+
+#The optional modules, such as the server, cache and process pools, are imported with "pytest.importorskip" by the tests
+#that use them, so that collecting the suite stays quick and a missing dependency only skips its own tests
+
+#The values given to the options that take one when they are passed to the command line in the tests
+TEST_OPTION_VALUES: Dict[str, List[str]] = {"--engine": ["numpy"], "--workers": ["2"], "--jobs": ["2"],
+                                            "--dictionary": ["dictionary.txt"], "--profile-file": ["profile.txt"]}
+
+#Function to run the word search from the command line with the given arguments, returning what it printed
+def runCommandLine(arguments: List[str], workingDirectory: str) -> str:
+    mainPath: str = os.path.abspath(wsMain.__file__)
+    return subprocess.run([sys.executable, mainPath] + arguments, cwd=workingDirectory, capture_output=True,
+                          text=True, timeout=60).stdout
 
 """
 #######################################################################################
@@ -31,6 +54,47 @@ class TestWordSearchResult:
 
         assert testOutLine in "Test (2, 2) (5, 5)"
 
+    #Test that the result is held without an instance dictionary, so no other attributes can be set on it
+    def test_slottedResult(self):
+        testResult: WordSearchResult = WordSearchResult("TEST", (1, 2), (4, 2))
+        with pytest.raises(AttributeError):
+            testResult.extra = True
+
+"""
+#######################################################################################
+# COLUMNAR RESULTS TESTS
+#######################################################################################
+"""
+class TestColumnarResults:
+    #Test that the columns give back the same results, in the same order, as the standard search
+    def test_matchesStandardResults(self):
+        testSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt")
+        standardResults = wsFunc.runLoadedWordSearch(testSearch)
+        columnarResults = wsFunc.runLoadedWordSearch(testSearch, columnar=True)
+
+        assert all([rr.createOutputLine(1) for rr in standardResults[word]] ==
+                   [rr.createOutputLine(1) for rr in columnarResults[word]] ==
+                   list(columnarResults[word].outputLines(1)) for word in testSearch.words)
+
+    #Test that the container can be indexed like a list
+    def test_indexing(self):
+        testColumns: ColumnarResults = ColumnarResults("CAT")
+        testColumns.append((0, 0), (2, 0))
+        testColumns.append((5, 3), (5, 1))
+
+        assert (len(testColumns) == 2 and testColumns[-1].createOutputLine() == "CAT (5, 3) (5, 1)" and
+                [rr.startX for rr in testColumns[0:2]] == [0, 5])
+
+    #Test that the results file written from the columns is identical to the one written from the lists
+    def test_writtenOutputIdentical(self, tmp_path):
+        testSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt")
+        for fileName, columnar in (("list.out", False), ("columns.out", True)):
+            wsFunc.writeTheResultsToFile(testSearch.words, str(tmp_path / fileName),
+                                         wsFunc.runLoadedWordSearch(testSearch, columnar=columnar), True)
+
+        with open(str(tmp_path / "list.out")) as listFile, open(str(tmp_path / "columns.out")) as columnFile:
+            assert listFile.read() == columnFile.read()
+
 """
 #######################################################################################
 # WORD SEARCH CLASS TESTS
@@ -72,12 +136,148 @@ class TestWordSearch:
         with pytest.raises(InvalidWordSearchFile):
             WordSearch("TestFiles/VariedLengths_TestSearch.txt")
 
+    #Test that the diagonal lines are built once at load and map back to the correct grid positions
+    def test_diagonalLinesMapToGrid(self):
+        testSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt")
+        correctCounts: bool = (len(testSearch.diagonalLines) == 14 and len(testSearch.antiDiagonalLines) == 14)
+
+        correctCharacters: bool = True
+        for direction, lines in testSearch.lineFamilies():
+            for lineIndex, line in enumerate(lines):
+                for offset, char in enumerate(line):
+                    xx, yy = testSearch.gridCoordinates(direction, lineIndex, offset)
+                    correctCharacters = correctCharacters and (testSearch.horizontalLines[yy][xx] == char)
+
+        assert (correctCounts and correctCharacters)
+
+    #Test that the words can be streamed lazily from file, and read again each time that they are iterated
+    def test_streamedWordsMatchReadWords(self):
+        testSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt")
+        streamedSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt", True)
+
+        assert (list(streamedSearch.words) == testSearch.words and list(streamedSearch.words) == testSearch.words and
+                list(streamedSearch.horizontalLines) == testSearch.horizontalLines)
+
+    #Test that streaming the words also holds the grid compactly, finding the same results as a fully loaded search
+    def test_streamedWordsHoldCompactGrid(self):
+        testSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt")
+        streamedSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt", True)
+        testResults = wsFunc.runLoadedWordSearch(testSearch)
+        streamedResults = wsFunc.runLoadedWordSearch(streamedSearch)
+
+        assert (isinstance(streamedSearch.grid, CompactGrid) and
+                {word: [rr.createOutputLine() for rr in results] for word, results in streamedResults.items()} ==
+                {word: [rr.createOutputLine() for rr in results] for word, results in testResults.items()})
+
+    #Test that the class still throws the correct custom error when streaming a file with no words
+    def test_noSearchableWordsWhenStreaming(self):
+        with pytest.raises(InvalidWordSearchFile):
+            WordSearch("TestFiles/NoWords_TestSearch.txt", True)
+
+    #Test that the compact grid gives the same lines in every direction as the lists built at load
+    def test_compactGridLinesMatch(self):
+        testSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt")
+        compactSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt", compactGrid=True)
+
+        assert ([list(lines) for _, lines in compactSearch.lineFamilies()] ==
+                [list(lines) for _, lines in testSearch.lineFamilies()])
+
+    #Test that the compact grid views can be indexed like lists of lines
+    def test_compactGridViewIndexing(self):
+        testGrid: CompactGrid = CompactGrid(["abc", "def"])
+
+        assert (testGrid.rows[-1] == "def" and testGrid.columns[1] == "be" and len(testGrid.diagonals) == 4 and
+                testGrid.antiDiagonals[1] == "db")
+
+    #Test that a memory mapped grid gives the same lines in every direction as the lists built at load
+    def test_mappedGridLinesMatch(self):
+        testSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt")
+        mappedSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt", memoryMapped=True)
+
+        assert (isinstance(mappedSearch.grid, MappedGrid) and mappedSearch.words == testSearch.words and
+                [list(lines) for _, lines in mappedSearch.lineFamilies()] ==
+                [list(lines) for _, lines in testSearch.lineFamilies()])
+
+    #Test that a memory mapped grid handles Windows line breaks and falls back for non-ASCII grids
+    def test_mappedGridLineBreaksAndFallback(self):
+        testPath: str = "TestFiles/mappedTest_temporary.txt"
+        with open(testPath, "wb") as file:
+            file.write(b"\r\nabc\r\ndef\r\n\r\nbe\r\n")
+        crlfSearch: WordSearch = WordSearch(testPath, memoryMapped=True)
+        crlfColumns: List[str] = list(crlfSearch.verticalLines)
+
+        with open(testPath, "w", encoding="utf-8") as file:
+            file.write("ab\u00e9\ndef\n\nbe\n")
+        fallbackSearch: WordSearch = WordSearch(testPath, memoryMapped=True)
+        os.remove(testPath)
+
+        assert (isinstance(crlfSearch.grid, MappedGrid) and crlfColumns == ["ad", "be", "cf"] and
+                crlfSearch.words == ["be"] and not isinstance(fallbackSearch.grid, MappedGrid) and
+                fallbackSearch.horizontalLines[0] == "ab\u00e9")
+
+    #Test that the map is closed when a file is refused or falls back, and by the mapped grid as a context manager
+    def test_mappedGridClosed(self, tmp_path, monkeypatch):
+        openedMaps: List[mmap.mmap] = []
+        originalMap = mmap.mmap
+
+        def recordingMap(*args, **kwargs):
+            openedMaps.append(originalMap(*args, **kwargs))
+            return openedMaps[-1]
+
+        monkeypatch.setattr(mmap, "mmap", recordingMap)
+        testFiles: Dict[str, bytes] = {"ragged.txt": b"abc\nde\n\nab\n", "nowords.txt": b"abc\ndef\n",
+                                       "nonascii.txt": "ab\u00e9\ndef\n\nbe\n".encode("utf-8")}
+        for fileName, fileContent in testFiles.items():
+            (tmp_path / fileName).write_bytes(fileContent)
+            try:
+                WordSearch(str(tmp_path / fileName), memoryMapped=True)
+            except InvalidWordSearchFile:
+                pass
+
+        (tmp_path / "valid.txt").write_bytes(b"abc\ndef\n\nbe\n")
+        with mapGridFromFile(str(tmp_path / "valid.txt"))[0] as mappedGrid:
+            firstRow: str = mappedGrid.rows[0]
+
+        assert (firstRow == "abc" and len(openedMaps) == 4 and all(openedMap.closed for openedMap in openedMaps))
+
+    #Test that the main function releases a mapped grid when writing its results fails, as well as when it succeeds
+    def test_mappedGridClosedOnFailure(self, tmp_path, monkeypatch):
+        openedMaps: List[mmap.mmap] = []
+        originalMap = mmap.mmap
+
+        def recordingMap(*args, **kwargs):
+            openedMaps.append(originalMap(*args, **kwargs))
+            return openedMaps[-1]
+
+        def failingWrite(*args):
+            raise OSError("Disk full")
+
+        monkeypatch.setattr(mmap, "mmap", recordingMap)
+        (tmp_path / "valid.txt").write_bytes(b"abc\ndef\n\nbe\n")
+        wsMain.wordSearchMain(str(tmp_path / "valid.txt"), memoryMapped=True)
+        monkeypatch.setattr(wsMain, "writeTheResultsToFile", failingWrite)
+        with pytest.raises(OSError):
+            wsMain.wordSearchMain(str(tmp_path / "valid.txt"), memoryMapped=True)
+
+        assert len(openedMaps) == 2 and all(openedMap.closed for openedMap in openedMaps)
+
+    #Test that a memory mapped grid still throws the correct custom errors for invalid files
+    def test_mappedGridInvalidFiles(self):
+        for testPath in ["TestFiles/NoContent_TestSearch.txt", "TestFiles/NoWords_TestSearch.txt",
+                         "TestFiles/VariedLengths_TestSearch.txt"]:
+            with pytest.raises(InvalidWordSearchFile):
+                WordSearch(testPath, memoryMapped=True)
+
 """
 #######################################################################################
 # FIND WORDS IN STRING FUNCTION TESTS
 #######################################################################################
 """
 class TestFindWordsInString:
+    #Test that an empty word is never found, rather than the search looping forever on it
+    def test_emptyWordNotFound(self):
+        assert wsFunc.findWordsInString("", "abc") == wsFunc.findWordsInString("", "abc", overlapping=True) == []
+
     #Test that the function can find a word in itself
     def test_matchString(self):
         testResult = wsFunc.findWordsInString("match", "match")
@@ -98,6 +298,28 @@ class TestFindWordsInString:
         testResult = wsFunc.findWordsInString("found", "the chosen word is not in this string")
         assert len(testResult) == 0
 
+    #Test that overlapping instances are only found when asked for
+    def test_overlappingString(self):
+        assert (wsFunc.findWordsInString("aa", "aaa") == [(0, 1)] and
+                wsFunc.findWordsInString("aa", "aaa", overlapping=True) == [(0, 1), (1, 2)])
+
+    #Test that the single pass matcher finds the same spans, in the same order, as the string search
+    def test_singlePassMatchesIndex(self):
+        testCases = [("aa", "aaaa"), ("aba", "abababa"), ("abc", "cbabcxabccba"), ("gatc", "gatcctaggatcgatc"),
+                     ("xyz", "abcdef"), ("ab", "ba")]
+        assert all(wsFunc.findLineSpans(word, line, overlapping) ==
+                   wsFunc.findLineSpans(word, line, overlapping, "singlepass")
+                   for word, line in testCases for overlapping in (False, True))
+
+    #Test that a line is only walked in a single pass when it is long and packed with overlapping instances
+    def test_autoMatcherChoice(self):
+        assert (wsFunc.chooseLineMatcher("a" * 32, "a" * 5000, overlapping=True) == "singlepass" and
+                wsFunc.chooseLineMatcher("a" * 32, "a" * 5000) == "index" and
+                wsFunc.chooseLineMatcher("a" * 32, "a" * 100, overlapping=True) == "index" and
+                wsFunc.chooseLineMatcher("abcd", "abcd" * 2000, overlapping=True) == "index" and
+                wsFunc.findLineSpans("a" * 32, "a" * 5000, True) ==
+                wsFunc.findLineSpans("a" * 32, "a" * 5000, True, "index"))
+
 """
 #######################################################################################
 # FIND ALL INSTANCES IN A LINE AND CONSTRUCT OUTPUT FUNCTION TESTS
@@ -183,6 +405,17 @@ class TestExtractInstancesAcrossAllLines:
 
         assert len(testResults) == 5
 
+    #Test that the function reports the correct coordinates in all eight directions
+    def test_extractAllEightDirections(self):
+        testLines: List[str] = ["cxcxc", "xaaax", "catac", "xaaax", "cxcxc"]
+        verticalLines: List[str] = ["".join(zz) for zz in zip(*testLines)]
+        testResults: List[WordSearchResult] = wsFunc.extractInstancesAcrossAllLines(
+            "cat", testLines, verticalLines, buildDiagonalLines(testLines, False), buildDiagonalLines(testLines, True))
+        testEnds = set([(rr.startX, rr.startY, rr.endX, rr.endY) for rr in testResults])
+
+        assert testEnds == {(0, 2, 2, 2), (4, 2, 2, 2), (2, 0, 2, 2), (2, 4, 2, 2),
+                            (0, 0, 2, 2), (4, 4, 2, 2), (0, 4, 2, 2), (4, 0, 2, 2)}
+
     #Test that the function runs correctly when no lines are provided at all
     def test_noLinesProvided(self):
         testResults: List[WordSearchResult] = wsFunc.extractInstancesAcrossAllLines("alpha", [], [])
@@ -217,6 +450,51 @@ class TestRunLoadedWordSearch:
         #Check that the correct number of words were extracted
         assert (len(testResult["dog"]) == 5 and len(testResult["random"]) == 2)
 
+    #Test that the first-only search gives the same first result as the full search, and nothing more
+    def test_firstOnlyMatchesFullSearch(self):
+        testSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt")
+        testSearch.words = testSearch.words + ["sets", "aoa", "ttt"]
+        fullResults = wsFunc.runLoadedWordSearch(testSearch)
+        firstResults = wsFunc.runLoadedWordSearch(testSearch, firstOnly=True)
+
+        assert all([rr.createOutputLine() for rr in fullResults[word][:1]] ==
+                   [rr.createOutputLine() for rr in firstResults[word]] for word in testSearch.words)
+
+    #Test that the lazy search doesn't search the lines after the result that it has been asked for
+    def test_lazySearchStopsEarly(self):
+        horizontalLines = ["xcatx", "xxxxx"]
+
+        class ExplodingLines(list):
+            def __iter__(self):
+                raise AssertionError("The vertical lines were searched")
+
+        firstResult = next(wsFunc.iterateInstancesAcrossAllLines("cat", horizontalLines, ExplodingLines()))
+        assert firstResult.createOutputLine() == "CAT (1, 0) (3, 0)"
+
+    #Test that the engines that support overlapping matches agree on them
+    def test_overlappingEnginesAgree(self):
+        testSearch: WordSearch = WordSearch.fromGridLines(["aa", "ab", "aba"], ["aaaa", "abab", "aaba"])
+        standardResults = wsFunc.runLoadedWordSearch(testSearch, overlapping=True)
+        ahoCorasickResults = wsFunc.runLoadedWordSearch(testSearch, "ahocorasick", overlapping=True)
+
+        assert (len(standardResults["aa"]) == 13 and
+                all([rr.createOutputLine() for rr in standardResults[word]] ==
+                    [rr.createOutputLine() for rr in ahoCorasickResults[word]] for word in testSearch.words))
+
+    #Test that every engine finds nothing for an empty word, with or without overlapping matches
+    def test_emptyWordOnEveryEngine(self):
+        testSearch: WordSearch = WordSearch.fromGridLines(["", "ab"], ["abab", "baba"])
+        engineResults = [wsFunc.runLoadedWordSearch(testSearch, engine, overlapping=overlapping)
+                         for engine in ["standard", "ahocorasick", "bitparallel"] for overlapping in (False, True)]
+
+        assert all(len(results[""]) == 0 and len(results["ab"]) > 0 for results in engineResults)
+
+    #Test that asking an engine without overlapping support for overlapping matches is an error
+    def test_overlappingUnsupportedEngine(self):
+        testSearch: WordSearch = WordSearch.fromGridLines(["aa"], ["aaaa"])
+        with pytest.raises(ValueError):
+            wsFunc.runLoadedWordSearch(testSearch, "numpy", overlapping=True)
+
 """
 #######################################################################################
 # DETERMINE OUTPUT PATH FROM INPUT PATH FUNCTION TESTS
@@ -241,4 +519,914 @@ class TestDetermineOutputPath:
     #Check that the function maintains the directory of the input file if the input is in a parent folder
     def test_retypesFileInParent(self):
         testResult = wsFunc.determineOutputPath("../TestPath.txt")
-        assert "../TestPath.out" in testResult
\ No newline at end of file
+        assert "../TestPath.out" in testResult
+
+    #Check that the lowest free offset in the directory is taken, and that claimed paths are created
+    def test_offsetFillsLowestGap(self, tmp_path):
+        for fileName in ["Puzzle.out", "Puzzle_1.out", "Puzzle_3.out", "Puzzle_x.out", "Puzzles_2.out"]:
+            (tmp_path / fileName).write_text("")
+        claimedPaths = [wsFunc.determineOutputPath(str(tmp_path / "Puzzle.pzl"), claim=True) for _ in range(2)]
+
+        assert (claimedPaths == [str(tmp_path / "Puzzle_2.out"), str(tmp_path / "Puzzle_4.out")] and
+                all(os.path.isfile(claimedPath) for claimedPath in claimedPaths))
+
+    #Check that a file deleted by another process is noticed, so its offset is used again
+    def test_deletedOffsetReused(self, tmp_path):
+        claimedPaths = [wsFunc.determineOutputPath(str(tmp_path / "Puzzle.pzl"), claim=True) for _ in range(3)]
+        os.remove(claimedPaths[1])
+
+        assert wsFunc.determineOutputPath(str(tmp_path / "Puzzle.pzl"), claim=True) == claimedPaths[1]
+
+    #Check that a path taken by another writer since the directory was listed is stepped past, not overwritten
+    def test_claimSkipsPathsTakenSince(self, tmp_path):
+        wsFunc.determineOutputPath(str(tmp_path / "Puzzle.pzl"), claim=True)
+        (tmp_path / "Puzzle_1.out").write_text("another writer")
+
+        assert (wsFunc.determineOutputPath(str(tmp_path / "Puzzle.pzl"), claim=True) == str(tmp_path / "Puzzle_2.out")
+                and (tmp_path / "Puzzle_1.out").read_text() == "another writer")
+
+    #Check that writers in separate processes never claim the same path
+    def test_concurrentClaimsAreUnique(self, tmp_path):
+        inputPaths = [str(tmp_path / "Puzzle.pzl")] * 24
+        #Imported here as the process pool is slow to load and only needed by this test
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            claimedPaths = list(executor.map(wsFunc.determineOutputPath, inputPaths, [True] * len(inputPaths)))
+
+        assert len(set(claimedPaths)) == len(inputPaths) == len(list(tmp_path.glob("Puzzle*.out")))
+
+    #Check that only the most recently used output paths are kept in the cache of offsets
+    def test_offsetCacheIsBounded(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(wsFunc, "OUTPUT_OFFSET_CACHE_MAX_ENTRIES", 2)
+        monkeypatch.setattr(wsFunc, "outputOffsetCache", wsFunc.OrderedDict())
+        for name in ["first", "second", "third", "first"]:
+            wsFunc.determineOutputPath(str(tmp_path / (name + ".pzl")))
+
+        assert list(wsFunc.outputOffsetCache) == [str(tmp_path / "third.out"), str(tmp_path / "first.out")]
+"""
+#######################################################################################
+# WRITE RESULTS TO FILE FUNCTION TESTS
+#######################################################################################
+"""
+class TestWriteTheResultsToFile:
+    #Test that every result is written in full results mode, and missing or empty words are marked as not found
+    def test_writesAllResults(self, tmp_path):
+        testResults = {"cat": [WordSearchResult("CAT", (0, 0), (2, 0)), WordSearchResult("CAT", (4, 1), (4, 3))],
+                       "dog": []}
+        wsFunc.writeTheResultsToFile(["cat", "dog", "owl"], str(tmp_path / "all.out"), testResults, True)
+
+        with open(str(tmp_path / "all.out")) as file:
+            assert file.read() == "CAT (1, 1) (3, 1)\nCAT (5, 2) (5, 4)\nDOG not found\nOWL not found\n"
+
+    #Test that only the first result is taken from a generator of results, without running the rest of it
+    def test_writesFirstResultOfGenerator(self, tmp_path):
+        def lazyResults():
+            yield WordSearchResult("CAT", (0, 0), (2, 0))
+            raise AssertionError("The writer read past the first result")
+
+        wsFunc.writeTheResultsToFile(["cat"], str(tmp_path / "top.out"), {"cat": lazyResults()})
+
+        with open(str(tmp_path / "top.out")) as file:
+            assert file.read() == "CAT (1, 1) (3, 1)\n"
+
+"""
+#######################################################################################
+# AHO-CORASICK ENGINE TESTS
+#######################################################################################
+"""
+class TestAhoCorasickEngine:
+    #Test that the automaton reports every occurrence of every pattern, including overlapping ones
+    def test_automatonFindsOverlappingPatterns(self):
+        automaton = wsEng.AhoCorasickAutomaton(["he", "she", "hers"])
+        testResults = sorted(automaton.findMatches("ushers"))
+
+        assert testResults == [(0, 3), (1, 3), (2, 5)]
+
+    #Test that the engine gives exactly the same results, in the same order, as the standard engine
+    def test_matchesStandardEngine(self):
+        testSearch: WordSearch = WordSearch("TestFiles/generatedWordSearch.txt")
+        testSearch.words.extend(["aa", "AA", "hannah", "ab", "ba"])
+        standardResults = wsFunc.runLoadedWordSearch(testSearch)
+        automatonResults = wsFunc.runLoadedWordSearch(testSearch, "ahocorasick")
+
+        assert list(standardResults) == list(automatonResults)
+        for word in standardResults:
+            assert ([rr.createOutputLine() for rr in standardResults[word]] ==
+                    [rr.createOutputLine() for rr in automatonResults[word]])
+
+    #Test that the engine keeps to non-overlapping matches, as the standard engine does
+    def test_nonOverlappingMatches(self):
+        testSearch: WordSearch = WordSearch("TestFiles/3x8_TestSearch.txt")
+        testSearch.words = ["tt", "es"]
+        testSearch.horizontalLines = ["tttttest"]
+        testSearch.verticalLines = []
+        testSearch.diagonalLines = []
+        testSearch.antiDiagonalLines = []
+        testResults = wsFunc.runLoadedWordSearch(testSearch, "ahocorasick")
+
+        assert (len(testResults["tt"]) == 2 and len(testResults["es"]) == 1)
+
+    #Test that the engine gives the same results over a compact grid as over the lists of lines
+    def test_matchesOverCompactGrid(self):
+        testSearch: WordSearch = WordSearch("TestFiles/generatedWordSearch.txt")
+        compactSearch: WordSearch = WordSearch("TestFiles/generatedWordSearch.txt", compactGrid=True)
+        testResults = wsFunc.runLoadedWordSearch(testSearch)
+        compactResults = wsFunc.runLoadedWordSearch(compactSearch, "ahocorasick")
+
+        for word in testResults:
+            assert ([rr.createOutputLine() for rr in testResults[word]] ==
+                    [rr.createOutputLine() for rr in compactResults[word]])
+
+    #Test that an unknown engine name is rejected
+    def test_unknownEngineRejected(self):
+        testSearch: WordSearch = WordSearch("TestFiles/3x8_TestSearch.txt")
+        with pytest.raises(ValueError):
+            wsFunc.runLoadedWordSearch(testSearch, "unknown")
+
+"""
+#######################################################################################
+# BIT-PARALLEL ENGINE TESTS
+#######################################################################################
+"""
+class TestBitParallelEngine:
+    #Test that the matcher reports every occurrence of every pattern, including overlapping ones
+    def test_matcherFindsOverlappingPatterns(self):
+        matcher = wsEng.BitParallelMatcher(["he", "she", "hers", "ss"])
+        testResults = sorted(matcher.findMatches("usherss"))
+
+        assert testResults == [(0, 3), (1, 3), (2, 5), (3, 6)]
+
+    #Test that the engine gives exactly the same results, in the same order, as the standard engine
+    def test_matchesStandardEngine(self):
+        testSearch: WordSearch = WordSearch("TestFiles/generatedWordSearch.txt")
+        testSearch.words.extend(["aa", "AA", "hannah", "ab", "ba"])
+        standardResults = wsFunc.runLoadedWordSearch(testSearch)
+        bitParallelResults = wsFunc.runLoadedWordSearch(testSearch, "bitparallel")
+
+        assert all([rr.createOutputLine() for rr in standardResults[word]] ==
+                   [rr.createOutputLine() for rr in bitParallelResults[word]] for word in testSearch.words)
+
+    #Test that the engine finds the same overlapping matches as the standard engine
+    def test_overlappingMatches(self):
+        testSearch: WordSearch = WordSearch.fromGridLines(["aa", "aba", "b"], ["aaaa", "abab", "aaba"])
+        standardResults = wsFunc.runLoadedWordSearch(testSearch, overlapping=True)
+        bitParallelResults = wsFunc.runLoadedWordSearch(testSearch, "bitparallel", overlapping=True)
+
+        assert all([rr.createOutputLine() for rr in standardResults[word]] ==
+                   [rr.createOutputLine() for rr in bitParallelResults[word]] for word in testSearch.words)
+
+"""
+#######################################################################################
+# PARALLEL BATCH MODE TESTS
+#######################################################################################
+"""
+class TestWordSearchBatch:
+    #Test that an invalid file in the batch is reported without stopping the other files from being processed
+    def test_invalidFileIsIsolated(self):
+        testFiles = [("TestFiles/3x8_TestSearch.txt", False), ("TestFiles/NoWords_TestSearch.txt", False),
+                     ("TestFiles/5x10_TestSearch.txt", True)]
+        testResults = wsMain.runWordSearchBatch(testFiles, 2)
+
+        #Remove the output files written by the successful runs
+        for _, succeeded, message, _ in testResults:
+            if succeeded:
+                os.remove(message.split("\"")[-2])
+
+        assert ([rr[0] for rr in testResults] == [ff[0] for ff in testFiles] and
+                [rr[1] for rr in testResults] == [True, False, True])
+
+    #Test that the search options reach the files of the batch, giving the same output as a run without jobs
+    def test_searchOptionsPassedThrough(self, tmp_path):
+        (tmp_path / "serial.txt").write_text("AAAA\nXXXX\n\nAA\n~A?\n")
+        (tmp_path / "batch.txt").write_text("AAAA\nXXXX\n\nAA\n~A?\n")
+        wsMain.wordSearchMain(str(tmp_path / "serial.txt"), True, overlapping=True, patterns=True, compactGrid=True)
+        batchResults = wsMain.runWordSearchBatch([(str(tmp_path / "batch.txt"), True)], 2, overlapping=True,
+                                                 patterns=True, compactGrid=True)
+
+        assert (batchResults[0][1] and (tmp_path / "batch.out").read_text() == (tmp_path / "serial.out").read_text()
+                and "AA (2, 1) (3, 1)" in (tmp_path / "serial.out").read_text())
+
+    #Test that the input files and their full results flags are pulled correctly from the arguments
+    def test_collectInputFiles(self):
+        testArguments: List[str] = ["TestFiles/3x8_TestSearch.txt", "True", "NotAFile.txt",
+                                    "TestFiles/5x10_TestSearch.txt"]
+        testResults = wsMain.collectInputFiles(testArguments)
+
+        assert testResults == [("TestFiles/3x8_TestSearch.txt", True), ("TestFiles/5x10_TestSearch.txt", False)]
+
+    #Test that a valued option is removed from the arguments along with its value
+    def test_popOption(self):
+        testArguments: List[str] = ["first.pzl", "--jobs", "4", "second.pzl"]
+        testValue = wsFunc.popOption(testArguments, "--jobs")
+
+        assert (testValue == "4" and testArguments == ["first.pzl", "second.pzl"])
+
+"""
+#######################################################################################
+# WORD-LEVEL PARALLEL SEARCH TESTS
+#######################################################################################
+"""
+class TestShardedWordSearch:
+    #Test that the sharded search writes exactly the same output as the serial search, duplicates included
+    def test_outputMatchesSerialSearch(self):
+        wsPar = pytest.importorskip("WordSearch_Parallel")
+        testSearch: WordSearch = WordSearch("TestFiles/generatedWordSearch.txt")
+        testSearch.words.extend(["AA", "aa", testSearch.words[0]])
+        serialResults = wsFunc.runLoadedWordSearch(testSearch)
+        shardedResults = wsPar.runShardedWordSearch(testSearch, 2)
+
+        serialPath: str = "TestFiles/serialTest_temporary.out"
+        shardedPath: str = "TestFiles/shardedTest_temporary.out"
+        wsFunc.writeTheResultsToFile(testSearch.words, serialPath, serialResults, True)
+        wsFunc.writeTheResultsToFile(testSearch.words, shardedPath, shardedResults, True)
+        with open(serialPath, "r") as serialFile, open(shardedPath, "r") as shardedFile:
+            sameOutput: bool = (serialFile.read() == shardedFile.read())
+        os.remove(serialPath)
+        os.remove(shardedPath)
+
+        assert (sameOutput and list(serialResults) == list(shardedResults))
+
+    #Test that a worker rebuilds the grid lines from shared memory, keeping empty families intact
+    def test_workerRebuildsLineFamilies(self):
+        wsPar = pytest.importorskip("WordSearch_Parallel")
+        testSearch: WordSearch = WordSearch.fromLineFamilies(["ab"], ["ab", "ba"], [], ["a"], ["b", "a"])
+        testResults = wsPar.runShardedWordSearch(testSearch, 1)
+
+        assert len(testResults["ab"]) == 2
+
+    #Test that lines holding new lines and multi-byte characters are read back from shared memory whole
+    def test_linesReadInPlace(self):
+        wsPar = pytest.importorskip("WordSearch_Parallel")
+        testSearch: WordSearch = WordSearch.fromLineFamilies(["a\nb", "éa"], ["xa\nb", "aé"], [], [], [])
+        testResults = wsPar.runShardedWordSearch(testSearch, 2)
+
+        assert (len(testResults["a\nb"]) == 1 and len(testResults["éa"]) == 1)
+
+    #Test that options the workers cannot honour are refused rather than silently ignored
+    def test_unsupportedOptionsRefused(self):
+        with pytest.raises(ValueError):
+            wsMain.wordSearchMain("TestFiles/3x8_TestSearch.txt", workers=2, memoise=True)
+
+"""
+#######################################################################################
+# NUMPY ENGINE TESTS
+#######################################################################################
+"""
+class TestNumpyEngine:
+    #Test that the engine gives exactly the same results, in the same order, as the standard engine
+    def test_matchesStandardEngine(self):
+        pytest.importorskip("numpy")
+        testSearch: WordSearch = WordSearch("TestFiles/generatedWordSearch.txt")
+        testSearch.words.extend(["aa", "AA", "hannah", "a", "xyzzy"])
+        standardResults = wsFunc.runLoadedWordSearch(testSearch)
+
+        for engine in ["numpy", "auto"]:
+            numpyResults = wsFunc.runLoadedWordSearch(testSearch, engine)
+            assert list(standardResults) == list(numpyResults)
+            for word in standardResults:
+                assert ([rr.createOutputLine() for rr in standardResults[word]] ==
+                        [rr.createOutputLine() for rr in numpyResults[word]])
+
+    #Test that overlapping occurrences are dropped in every direction, as the standard engine does
+    def test_nonOverlappingMatches(self):
+        pytest.importorskip("numpy")
+        testLines: List[str] = ["aaaa", "aaaa", "aaaa", "aaaa"]
+        testGrid = wsEng.buildNumpyGrid(testLines)
+        testResults: List[WordSearchResult] = wsEng.extractInstancesWithNumpy("aa", testGrid)
+        standardResults: List[WordSearchResult] = wsFunc.extractInstancesAcrossAllLines(
+            "aa", testLines, testLines, buildDiagonalLines(testLines, False), buildDiagonalLines(testLines, True))
+
+        assert [rr.createOutputLine() for rr in testResults] == [rr.createOutputLine() for rr in standardResults]
+
+    #Test that a grid that changes length when lower-cased is not loaded into an array
+    def test_lengthChangingGridNotLoaded(self):
+        pytest.importorskip("numpy")
+        assert wsEng.buildNumpyGrid(["a\u0130", "bc"]) is None
+
+"""
+#######################################################################################
+# ON-DISK INDEX CACHE TESTS
+#######################################################################################
+"""
+class TestGridIndexCache:
+    #Test that the indexed engine gives the same results as the standard engine, both with and without a cached index
+    def test_matchesStandardEngine(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("WORDSEARCH_CACHE_DIR", str(tmp_path))
+        testSearch: WordSearch = WordSearch("TestFiles/generatedWordSearch.txt")
+        testSearch.words.extend(["aa", "hannah", "xyzzy"])
+        standardResults = wsFunc.runLoadedWordSearch(testSearch)
+
+        for _ in range(2):
+            indexedResults = wsFunc.runLoadedWordSearch(testSearch, "indexed")
+            for word in standardResults:
+                assert ([rr.createOutputLine() for rr in standardResults[word]] ==
+                        [rr.createOutputLine() for rr in indexedResults[word]])
+
+        assert len(list(tmp_path.glob("*.idx"))) == 1
+
+    #Test that an index written with a different format version is not used and is evicted
+    def test_versionChangeInvalidates(self, tmp_path, monkeypatch):
+        wsCache = pytest.importorskip("WordSearch_Cache")
+        testSearch: WordSearch = WordSearch("TestFiles/3x8_TestSearch.txt")
+        wsCache.loadOrBuildGridIndex(testSearch, str(tmp_path))
+        fingerprint: str = wsCache.gridFingerprint(testSearch.horizontalLines)
+
+        monkeypatch.setattr(wsCache, "GRID_INDEX_VERSION", wsCache.GRID_INDEX_VERSION + 1)
+        missedIndex = wsCache.loadGridIndex(fingerprint, str(tmp_path))
+        wsCache.loadOrBuildGridIndex(testSearch, str(tmp_path))
+
+        assert (missedIndex is None and
+                [pp.name.split(".")[1] for pp in tmp_path.glob("*.idx")] == ["v" + str(wsCache.GRID_INDEX_VERSION)])
+
+    #Test that the least recently used indexes are evicted once the cache is over its size limit
+    def test_leastRecentlyUsedEviction(self, tmp_path):
+        wsCache = pytest.importorskip("WordSearch_Cache")
+        firstIndex = wsCache.GridIndex([("horizontal", ["abcdef"])])
+        wsCache.saveGridIndex(firstIndex, "first", str(tmp_path))
+        wsCache.saveGridIndex(firstIndex, "second", str(tmp_path))
+        os.utime(tmp_path / "first.v{}.idx".format(wsCache.GRID_INDEX_VERSION), (0, 0))
+        wsCache.saveGridIndex(firstIndex, "third", str(tmp_path),
+                              maxBytes=2 * (tmp_path / "second.v{}.idx".format(wsCache.GRID_INDEX_VERSION)).stat().st_size)
+
+        assert sorted(pp.name.split(".")[0] for pp in tmp_path.glob("*.idx")) == ["second", "third"]
+
+    #Test that the cache folder is private, and that files another user owns or could have changed are never loaded
+    @pytest.mark.skipif(not hasattr(os, "getuid"), reason="File owners are only checked on POSIX platforms")
+    def test_untrustedFilesIgnored(self, tmp_path, monkeypatch):
+        wsCache = pytest.importorskip("WordSearch_Cache")
+        testIndex = wsCache.GridIndex([("horizontal", ["abcdef"])])
+        cachePath: str = wsCache.saveGridIndex(testIndex, "grid", str(tmp_path / "cache"))
+        trustedIndex = wsCache.loadGridIndex("grid", str(tmp_path / "cache"))
+
+        os.chmod(cachePath, 0o666)
+        writableIndex = wsCache.loadGridIndex("grid", str(tmp_path / "cache"))
+        os.chmod(cachePath, 0o600)
+        realUserId: int = os.getuid()
+        monkeypatch.setattr(os, "getuid", lambda: realUserId + 1)
+        foreignIndex = wsCache.loadGridIndex("grid", str(tmp_path / "cache"))
+
+        assert ((tmp_path / "cache").stat().st_mode & 0o777 == 0o700 and trustedIndex is not None and
+                writableIndex is None and foreignIndex is None)
+
+    #Test that the index only offers the lines containing every n-gram of the word or of its reversal
+    def test_candidateLines(self):
+        wsCache = pytest.importorskip("WordSearch_Cache")
+        testIndex = wsCache.GridIndex([("horizontal", ["catdog", "godtac", "cattle"]), ("vertical", ["xcatx"])])
+
+        assert (testIndex.candidateLines("CAT") == [0, 1, 2, 3] and testIndex.candidateLines("dogs") == [] and
+                testIndex.candidateLines("at") is None)
+
+"""
+#######################################################################################
+# RESULT MEMO TESTS
+#######################################################################################
+"""
+class TestSearchMemo:
+    #Test that case variants and reversals are served from the memo with exactly the results of a fresh search
+    def test_duplicatesServedFromMemo(self):
+        testSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt")
+        testSearch.words = ["test", "TEST", "tset", "cat", "TAC", "aoa", "tac"]
+        testMemo: SearchMemo = SearchMemo()
+        standardResults = wsFunc.runLoadedWordSearch(testSearch)
+        memoResults = wsFunc.runLoadedWordSearch(testSearch, memo=testMemo)
+
+        for word in testSearch.words:
+            assert ([rr.createOutputLine() for rr in standardResults[word]] ==
+                    [rr.createOutputLine() for rr in memoResults[word]])
+        assert (testMemo.hits, testMemo.misses) == (4, 3)
+
+    #Test that the memo keeps the results of different grids apart
+    def test_gridsKeptApart(self):
+        testMemo: SearchMemo = SearchMemo()
+        smallSearch: WordSearch = WordSearch("TestFiles/3x8_TestSearch.txt")
+        largeSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt")
+        smallResults = wsFunc.runLoadedWordSearch(smallSearch, memo=testMemo)
+        largeResults = wsFunc.runLoadedWordSearch(largeSearch, memo=testMemo)
+
+        assert (len(smallResults["test"]) == 3 and len(largeResults["test"]) == 4 and testMemo.hits == 0)
+
+    #Test that the least recently used entries are dropped once the memo is full
+    def test_boundedSize(self):
+        testMemo: SearchMemo = SearchMemo(maxEntries=2)
+        for word in ["one", "two", "three"]:
+            testMemo.store("grid", word, [])
+
+        assert (testMemo.lookup("grid", "one") is None and testMemo.lookup("grid", "EERHT") == [] and
+                len(testMemo.entries) == 2)
+
+"""
+#######################################################################################
+# BENCHMARK SUITE TESTS
+#######################################################################################
+"""
+class TestBenchmarkSuite:
+    #Test that the same seed always generates the same puzzle
+    def test_seededGenerator(self):
+        wsBench = pytest.importorskip("WordSearch_Benchmark")
+        assert (wsBench.generatePuzzle(20, 15, 10, 5, "ACGT", seed=3) ==
+                wsBench.generatePuzzle(20, 15, 10, 5, "ACGT", seed=3))
+
+    #Test that a planted word is found in the generated grid; The last word planted can't have been written over
+    def test_plantedWordFound(self, tmp_path):
+        wsBench = pytest.importorskip("WordSearch_Benchmark")
+        gridLines, words = wsBench.generatePuzzle(12, 9, 8, 6, "ABCDEFGHIJKLMNOPQRSTUVWXYZ", seed=7)
+        testSearch: WordSearch = WordSearch(wsBench.writePuzzleFile(str(tmp_path / "generated.txt"), gridLines, words))
+
+        assert (len(gridLines) == 9 and len(gridLines[0]) == 12 and
+                len(wsFunc.runLoadedWordSearch(testSearch)[words[3]]) >= 1)
+
+    #Test that every stage is timed and measured, and that the results file is cleaned up
+    def test_benchmarkPuzzleFile(self, tmp_path):
+        wsBench = pytest.importorskip("WordSearch_Benchmark")
+        puzzlePath: str = wsBench.writePuzzleFile(str(tmp_path / "generated.txt"),
+                                                  *wsBench.generatePuzzle(15, 15, 6, 4, "ABC", seed=1))
+        benchmarkRun = wsBench.benchmarkPuzzleFile(puzzlePath)
+
+        assert (sorted(benchmarkRun["stages"]) == ["parse", "search", "write"] and
+                all(ss["peakBytes"] > 0 for ss in benchmarkRun["stages"].values()) and
+                benchmarkRun["outputBytes"] > 0 and os.listdir(str(tmp_path)) == ["generated.txt"])
+
+    #Test that a stage that has slowed down past the tolerance is reported as a regression
+    def test_compareBenchmarks(self):
+        wsBench = pytest.importorskip("WordSearch_Benchmark")
+        baseline = {"runs": [{"scenario": {"name": "small"}, "engine": "standard",
+                              "stages": {"search": {"seconds": 1.0, "peakBytes": 100}}}]}
+        current = {"runs": [{"scenario": {"name": "small"}, "engine": "standard",
+                             "stages": {"search": {"seconds": 1.5, "peakBytes": 110}}}]}
+
+        assert wsBench.compareBenchmarks(baseline, current) == ["small standard search: 1.000s -> 1.500s"]
+
+    #Test that a slower import of the entry point is reported as a regression alongside the stages
+    def test_compareImportTime(self):
+        wsBench = pytest.importorskip("WordSearch_Benchmark")
+        baseline = {"importTime": {"module": "WordSearch", "seconds": 0.02}, "runs": []}
+        current = {"importTime": {"module": "WordSearch", "seconds": 0.04}, "runs": []}
+
+        assert wsBench.compareBenchmarks(baseline, current) == ["import WordSearch: 0.020s -> 0.040s"]
+
+    #Test that importing the entry point in a fresh interpreter leaves the optional modes and the arguments unloaded
+    def test_entryPointImportIsLazy(self):
+        wsBench = pytest.importorskip("WordSearch_Benchmark")
+        importRun = wsBench.measureImportTime("WordSearch", repeats=1)
+
+        assert (importRun["seconds"] > 0 and importRun["lazyModulesLoaded"] == [] and
+                not hasattr(wsMain, "wordSearchPath"))
+
+"""
+#######################################################################################
+# STAGE PROFILING TESTS
+#######################################################################################
+"""
+class TestStageProfiler:
+    #Test that the lines and "str.index" calls of the line search are counted while a profiler is open
+    def test_searchCounters(self, tmp_path):
+        with wsProf.StageProfiler(str(tmp_path / "stats.jsonl")) as profiler:
+            wsFunc.extractAllInstancesInLine("a", "aaa", 0)
+            wsFunc.extractAllInstancesInLine("ab", "xabx", 1)
+
+        assert (profiler.counters.linesScanned, profiler.counters.indexCalls, wsProf.activeCounters) == (2, 9, None)
+
+    #Test that the multi-pattern engines count the lines they scan, and that uncounted searches are reported as None
+    def test_countersOfEachEngine(self, tmp_path):
+        pytest.importorskip("numpy")
+        testSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt")
+        engineCounts: Dict[str, Tuple[int, int]] = dict()
+        for engine in ["ahocorasick", "bitparallel", "numpy"]:
+            with wsProf.StageProfiler(str(tmp_path / "stats.jsonl")) as profiler:
+                wsFunc.runLoadedWordSearch(testSearch, engine)
+            engineCounts[engine] = (profiler.profile()["linesScanned"], profiler.profile()["indexCalls"])
+
+        lineCount: int = sum(len(lines) for _, lines in testSearch.lineFamilies())
+        assert engineCounts == {"ahocorasick": (lineCount, None), "bitparallel": (lineCount, None),
+                                "numpy": (None, None)}
+
+    #Test that the main function writes one line of stats for the run, with every stage and the bytes written
+    def test_profileWrittenToFile(self, tmp_path):
+        inputPath: str = str(tmp_path / "5x10_TestSearch.txt")
+        with open("TestFiles/5x10_TestSearch.txt") as source, open(inputPath, "w") as target:
+            target.write(source.read())
+        statsPath: str = str(tmp_path / "stats.jsonl")
+        wsMain.wordSearchMain(inputPath, True, profileTarget=statsPath)
+
+        with open(statsPath) as file:
+            profile = [json.loads(line) for line in file]
+        assert (len(profile) == 1 and sorted(profile[0]["stages"]) == ["outputPath", "parse", "search", "write"] and
+                profile[0]["resultCount"] == 13 and
+                profile[0]["bytesWritten"] == os.path.getsize(str(tmp_path / "5x10_TestSearch.out")))
+
+    #Test that nothing is timed or counted when profiling is turned off
+    def test_profilingDisabled(self, monkeypatch):
+        monkeypatch.delenv(wsProf.PROFILE_ENVIRONMENT_VARIABLE, raising=False)
+        with wsProf.StageProfiler(wsProf.profileTargetFromEnvironment()) as profiler:
+            with profiler.stage("search"):
+                wsFunc.extractAllInstancesInLine("a", "aaa", 0)
+
+        assert (profiler.stages, profiler.counters.linesScanned) == ({}, 0)
+
+"""
+#######################################################################################
+# SEARCH SERVER TESTS
+#######################################################################################
+"""
+class TestWordSearchServer:
+    #Test that the least recently used idle grids are evicted once the registry passes its memory limit
+    def test_registryEvictsIdleGrids(self):
+        wsServer = pytest.importorskip("WordSearch_Server")
+        testGrids = [WordSearch.fromGridLines([], [letter * 20] * 20) for letter in "abc"]
+        testRegistry = wsServer.GridRegistry(maxBytes=int(wsServer.estimateWordSearchBytes(testGrids[0]) * 2.5))
+        firstId: str = testRegistry.register(testGrids[0], "first")
+        testRegistry.register(testGrids[1], "second")
+
+        #The first grid is in use, so the second is evicted in its place
+        inUse = testRegistry.acquire(firstId)
+        testRegistry.register(testGrids[2], "third")
+        testRegistry.release(inUse)
+
+        assert list(testRegistry.entries) == ["first", "third"]
+
+    #Test that a client can load a grid, search it in both formats and unload it again
+    def test_clientRoundTrip(self, tmp_path):
+        wsServer = pytest.importorskip("WordSearch_Server")
+        testSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt")
+        wsFunc.writeTheResultsToFile(testSearch.words, str(tmp_path / "expected.out"),
+                                     wsFunc.runLoadedWordSearch(testSearch), True)
+        testServer = wsServer.WordSearchServer()
+        serverAddress = testServer.startInThread()
+
+        try:
+            with wsServer.WordSearchClient(serverAddress) as client:
+                gridId: str = client.load(lines=list(testSearch.horizontalLines))
+                jsonResults = client.search(gridId, ["cat", "dog"], showAll=True)
+                outResults: str = client.search(gridId, testSearch.words, showAll=True, outputFormat="out")
+                unloaded: bool = client.unload(gridId)
+                with pytest.raises(wsServer.WordSearchServerError):
+                    client.search(gridId, ["cat"])
+        finally:
+            testServer.stopThread()
+
+        with open(str(tmp_path / "expected.out")) as file:
+            assert (outResults == file.read() and unloaded and len(jsonResults["dog"]) == 2 and
+                    jsonResults["cat"][0] == [0, 2, 0, 4])
+
+    #Test that the load test drives concurrent clients against a loaded grid without errors
+    def test_loadTest(self):
+        wsServer = pytest.importorskip("WordSearch_Server")
+        testServer = wsServer.WordSearchServer()
+        serverAddress = testServer.startInThread()
+
+        try:
+            with wsServer.WordSearchClient(serverAddress) as client:
+                gridId: str = client.load(path="TestFiles/generatedWordSearch.txt", compact=True)
+            loadReport = wsServer.runLoadTest(serverAddress, gridId, ["python", "random", "test", "dog"], clients=3,
+                                              requestsPerClient=4, wordsPerRequest=2)
+        finally:
+            testServer.stopThread()
+
+        assert (loadReport["requests"], loadReport["errors"]) == (12, 0)
+
+    #Test that empty, non-string or unlisted words are answered with an error on a connection that stays open, and
+    #never leave the grid in use
+    def test_badWordsRejected(self):
+        wsServer = pytest.importorskip("WordSearch_Server")
+        testServer = wsServer.WordSearchServer()
+        serverAddress = testServer.startInThread()
+        rejectedCount: int = 0
+
+        try:
+            with wsServer.WordSearchClient(serverAddress) as client:
+                gridId: str = client.load(lines=["CAT", "XXX"])
+                for badWords in [[""], [1], "cat", None]:
+                    with pytest.raises(wsServer.WordSearchServerError):
+                        client.request({"op": "search", "id": gridId, "words": badWords})
+                    rejectedCount += 1
+                with pytest.raises(wsServer.WordSearchServerError):
+                    client.request(["not", "an", "object"])
+                catResults = client.search(gridId, ["cat"])
+                gridStats = client.request({"op": "stats"})["grids"]
+        finally:
+            testServer.stopThread()
+
+        assert (rejectedCount == 4 and catResults == {"cat": [[0, 0, 2, 0]]} and
+                gridStats[0]["activeRequests"] == 0)
+
+    #Test that a request line over the limit is answered with an error rather than a silently closed connection
+    def test_oversizedRequestAnswered(self, monkeypatch):
+        wsServer = pytest.importorskip("WordSearch_Server")
+        monkeypatch.setattr(wsServer, "MAX_REQUEST_BYTES", 1024)
+        testServer = wsServer.WordSearchServer()
+        serverAddress = testServer.startInThread()
+
+        try:
+            with wsServer.WordSearchClient(serverAddress) as client:
+                client.stream.write(b"x" * 4096 + b"\n")
+                client.stream.flush()
+                responseLine: bytes = client.stream.readline()
+                closedLine: bytes = client.stream.readline()
+        finally:
+            testServer.stopThread()
+
+        assert ("error" in json.loads(responseLine) and closedLine == b"")
+
+"""
+#######################################################################################
+# INCREMENTAL RE-SEARCH TESTS
+#######################################################################################
+"""
+class TestIncrementalSearch:
+    #Test that an edit updates every family of lines through the changed cell
+    def test_setCellsUpdatesLines(self):
+        testSearch: WordSearch = WordSearch.fromGridLines([], ["abc", "def", "ghi"])
+        changedLines = testSearch.setCells([(1, 1, "x")])
+
+        assert (changedLines == [("horizontal", 1), ("vertical", 1), ("diagonal", 2), ("antidiagonal", 2)] and
+                testSearch.horizontalLines[1] == "dxf" and testSearch.verticalLines[1] == "bxh" and
+                testSearch.diagonalLines[2] == "axi" and testSearch.antiDiagonalLines[2] == "gxc")
+
+    #Test that the diff holds the results that an edit made and broke, and the results match a fresh search
+    def test_editDiff(self):
+        wsInc = pytest.importorskip("WordSearch_Incremental")
+        testSearch: WordSearch = WordSearch.fromGridLines(["cat", "dog"], ["catx", "xxxx", "doxx", "xxxx"])
+        incrementalSearch = wsInc.IncrementalSearch(testSearch)
+        addedResults, removedResults = incrementalSearch.editCells([(2, 2, "g"), (0, 0, "b")])
+        freshResults = wsFunc.runLoadedWordSearch(WordSearch.fromGridLines(["cat", "dog"],
+                                                                           ["batx", "xxxx", "dogx", "xxxx"]))
+
+        assert ([rr.createOutputLine() for rr in addedResults["dog"]] == ["DOG (0, 2) (2, 2)"] and
+                [rr.createOutputLine() for rr in removedResults["cat"]] == ["CAT (0, 0) (2, 0)"] and
+                "cat" not in addedResults and "dog" not in removedResults and
+                {word: [rr.createOutputLine() for rr in results]
+                 for word, results in incrementalSearch.results().items()} ==
+                {word: [rr.createOutputLine() for rr in results] for word, results in freshResults.items()})
+
+    #Test that compact grids can be edited, but grids mapped in place from their file can't
+    def test_editCompactAndMappedGrids(self):
+        compactSearch: WordSearch = WordSearch.fromGridLines([], ["abc", "def"], compactGrid=True)
+        compactSearch.setCells([(2, 1, "z")])
+        mappedSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt", memoryMapped=True)
+
+        with pytest.raises(ValueError):
+            mappedSearch.setCells([(0, 0, "z")])
+        assert compactSearch.verticalLines[2] == "cz"
+
+    #Test that a compact grid is copied only by its first edit, and still takes characters that aren't plain ASCII
+    def test_compactEditsInPlace(self):
+        compactSearch: WordSearch = WordSearch.fromGridLines([], ["abc", "def"], compactGrid=True)
+        compactSearch.setCells([(0, 0, "x"), (1, 1, "y")])
+        editedCells = compactSearch.grid.cells
+        compactSearch.setCells([(2, 0, "z")])
+        sameCells: bool = compactSearch.grid.cells is editedCells
+        compactSearch.setCells([(2, 1, "é")])
+
+        assert (sameCells and isinstance(editedCells, bytearray) and
+                list(compactSearch.horizontalLines) == ["xbz", "dyé"] and compactSearch.diagonalLines[1] == "xy")
+
+    #Test that only the words holding the old or new character of an edited cell are searched for again
+    def test_onlyAffectedWordsResearched(self, monkeypatch):
+        wsInc = pytest.importorskip("WordSearch_Incremental")
+        testSearch: WordSearch = WordSearch.fromGridLines(["cat", "dog", "emu"], ["catx", "xxxx", "doxx", "xxxx"])
+        incrementalSearch = wsInc.IncrementalSearch(testSearch)
+        searchedWords: List[str] = []
+        originalExtract = wsInc.extractAllInstancesInLine
+
+        def recordingExtract(word: str, *args, **kwargs) -> List[WordSearchResult]:
+            searchedWords.append(word)
+            return originalExtract(word, *args, **kwargs)
+
+        monkeypatch.setattr(wsInc, "extractAllInstancesInLine", recordingExtract)
+        addedResults, _ = incrementalSearch.editCells([(2, 2, "g")])
+
+        assert set(searchedWords) == {"dog"} and [rr.createOutputLine() for rr in addedResults["dog"]] == \
+            ["DOG (0, 2) (2, 2)"]
+
+"""
+#######################################################################################
+# WILDCARD AND CHARACTER-CLASS PATTERN TESTS
+#######################################################################################
+"""
+class TestPatternSearch:
+    #Test that wildcards, classes, ranges, negated classes and escapes are parsed into the characters of each position
+    def test_parsePattern(self):
+        assert wsPat.parsePattern("~C?[a-c][^X]\\?") == [(False, frozenset("c")), None, (False, frozenset("abc")),
+                                                          (True, frozenset("x")), (False, frozenset("?"))]
+
+    #Test that malformed patterns are rejected
+    def test_invalidPatterns(self):
+        for pattern in ["~[abc", "~", "~ab\\", "~[z-a]", "~[]"]:
+            with pytest.raises(wsPat.InvalidSearchPattern):
+                wsPat.parsePattern(pattern)
+
+    #Test that each character's bitset has a bit set at each of its offsets
+    def test_characterBitsets(self):
+        assert wsPat.characterBitsets("abca") == {"a": 0b1001, "b": 0b0010, "c": 0b0100}
+
+    #Test that marked patterns are found in every direction, reporting the characters matched, alongside plain words
+    def test_wildcardAndClassResults(self):
+        testSearch: WordSearch = WordSearch.fromGridLines(["~c?t", "~[aeiou]..s", "~[^c]at", "dog"],
+                                                          ["xcatx", "taccs", "aeyss", "oboes"])
+        testResults = wsFunc.runLoadedWordSearch(testSearch)
+
+        assert ({word: [rr.createOutputLine() for rr in results] for word, results in testResults.items()} ==
+                {"~c?t": ["CAT (1, 0) (3, 0)", "CAT (2, 1) (0, 1)"],
+                 "~[aeiou]..s": ["ACCS (1, 1) (4, 1)", "AEYS (0, 2) (3, 2)"],
+                 "~[^c]at": ["OAT (0, 3) (0, 1)"], "dog": []})
+
+    #Test that plain words searched for as patterns give the same results as the standard search
+    def test_literalPatternsMatchStandard(self):
+        testSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt")
+        testSearch.words = testSearch.words + ["sets", "aoa", "ttt"]
+        standardResults = wsFunc.runLoadedWordSearch(testSearch)
+        patternResults = wsFunc.runLoadedWordSearch(testSearch, patterns=True)
+
+        assert all([rr.createOutputLine() for rr in standardResults[word]] ==
+                   [rr.createOutputLine() for rr in patternResults[word]] for word in testSearch.words)
+
+"""
+#######################################################################################
+# BULK DICTIONARY SEARCH TESTS
+#######################################################################################
+"""
+class TestDictionarySearch:
+    #Test that each dictionary word found has the same results as the standard search, and missing words are left out
+    def test_matchesStandardSearch(self):
+        wsDict = pytest.importorskip("WordSearch_Dictionary")
+        testSearch: WordSearch = WordSearch("TestFiles/5x10_TestSearch.txt")
+        dictionaryTrie = wsDict.DictionaryTrie(list(testSearch.words) + ["sets", "aoa", "ttt", "zzzz", "SETS"])
+        testSearch.words = dictionaryTrie.words
+        standardResults = wsFunc.runLoadedWordSearch(testSearch)
+        dictionaryResults = wsDict.runDictionaryWordSearch(testSearch, dictionaryTrie)
+
+        assert ({word: [rr.createOutputLine() for rr in results] for word, results in dictionaryResults.items()} ==
+                {word: [rr.createOutputLine() for rr in results] for word, results in standardResults.items()
+                 if len(results) > 0})
+
+    #Test that the trie is cached under the contents of the dictionary, and rebuilt when the dictionary changes
+    def test_trieIsCached(self, tmp_path):
+        wsDict = pytest.importorskip("WordSearch_Dictionary")
+        dictionaryPath = tmp_path / "dictionary.txt"
+        dictionaryPath.write_text("cat\ndog\n")
+        firstTrie = wsDict.loadOrBuildDictionaryTrie(str(dictionaryPath), str(tmp_path / "cache"))
+        cachedTrie = wsDict.loadOrBuildDictionaryTrie(str(dictionaryPath), str(tmp_path / "cache"))
+        dictionaryPath.write_text("cat\ndog\nbird\n")
+        changedTrie = wsDict.loadOrBuildDictionaryTrie(str(dictionaryPath), str(tmp_path / "cache"))
+
+        assert (firstTrie.words == cachedTrie.words == ["cat", "dog"] and changedTrie.words == ["cat", "dog", "bird"]
+                and len(list((tmp_path / "cache").glob("*.trie"))) == 2)
+
+    #Test that words that are prefixes of each other are all found, overlapping, from a single walk along the line
+    def test_prefixWords(self):
+        wsDict = pytest.importorskip("WordSearch_Dictionary")
+        dictionaryTrie = wsDict.DictionaryTrie(["cats", "ca", "cat", "at", "Cat", "dog"])
+
+        assert (dictionaryTrie.words == ["cats", "ca", "cat", "at", "dog"] and
+                dictionaryTrie.findLineSpans("xcatsat") == {1: [(1, 2)], 2: [(1, 3)], 0: [(1, 4)], 3: [(2, 3), (5, 6)]})
+
+    #Test that cached tries share the size limit of the grid indexes, and that tries of an older format are evicted
+    def test_triesAreEvicted(self, tmp_path):
+        wsDict = pytest.importorskip("WordSearch_Dictionary")
+        (tmp_path / "stale.v1.trie").write_bytes(b"old")
+        for name in ["first", "second"]:
+            (tmp_path / (name + ".txt")).write_text(name + "\n")
+            wsDict.loadOrBuildDictionaryTrie(str(tmp_path / (name + ".txt")), str(tmp_path), maxBytes=1)
+
+        assert [pp.name for pp in tmp_path.glob("*.trie")] == [
+            "{}.v{}.trie".format(wsDict.fileFingerprint(str(tmp_path / "second.txt")), wsDict.DICTIONARY_TRIE_VERSION)]
+
+    #Test that a file holding just a grid can be searched for the words of a dictionary
+    def test_gridOnlyFile(self, tmp_path):
+        wsDict = pytest.importorskip("WordSearch_Dictionary")
+        inputPath = tmp_path / "grid.pzl"
+        inputPath.write_text("XCATX\nTACCS\nDOGSS\n")
+        wsMain.dictionaryWordSearchMain(str(inputPath), wsDict.DictionaryTrie(["cat", "dogs", "bird"]), True)
+
+        assert (tmp_path / "grid.out").read_text() == "CAT (2, 1) (4, 1)\nCAT (3, 2) (1, 2)\nDOGS (1, 3) (4, 3)\n"
+
+    #Test that every option the dictionary search can't honour is refused with a warning, rather than ignored
+    def test_unsupportedOptionsRefused(self, tmp_path):
+        (tmp_path / "grid.pzl").write_text("XCATX\nTACCS\n")
+        warningLines: List[str] = [runCommandLine(["--dictionary", "dictionary.txt", option] +
+                                                  TEST_OPTION_VALUES.get(option, []) + ["grid.pzl"], str(tmp_path))
+                                   for option in wsMain.MODE_UNSUPPORTED_OPTIONS["--dictionary"]]
+
+        assert (all(line.startswith("WARN: \"--dictionary\" cannot be combined with") for line in warningLines) and
+                not (tmp_path / "grid.out").exists())
+
+"""
+#######################################################################################
+# BATCH MANIFEST TESTS
+#######################################################################################
+"""
+class TestManifestBatch:
+    #Test that the manifest format is taken from the extension, or else from the first line with content
+    def test_detectManifestFormat(self, tmp_path):
+        wsBatch = pytest.importorskip("WordSearch_Batch")
+        (tmp_path / "puzzles.jsonl").write_text("")
+        (tmp_path / "objects.txt").write_text("\n  {\"grid\": [\"A\"], \"words\": [\"A\"]}\n")
+        (tmp_path / "paths.txt").write_text("Puzzle.pzl\n")
+
+        assert ([wsBatch.detectManifestFormat(str(tmp_path / name)) for name in ["puzzles.jsonl", "objects.txt",
+                                                                                 "paths.txt"]] ==
+                ["jsonl", "jsonl", "paths"])
+
+    #Test that a manifest of paths writes every puzzle's lines to one file under its ID, reporting bad puzzles in line
+    def test_pathsManifest(self, tmp_path):
+        wsBatch = pytest.importorskip("WordSearch_Batch")
+        (tmp_path / "good.pzl").write_text("XCATX\nTACCS\n\ncat\ndog\n")
+        (tmp_path / "bad.pzl").write_text("ABC\nAB\n\ncat\n")
+        (tmp_path / "batch.txt").write_text("good.pzl\nbad.pzl\n\ngood.pzl\n")
+        batchCounts = wsBatch.runManifestBatch(str(tmp_path / "batch.txt"), str(tmp_path / "batch.out"), True)
+
+        assert (batchCounts == (3, 1) and (tmp_path / "batch.out").read_text() ==
+                "good.pzl\tCAT (2, 1) (4, 1)\ngood.pzl\tCAT (3, 2) (1, 2)\ngood.pzl\tDOG not found\n"
+                "bad.pzl\tERROR: The lines of the Word Search Grid provided are not all the same length\n"
+                "good.pzl\tCAT (2, 1) (4, 1)\ngood.pzl\tCAT (3, 2) (1, 2)\ngood.pzl\tDOG not found\n")
+
+    #Test that puzzles held in a JSON lines manifest are searched under their IDs, or else their line numbers
+    def test_jsonLinesManifest(self, tmp_path):
+        wsBatch = pytest.importorskip("WordSearch_Batch")
+        (tmp_path / "batch.jsonl").write_text(json.dumps({"id": "first", "grid": ["DOGX", "XXXX"], "words": ["dog"]}) +
+                                              "\n" + json.dumps({"grid": ["CAT"], "words": ["cat"]}) + "\nnot json\n")
+        batchCounts = wsBatch.runManifestBatch(str(tmp_path / "batch.jsonl"), str(tmp_path / "batch.out"))
+        outputLines = (tmp_path / "batch.out").read_text().splitlines()
+
+        assert (batchCounts == (3, 1) and outputLines[:2] == ["first\tDOG (1, 1) (3, 1)", "2\tCAT (1, 1) (3, 1)"] and
+                outputLines[2].startswith("3\tERROR: JSONDecodeError"))
+
+    #Test that puzzles with empty, non-string or unlisted words get an error line without stopping the rest
+    def test_badWordsAreIsolated(self, tmp_path):
+        wsBatch = pytest.importorskip("WordSearch_Batch")
+        puzzleLines: List[str] = [json.dumps({"grid": ["CAT"], "words": words}) for words in
+                                  [["", "cat"], [1, "cat"], "cat", ["cat"]]]
+        (tmp_path / "batch.jsonl").write_text("\n".join(puzzleLines) + "\n")
+        batchCounts = wsBatch.runManifestBatch(str(tmp_path / "batch.jsonl"), str(tmp_path / "batch.out"))
+        outputLines = (tmp_path / "batch.out").read_text().splitlines()
+
+        assert (batchCounts == (4, 3) and all(line.startswith("{}\tERROR: ValueError".format(ii + 1))
+                                              for ii, line in enumerate(outputLines[:3])) and
+                outputLines[3] == "4\tCAT (1, 1) (3, 1)")
+
+    #Test that every option the manifest batch can't honour is refused with a warning, rather than ignored
+    def test_unsupportedOptionsRefused(self, tmp_path):
+        (tmp_path / "batch.jsonl").write_text(json.dumps({"grid": ["CAT"], "words": ["cat"]}) + "\n")
+        warningLines: List[str] = [runCommandLine(["--manifest", option] + TEST_OPTION_VALUES.get(option, []) +
+                                                  ["batch.jsonl"], str(tmp_path))
+                                   for option in wsMain.MODE_UNSUPPORTED_OPTIONS["--manifest"]]
+
+        assert (all(line.startswith("WARN: \"--manifest\" cannot be combined with") for line in warningLines) and
+                not (tmp_path / "batch.out").exists())
+
+"""
+#######################################################################################
+# RESULT RANKING AND MOST HITS TESTS
+#######################################################################################
+"""
+class TestResultRanking:
+    #Test that each ranking puts the results of a word in its own order; DOG is found backwards on a row, then downwards
+    #on a column, then down a diagonal
+    def test_rankingOrders(self):
+        testSearch: WordSearch = WordSearch.fromGridLines(["dog"], ["DXDXX", "OXGOD", "GXXXG", "XXXXX"])
+        rankedLines = {ranking: [rr.createOutputLine(1) for rr in wsFunc.runRankedWordSearch(
+            testSearch, ranking)["dog"]] for ranking in wsFunc.RESULT_RANKINGS}
+
+        assert rankedLines == {"found": ["DOG (5, 2) (3, 2)", "DOG (1, 1) (1, 3)", "DOG (3, 1) (5, 3)"],
+                               "topleft": ["DOG (1, 1) (1, 3)", "DOG (3, 1) (5, 3)", "DOG (5, 2) (3, 2)"],
+                               "longest": ["DOG (3, 1) (5, 3)", "DOG (1, 1) (1, 3)", "DOG (5, 2) (3, 2)"],
+                               "direction": ["DOG (1, 1) (1, 3)", "DOG (3, 1) (5, 3)", "DOG (5, 2) (3, 2)"]}
+
+    #Test that every engine keeps the same best ranked results when the hits are limited
+    def test_maxHitsAcrossEngines(self):
+        testSearch: WordSearch = WordSearch.fromGridLines(["dog"], ["DXDXX", "OXGOD", "GXXXG", "XXXXX"])
+        engineLines = [[rr.createOutputLine(1) for rr in wsFunc.runRankedWordSearch(
+            testSearch, "topleft", 2, engine)["dog"]]
+            for engine in ["standard", "ahocorasick", "bitparallel"]]
+
+        assert engineLines == [["DOG (1, 1) (1, 3)", "DOG (3, 1) (5, 3)"]] * 3
+
+    #Test that a single hit is the best ranked result, not the first found
+    def test_singleHitTakesBestRanked(self):
+        testSearch: WordSearch = WordSearch.fromGridLines(["dog"], ["DXDXX", "OXGOD", "GXXXG", "XXXXX"])
+        testResults = wsFunc.runRankedWordSearch(testSearch, "longest", 1)
+
+        assert [rr.createOutputLine(1) for rr in testResults["dog"]] == ["DOG (3, 1) (5, 3)"]
+
+    #Test that limiting the hits in the order found stops reading the results, so even an endless search finishes
+    def test_maxHitsStopsEarly(self):
+        endlessResults = (WordSearchResult("A", (xx, 0), (xx, 0)) for xx in itertools.count())
+
+        assert [rr.startX for rr in wsFunc.rankResults(endlessResults, "found", 3)] == [0, 1, 2]
+
+    #Test that an unknown ranking is rejected
+    def test_unknownRanking(self):
+        testSearch: WordSearch = WordSearch.fromGridLines(["dog"], ["DXDXX", "OXGOD", "GXXXG", "XXXXX"])
+        with pytest.raises(ValueError):
+            wsFunc.runRankedWordSearch(testSearch, "best")
+
+    #Test that options an engine would otherwise ignore are refused
+    def test_unsupportedOptionsRefused(self):
+        testSearch: WordSearch = WordSearch.fromGridLines(["dog"], ["DXDXX", "OXGOD", "GXXXG", "XXXXX"])
+        refusedOptions: List[Dict] = [{"engine": "ahocorasick", "memo": SearchMemo()},
+                                      {"engine": "bitparallel", "columnar": True},
+                                      {"memo": SearchMemo(), "overlapping": True},
+                                      {"columnar": True, "firstOnly": True}]
+        for options in refusedOptions:
+            with pytest.raises(ValueError):
+                wsFunc.runLoadedWordSearch(testSearch, **options)